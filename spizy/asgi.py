@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'spizy.settings')
 
 application = get_asgi_application()
+
+# Synchronous views run in another thread with its own connections, so only
+# the code is preloaded
+if settings.WARMUP:
+    from tasks.warmup import warm_up
+    warm_up(connect_databases=False)
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/3.1/ref/settings/
 
 from pathlib import Path
 from os import environ, urandom
+from tempfile import gettempdir
 import binascii
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -21,13 +22,16 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # See https://docs.djangoproject.com/en/3.1/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = environ.get("SECRET_KEY", binascii.hexlify(urandom(32)).decode)
+SECRET_KEY = environ.get("SECRET_KEY", binascii.hexlify(urandom(32)).decode())
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = str(environ.get('DEBUG', 'false')).lower() == 'true'
 
 ALLOWED_HOSTS = ['.yuizyy.com', 'localhost', '127.0.0.1']
 
+# Preload code and connect before serving, see spizy/wsgi.py and tasks.warmup
+WARMUP = str(environ.get('WARMUP', 'true')).lower() == 'true'
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -44,6 +48,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'tasks.middleware.CompressionMiddleware',
+    'tasks.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,6 +59,14 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Response compression, see tasks.middleware.CompressionMiddleware. Gzip is
+# always available; installing the optional brotli package (pip install
+# brotli) enables 'br' for requests without credentials.
+COMPRESSION_MIN_SIZE = int(environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(environ.get('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(
+    environ.get('COMPRESSION_BROTLI_QUALITY', 5))
+
 ROOT_URLCONF = 'spizy.urls'
 
 TEMPLATES = [
@@ -76,13 +90,186 @@ WSGI_APPLICATION = 'spizy.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
 
+# SQLite by default, DB_ENGINE and DB_NAME select another database, e.g. to
+# compare engines with `manage.py loadtest`
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': environ.get('DB_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'USER': environ.get('DB_USER', ''),
+        'PASSWORD': environ.get('DB_PASSWORD', ''),
+        'HOST': environ.get('DB_HOST', ''),
+        'PORT': environ.get('DB_PORT', ''),
+    }
+}
+
+# Read replicas, a comma separated list of database names for SQLite (e.g.
+# a copied replica.sqlite3) or hosts for other engines. Safe-method requests
+# read from them, see tasks.routers.ReplicaRouter.
+DATABASE_REPLICAS = []
+for location in filter(None, environ.get('DATABASE_REPLICAS', '').split(',')):
+    alias = f'replica_{len(DATABASE_REPLICAS) + 1}'
+    if DATABASES['default']['ENGINE'].endswith('sqlite3'):
+        replica = {'NAME': BASE_DIR / location.strip()}
+    else:
+        replica = {'HOST': location.strip()}
+    # Tests run against the primary's test database
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        **replica, 'TEST': {
+            'MIRROR': 'default'
+        }
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['tasks.routers.ReplicaRouter']
+
+# Seconds a client reads from the primary after writing, so it sees its own
+# writes while the replicas catch up
+PRIMARY_PIN_SECONDS = int(environ.get('PRIMARY_PIN_SECONDS', 5))
+PRIMARY_PIN_COOKIE = 'primary_pin'
+
+# Rows written per INSERT by bulk operations such as project cloning
+BULK_CREATE_BATCH_SIZE = int(environ.get('BULK_CREATE_BATCH_SIZE', 500))
+
+# Deepest level of subtasks. Paths grow by 10 characters per level and
+# PostgreSQL refuses index entries over about 2700 bytes, 270 levels
+TASK_MAX_DEPTH = int(environ.get('TASK_MAX_DEPTH', 100))
+
+# Task imports: errors kept in the report and where queued uploads wait
+TASK_IMPORT_MAX_ERRORS = int(environ.get('TASK_IMPORT_MAX_ERRORS', 1000))
+TASK_IMPORT_DIR = environ.get('TASK_IMPORT_DIR',
+                              str(Path(gettempdir()) / 'spizy-imports'))
+
+# Tasks deleted per statement when deleting a project
+DELETE_BATCH_SIZE = int(environ.get('DELETE_BATCH_SIZE', 2000))
+
+# Completed tasks due this many days ago are moved to the archive by
+# `manage.py archive_tasks`, this many per transaction
+ARCHIVE_AFTER_DAYS = int(environ.get('ARCHIVE_AFTER_DAYS', 30))
+ARCHIVE_BATCH_SIZE = int(environ.get('ARCHIVE_BATCH_SIZE', 1000))
+
+# Progress events buffered per thread before one INSERT, events summed up
+# per transaction by `manage.py rollup_progress`, seconds after their
+# INSERT before they are, and days events are kept once summed up
+PROGRESS_EVENT_BUFFER_SIZE = int(environ.get('PROGRESS_EVENT_BUFFER_SIZE',
+                                             500))
+PROGRESS_ROLLUP_BATCH_SIZE = int(environ.get('PROGRESS_ROLLUP_BATCH_SIZE',
+                                             5000))
+PROGRESS_ROLLUP_LAG_SECONDS = int(
+    environ.get('PROGRESS_ROLLUP_LAG_SECONDS', 60))
+PROGRESS_EVENT_RETENTION_DAYS = int(
+    environ.get('PROGRESS_EVENT_RETENTION_DAYS', 90))
+
+# Seconds progress updates sent to /api/task/<pk>/progress are coalesced
+# before one bulk_update, timeout in seconds of the cached task projects and
+# memberships they are checked against, and of the lock of the pending set.
+# Pending updates live in the default cache and are written by the next
+# request or `manage.py runworker`. Without a shared cache (CACHE_IS_SHARED)
+# they are written right away instead.
+PROGRESS_COALESCE_SECONDS = float(environ.get('PROGRESS_COALESCE_SECONDS', 2))
+PENDING_PROGRESS_CACHE_TIMEOUT = int(
+    environ.get('PENDING_PROGRESS_CACHE_TIMEOUT', 300))
+PENDING_PROGRESS_LOCK_TIMEOUT = int(
+    environ.get('PENDING_PROGRESS_LOCK_TIMEOUT', 10))
+
+# Rows the admin changelists count exactly, larger tables show an estimate
+ADMIN_EXACT_COUNT_LIMIT = int(environ.get('ADMIN_EXACT_COUNT_LIMIT', 10000))
+
+# Paginated task and membership lists (?limit=) count up to this many rows
+# exactly, above it they sum per-project counts cached for this many seconds
+EXACT_COUNT_THRESHOLD = int(environ.get('EXACT_COUNT_THRESHOLD', 1000))
+APPROXIMATE_COUNT_TIMEOUT = int(environ.get('APPROXIMATE_COUNT_TIMEOUT', 300))
+
+# Background jobs, run by `manage.py runworker`
+JOB_WORKER_PROCESSES = int(environ.get('JOB_WORKER_PROCESSES', 2))
+# Seconds an idle worker waits before looking for new jobs
+JOB_POLL_INTERVAL = float(environ.get('JOB_POLL_INTERVAL', 1))
+JOB_MAX_ATTEMPTS = int(environ.get('JOB_MAX_ATTEMPTS', 3))
+# Seconds before the first retry, doubled on every further attempt
+JOB_RETRY_BACKOFF = int(environ.get('JOB_RETRY_BACKOFF', 10))
+# Seconds without a heartbeat after which a running job is considered dead
+JOB_TIMEOUT = int(environ.get('JOB_TIMEOUT', 600))
+# Seconds between the updates a worker makes to its running job, must stay
+# well below JOB_TIMEOUT
+JOB_HEARTBEAT_INTERVAL = int(environ.get('JOB_HEARTBEAT_INTERVAL', 60))
+
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND':
+        environ.get('CACHE_BACKEND',
+                    'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION':
+        environ.get('CACHE_LOCATION', ''),
     }
 }
 
+# Whether every worker process sees the same cache, as with memcached or
+# redis. The user cache needs one and is bypassed otherwise, since other
+# processes could not drop their copies when a user changes. The throttles
+# and password hashing slots then only limit each process.
+PROCESS_LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',
+                        'django.core.cache.backends.dummy.DummyCache')
+CACHE_IS_SHARED = str(
+    environ.get('CACHE_IS_SHARED', CACHES['default']['BACKEND']
+                not in PROCESS_LOCAL_CACHES)).lower() == 'true'
+
+# Cache alias and timeout in seconds of the project response cache
+RESPONSE_CACHE_ALIAS = environ.get('RESPONSE_CACHE_ALIAS', 'default')
+RESPONSE_CACHE_TIMEOUT = int(environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+
+# Default and maximum window in days of the "due soon" task list, and
+# timeout in seconds of the cached "my tasks" and "due soon" responses.
+# Task writes do not invalidate these, keep the timeout short; 0 disables.
+DUE_SOON_DAYS = int(environ.get('DUE_SOON_DAYS', 7))
+DUE_SOON_MAX_DAYS = int(environ.get('DUE_SOON_MAX_DAYS', 90))
+DUE_TASKS_CACHE_TIMEOUT = int(environ.get('DUE_TASKS_CACHE_TIMEOUT', 30))
+
+# Timeout in seconds of cached critical paths, which are also invalidated
+# whenever the project's dependencies or due dates change
+CRITICAL_PATH_CACHE_TIMEOUT = int(
+    environ.get('CRITICAL_PATH_CACHE_TIMEOUT', 3600))
+
+# Maximum number of sub-requests in one /api/batch request
+BATCH_MAX_REQUESTS = int(environ.get('BATCH_MAX_REQUESTS', 20))
+
+# Sessions
+# https://docs.djangoproject.com/en/3.1/topics/http/sessions/
+
+# cached_db serves warm sessions from the cache and only falls back to the
+# database on a miss. It needs a shared cache: a process-local one would
+# keep serving a session that another process flushed on logout, so the
+# database backend is the default otherwise, and authenticating a session
+# without any query needs a shared cache.
+# 'django.contrib.sessions.backends.signed_cookies' avoids server-side
+# session storage entirely.
+SESSION_ENGINE = environ.get(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db'
+    if CACHE_IS_SHARED else 'django.contrib.sessions.backends.db')
+
+# Authentication backends
+# https://docs.djangoproject.com/en/3.1/topics/auth/customizing/
+
+# The cached backend serves request.user from the cache. ModelBackend stays
+# listed so sessions created before it was introduced remain valid.
+AUTHENTICATION_BACKENDS = [
+    'tasks.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Seconds a user object stays in the cache between invalidations
+USER_CACHE_TIMEOUT = int(environ.get('USER_CACHE_TIMEOUT', 300))
+
+# Lifetime in seconds of the signed API tokens issued by /api/token
+API_TOKEN_TTL = int(environ.get('API_TOKEN_TTL', 3600))
+# Seconds a token's deny-list lookup stays cached, with a shared cache only.
+# Revoking a token overwrites its cached lookup right away.
+REVOKED_TOKEN_CACHE_TIMEOUT = int(
+    environ.get('REVOKED_TOKEN_CACHE_TIMEOUT', 300))
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -105,6 +292,40 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/3.1/topics/auth/passwords/
+
+# Hashers selectable with the PASSWORD_HASHER environment variable. Hashes
+# made by the other hashers are still accepted and transparently rehashed
+# with the selected one on the next login. 'argon2' needs argon2-cffi.
+PASSWORD_HASHER_CHOICES = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'tuned': 'tasks.hashers.TunedPBKDF2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+}
+
+PASSWORD_HASHER = environ.get('PASSWORD_HASHER', 'pbkdf2')
+
+# 'pbkdf2' and 'tuned' share a hash format, only one of them is listed
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CHOICES.items()
+    if name != PASSWORD_HASHER and {name, PASSWORD_HASHER} != {
+        'pbkdf2', 'tuned'
+    }
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+# Iterations used by the 'tuned' hasher
+PASSWORD_PBKDF2_ITERATIONS = int(
+    environ.get('PASSWORD_PBKDF2_ITERATIONS', 600000))
+
+# Requests allowed to hash passwords at once (0 = no limit), across all
+# workers with a shared cache, in each worker process otherwise. Keep it
+# below the thread or worker count so logins cannot starve the rest.
+PASSWORD_HASHING_CONCURRENCY = int(
+    environ.get('PASSWORD_HASHING_CONCURRENCY', 2))
+PASSWORD_HASHING_SLOT_TIMEOUT = 60
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.1/topics/i18n/
 
@@ -136,6 +357,11 @@ else:
     CORS_ALLOWED_ORIGINS = ['https://spizy.yuizyy.com']
 
 REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+        'tasks.authentication.SignedTokenAuthentication',
+    ],
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
     ],
@@ -146,6 +372,20 @@ REST_FRAMEWORK = {
     ['django_filters.rest_framework.DjangoFilterBackend'],
     'EXCEPTION_HANDLER':
     'rest_framework.views.exception_handler',
+    # Proxies in front of the app whose X-Forwarded-For entries are trusted
+    # to identify clients. With 0 the client is REMOTE_ADDR, so clients
+    # cannot pick their own identity with the header.
+    'NUM_PROXIES': int(environ.get('NUM_PROXIES', 0)),
+    # Token bucket rates per endpoint, see tasks.throttling. The number is
+    # the burst size, refilled evenly over the period, in each worker
+    # process unless the cache is shared.
+    'DEFAULT_THROTTLE_RATES': {
+        'login': environ.get('THROTTLE_LOGIN', '30/min'),
+        'login_username': environ.get('THROTTLE_LOGIN_USERNAME', '10/min'),
+        'token': environ.get('THROTTLE_TOKEN', '30/min'),
+        'token_username': environ.get('THROTTLE_TOKEN_USERNAME', '10/min'),
+        'signup': environ.get('THROTTLE_SIGNUP', '10/hour'),
+    },
 }
 
 if DEBUG:
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/3.1/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'spizy.settings')
 
 application = get_wsgi_application()
+
+# Warm up before uWSGI forks the workers instead of on their first request
+if settings.WARMUP:
+    from tasks.warmup import warm_up
+    warm_up()
@@ -1,6 +1,71 @@
+from django.conf import settings
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+from tasks.counting import bounded_count, estimated_rows
 from tasks.models import Project, ProjectAccess, Task
 
-admin.site.register(Project)
-admin.site.register(Task)
-admin.site.register(ProjectAccess)
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginator counting at most ADMIN_EXACT_COUNT_LIMIT rows exactly.
+
+    Beyond that, an unfiltered changelist shows the database's estimate of
+    the table size, or the highest id without statistics, and a filtered
+    one the limit + 1. The last pages may then be missing or empty.
+    """
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_EXACT_COUNT_LIMIT
+        count = bounded_count(self.object_list, limit)
+        if count <= limit:
+            return count
+
+        if not self.object_list.query.where:
+            model = self.object_list.model
+            estimate = estimated_rows(model)
+            if estimate is None:
+                estimate = model._default_manager.aggregate(
+                    highest=Max('pk'))['highest']
+            return max(estimate or 0, count)
+        return count
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin for large tables, without exact counts
+    """
+    paginator = ApproximateCountPaginator
+    # Skip the second COUNT(*) of the unfiltered table
+    show_full_result_count = False
+    # Newest first, along the primary key
+    ordering = ('-id', )
+
+
+@admin.register(Project)
+class ProjectAdmin(ScalableModelAdmin):
+    list_display = ('id', 'title')
+    search_fields = ('=id', )
+
+
+@admin.register(Task)
+class TaskAdmin(ScalableModelAdmin):
+    list_display = ('id', 'title', 'project', 'owner', 'progress',
+                    'due_date')
+    list_select_related = ('project', 'owner')
+    raw_id_fields = ('project', 'owner', 'parent')
+    # Backed by the due_date index
+    list_filter = (('due_date', admin.DateFieldListFilter), )
+    search_fields = ('=id', )
+
+
+@admin.register(ProjectAccess)
+class ProjectAccessAdmin(ScalableModelAdmin):
+    list_display = ('id', 'project', 'user', 'membership_level')
+    # __str__ reads the project and user
+    list_select_related = ('project', 'user')
+    raw_id_fields = ('project', 'user')
+    list_filter = ('membership_level', )
+    search_fields = ('=id', )
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class TasksConfig(AppConfig):
     name = 'tasks'
+
+    def ready(self):
+        # Register system checks, signal receivers and job handlers
+        from tasks import (  # noqa: F401
+            archiving, checks, cloning, coalescing, deletion, importing,
+            progress, signals)
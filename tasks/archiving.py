@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from tasks.dependencies import invalidate_critical_paths
+from tasks.jobs import job_handler
+from tasks.models import PATH_STEP, ArchivedTask, Job, Task, add_to_subtrees
+
+# Columns copied to the archive, Task and ArchivedTask share them
+ARCHIVED_FIELDS = [
+    field.attname for field in ArchivedTask._meta.concrete_fields
+]
+
+
+def archivable_tasks(days: int = None):
+    """
+    Returns the completed tasks due more than the number of days ago, by
+    default ARCHIVE_AFTER_DAYS, that have no subtasks left in the Task table
+    """
+    if days is None:
+        days = settings.ARCHIVE_AFTER_DAYS
+    before = timezone.now() - timedelta(days=days)
+
+    return Task.objects.filter(progress__gte=100, due_date__lt=before).exclude(
+        Exists(Task.objects.filter(parent=OuterRef('pk'))))
+
+
+def archive_tasks(days: int = None, on_progress=None) -> int:
+    """
+    Moves old completed tasks to the ArchivedTask table, returning how many.
+
+    Tasks are moved in chunks of ARCHIVE_BATCH_SIZE, each copied and deleted
+    in its own transaction. Only tasks without subtasks left are taken, so a
+    subtree is archived from its leaves up and a task still in the Task
+    table never has an archived parent. Dependencies of archived tasks are
+    dropped with them.
+    """
+    tasks = archivable_tasks(days).order_by('pk')
+    archived = 0
+
+    while True:
+        with transaction.atomic():
+            rows = list(
+                tasks.select_for_update().values(*ARCHIVED_FIELDS)
+                [:settings.ARCHIVE_BATCH_SIZE])
+            if not rows:
+                break
+
+            ArchivedTask.objects.bulk_create(
+                [ArchivedTask(**row) for row in rows],
+                batch_size=settings.BULK_CREATE_BATCH_SIZE)
+            Task.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+            # Archived tasks no longer count in their parents' subtrees
+            add_to_subtrees(
+                (row['project_id'], row['path'][:-PATH_STEP], -1,
+                 -row['progress']) for row in rows)
+
+        invalidate_critical_paths({row['project_id'] for row in rows})
+        archived += len(rows)
+        if on_progress is not None:
+            on_progress(archived)
+
+    return archived
+
+
+@job_handler('archive_tasks')
+def archive_tasks_job(job: Job):
+    return {'archived': archive_tasks(job.payload.get('days'))}
@@ -0,0 +1,126 @@
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from rest_framework.authentication import (BaseAuthentication,
+                                           get_authorization_header)
+from rest_framework.exceptions import AuthenticationFailed
+
+from tasks.backends import CachedModelBackend
+from tasks.models import RevokedToken
+
+TOKEN_SALT = 'tasks.authentication.SignedTokenAuthentication'
+
+
+def _session_hash(user: User) -> str:
+    # Ties the token to the current password, like session auth does
+    return user.get_session_auth_hash()[:16]
+
+
+def issue_token(user: User) -> str:
+    """
+    Returns a signed, self-contained API token for the user
+    """
+    payload = {
+        'uid': user.pk,
+        'jti': secrets.token_urlsafe(12),
+        'sh': _session_hash(user),
+    }
+    return signing.dumps(payload, salt=TOKEN_SALT)
+
+
+def load_token(token: str) -> dict:
+    """
+    Verifies the token signature and age, and returns its payload
+    """
+    try:
+        return signing.loads(token,
+                             salt=TOKEN_SALT,
+                             max_age=settings.API_TOKEN_TTL)
+    except signing.SignatureExpired:
+        raise AuthenticationFailed('Token has expired')
+    except signing.BadSignature:
+        raise AuthenticationFailed('Invalid token')
+
+
+def _revoked_key(jti: str) -> str:
+    return f'auth:token:revoked:{jti}'
+
+
+def revoke_token(payload: dict):
+    """
+    Adds the token to the deny-list until it would have expired anyway, and
+    drops the entries of the tokens that expired since
+    """
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=settings.API_TOKEN_TTL)
+    RevokedToken.objects.filter(expires_at__lt=now).delete()
+    RevokedToken.objects.update_or_create(
+        jti=payload['jti'], defaults={'expires_at': expires_at})
+
+    if settings.CACHE_IS_SHARED:
+        # Replaces the cached lookup in every process at once
+        cache.set(_revoked_key(payload['jti']), True, settings.API_TOKEN_TTL)
+
+
+def is_token_revoked(payload: dict) -> bool:
+    """
+    Looks the token up in the deny-list. The database table is the source
+    of truth; with a shared cache the lookups are cached, revoke_token()
+    overwriting them, so warm requests need no query.
+    """
+    if not settings.CACHE_IS_SHARED:
+        return RevokedToken.objects.filter(jti=payload['jti']).exists()
+
+    key = _revoked_key(payload['jti'])
+    revoked = cache.get(key)
+    if revoked is None:
+        revoked = RevokedToken.objects.filter(jti=payload['jti']).exists()
+        cache.set(key, revoked, settings.REVOKED_TOKEN_CACHE_TIMEOUT)
+    return revoked
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Bearer token authentication.
+
+    Clients send ``Authorization: Bearer <token>``. The token is verified
+    from its signature; the user and the deny-list lookup come from the
+    cache, so with a shared cache warm requests need no database access.
+    CSRF is not enforced since the token is never sent implicitly by a
+    browser.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise AuthenticationFailed('Invalid token header')
+
+        try:
+            token = auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed('Invalid token')
+
+        payload = load_token(token)
+        if is_token_revoked(payload):
+            raise AuthenticationFailed('Token has been revoked')
+
+        # Get the user and make sure the password did not change since
+        user = CachedModelBackend().get_user(payload['uid'])
+        if user is None or not constant_time_compare(
+                payload['sh'], _session_hash(user)):
+            raise AuthenticationFailed('Invalid token')
+
+        return (user, payload)
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id) -> str:
+    """
+    Returns the cache key holding the user object for the given id
+    """
+    return f'auth:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    """
+    Removes the user from the cache, forcing the next request to reload it
+    """
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    Model backend that serves session users from the cache.
+
+    Resolving ``request.user`` from a session normally costs one query per
+    request. The user is cached until it is saved or deleted, see
+    ``tasks.signals``. Without a shared cache (``CACHE_IS_SHARED``) the
+    user is always loaded from the database, as a copy kept by one process
+    would outlive changes made through another.
+    """
+    def get_user(self, user_id):
+        if not settings.CACHE_IS_SHARED:
+            return super().get_user(user_id)
+
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+
+        if user is None:
+            # Load the user from the database and keep it warm
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+
+        return user
@@ -0,0 +1,116 @@
+import io
+import json
+import logging
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from rest_framework.request import Request
+
+from tasks.membership import forget_project_ids
+
+logger = logging.getLogger(__name__)
+
+# Routes that manage credentials, read uploads or would recurse
+EXCLUDED_ROUTES = {
+    'csrfview', 'signup', 'login', 'logout', 'token', 'tokenrevoke',
+    'taskimport', 'batch'
+}
+
+# Response headers passed on to the client
+FORWARDED_HEADERS = ('Location', 'Retry-After')
+
+
+def error_body(detail: str) -> bytes:
+    return json.dumps({'detail': detail}).encode()
+
+
+def build_subrequest(request: Request, method: str, path: str,
+                     body) -> WSGIRequest:
+    """
+    Returns a request for one sub-request, authenticated as the batch request
+    """
+    path, _, query = path.partition('?')
+    content = b'' if body is None else json.dumps(body).encode()
+
+    # Start from the batch request so host, scheme and client stay the same
+    environ = {
+        key: value
+        for key, value in request.META.items()
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH')
+    }
+    environ.setdefault('wsgi.url_scheme', request.scheme)
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+        # Responses are spliced into one JSON document
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': io.BytesIO(content),
+    })
+    subrequest = WSGIRequest(environ)
+
+    # Share the session and user, and skip authenticating again
+    subrequest.session = request.session
+    subrequest.user = request.user
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    subrequest.csrf_processing_done = True
+
+    return subrequest
+
+
+def run_subrequest(request: Request, method: str, path: str, body) -> tuple:
+    """
+    Runs one sub-request in-process, returns its status, headers and body
+    """
+    try:
+        match = resolve(path.partition('?')[0])
+    except Resolver404:
+        return 404, {}, error_body('Not found')
+
+    if match.namespace != 'tasks' or match.url_name in EXCLUDED_ROUTES:
+        return 400, {}, error_body('This route can not be batched')
+
+    subrequest = build_subrequest(request, method, path, body)
+    try:
+        response = match.func(subrequest, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+    except Exception:
+        logger.exception('Batched request %s %s failed', method, path)
+        return 500, {}, error_body('Server error')
+    finally:
+        # Writes may change which projects the user is part of
+        if method != 'GET':
+            forget_project_ids(request.user)
+
+    headers = {
+        header: response[header]
+        for header in FORWARDED_HEADERS if response.has_header(header)
+    }
+
+    content = response.content
+    if content and not response.get('Content-Type',
+                                    '').startswith('application/json'):
+        content = json.dumps(content.decode('utf-8', 'replace')).encode()
+
+    return response.status_code, headers, content or b'null'
+
+
+def batch_response(results) -> HttpResponse:
+    """
+    Returns one JSON response holding the results of all sub-requests.
+
+    Sub-request bodies are already rendered JSON, so they are spliced in as
+    they are instead of being parsed and rendered a second time.
+    """
+    entries = [
+        b'{"status": %d, "headers": %s, "body": %s}' %
+        (status, json.dumps(headers).encode(), content)
+        for status, headers, content in results
+    ]
+    return HttpResponse(b'{"responses": [' + b', '.join(entries) + b']}',
+                        content_type='application/json')
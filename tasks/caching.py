@@ -0,0 +1,118 @@
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+
+def get_response_cache():
+    """
+    Returns the cache backend holding rendered responses
+    """
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def get_stamp(key: str) -> str:
+    """
+    Returns the version stamp stored under the key.
+
+    Stamps are random rather than counters, so a stamp lost from the cache
+    can never be recreated with a value that matches stale entries.
+    """
+    cache = get_response_cache()
+    stamp = cache.get(key)
+
+    if stamp is None:
+        cache.add(key, secrets.token_hex(8), None)
+        stamp = cache.get(key)
+
+    return stamp
+
+
+def bump_stamps(keys):
+    """
+    Replaces the version stamps stored under the keys
+    """
+    get_response_cache().set_many(
+        {key: secrets.token_hex(8)
+         for key in set(keys)}, None)
+
+
+def _version_key(user_id) -> str:
+    return f'response:version:{user_id}'
+
+
+def get_version(user_id) -> str:
+    """
+    Returns the version stamp of the user's projects
+    """
+    return get_stamp(_version_key(user_id))
+
+
+def bump_versions(user_ids):
+    """
+    Invalidates the cached responses of the given users
+    """
+    bump_stamps(_version_key(user_id) for user_id in user_ids)
+
+
+class CachedResponseMixin:
+    """
+    Caches rendered GET responses per user and project version stamp.
+
+    Cache hits are returned as plain bytes, skipping the queryset and the
+    serializer altogether. Stamps are bumped by the Project and
+    ProjectAccess signal receivers in ``tasks.signals``. Responses are only
+    cached when the cache is shared (``CACHE_IS_SHARED``).
+    """
+    cache_prefix = None
+    cache_timeout = None
+
+    def get_cache_timeout(self) -> int:
+        if self.cache_timeout is None:
+            return settings.RESPONSE_CACHE_TIMEOUT
+        return self.cache_timeout
+
+    def get_response_cache_key(self, request) -> str:
+        # Vary on the URL arguments and query string
+        url_args = ':'.join(str(value) for value in self.kwargs.values())
+        query = hashlib.md5(
+            request.META.get('QUERY_STRING', '').encode()).hexdigest()
+        version = get_version(request.user.pk)
+
+        return (f'response:{self.cache_prefix}:{request.user.pk}:{version}:'
+                f'{url_args}:{query}')
+
+    def cached_response(self, request, build_response):
+        """
+        Returns the cached response if there is one, otherwise builds,
+        renders and caches it
+        """
+        # A process-local cache would miss the stamp bumps made by the
+        # other workers and serve stale responses
+        if not settings.CACHE_IS_SHARED:
+            return build_response()
+
+        # Only JSON responses are cached, not the browsable API
+        timeout = self.get_cache_timeout()
+        if request.accepted_renderer.format != 'json' or not timeout:
+            return build_response()
+
+        cache = get_response_cache()
+        key = self.get_response_cache_key(request)
+        content_type = request.accepted_media_type
+
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content, content_type=content_type)
+
+        response = build_response()
+        if response.status_code != 200:
+            return response
+
+        content = request.accepted_renderer.render(
+            response.data, content_type, self.get_renderer_context())
+        cache.set(key, content, timeout)
+
+        return HttpResponse(content, content_type=content_type)
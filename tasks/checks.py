@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Warns when the token buckets cannot hold their rates across worker
+    processes
+    """
+    rates = settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES') or {}
+    if settings.CACHE_IS_SHARED or not any(rates.values()):
+        return []
+
+    return [
+        Warning(
+            "The cache is local to each process, every worker process "
+            "throttles requests on its own.",
+            hint="Configure a shared cache such as memcached or redis with "
+            "CACHE_BACKEND and CACHE_LOCATION.",
+            id='tasks.W001')
+    ]
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+
+from tasks.caching import bump_versions
+from tasks.jobs import job_handler
+from tasks.models import Job, Project, ProjectAccess, Task, path_segment
+from tasks.progress import record_created
+
+TASK_CLONE_FIELDS = ('pk', 'title', 'description', 'owner_id', 'progress',
+                     'due_date', 'parent_id', 'path', 'depth',
+                     'subtree_tasks', 'subtree_progress')
+
+
+def clone_project(project: Project,
+                  user: User,
+                  title: str = None,
+                  include_access: bool = False,
+                  shift: timedelta = timedelta(0)) -> Project:
+    """
+    Copies the project with all its tasks, and optionally its members, in
+    one transaction. The user becomes the owner of the copy.
+
+    Tasks are read in path chunks and written with one bulk_create and one
+    bulk_update per chunk, so the cost is a few queries per chunk whatever
+    the number or the depth of tasks.
+    """
+    batch_size = settings.BULK_CREATE_BATCH_SIZE
+
+    with transaction.atomic():
+        clone = Project.objects.create(
+            title=title if title is not None else project.title,
+            description=project.description)
+
+        # Copy the members
+        accesses = [
+            ProjectAccess(project=clone,
+                          user=user,
+                          membership_level=ProjectAccess.MembershipLevel.OWNER)
+        ]
+        if include_access:
+            accesses.extend(
+                ProjectAccess(project=clone,
+                              user_id=user_id,
+                              membership_level=membership_level)
+                for user_id, membership_level in ProjectAccess.objects.filter(
+                    project=project).exclude(user=user).values_list(
+                        'user_id', 'membership_level'))
+        ProjectAccess.objects.bulk_create(accesses)
+
+        # Copy the tasks chunk by chunk in path order, walking the path so
+        # rows inserted by the copy are never read back. Parents come
+        # before their subtasks, only the copies of parents are remembered.
+        tasks = Task.objects.filter(project=project).order_by('path', 'pk')
+        parent_ids = set(
+            tasks.exclude(parent=None).values_list('parent_id',
+                                                   flat=True).distinct())
+        copied_parents = {}
+        last_path, last_pk = '', 0
+        while True:
+            rows = list(
+                tasks.filter(
+                    Q(path__gt=last_path) | Q(path=last_path, pk__gt=last_pk)
+                ).values_list(*TASK_CLONE_FIELDS)[:batch_size])
+            if not rows:
+                break
+
+            copies = Task.objects.bulk_create([
+                Task(title=task_title,
+                     description=description,
+                     project=clone,
+                     owner_id=owner_id,
+                     progress=progress,
+                     due_date=due_date + shift,
+                     depth=depth,
+                     subtree_tasks=subtree_tasks,
+                     subtree_progress=subtree_progress)
+                for (pk, task_title, description, owner_id, progress,
+                     due_date, parent_id, path, depth, subtree_tasks,
+                     subtree_progress) in rows
+            ])
+
+            # Parents may be in the same chunk and paths are made of the new
+            # ids, so both are set once the chunk is inserted
+            for row, copy in zip(rows, copies):
+                pk, parent_id = row[0], row[6]
+                if parent_id is None:
+                    copy.path = path_segment(copy.pk)
+                else:
+                    copy.parent_id, parent_path = copied_parents[parent_id]
+                    copy.path = parent_path + path_segment(copy.pk)
+                if pk in parent_ids:
+                    copied_parents[pk] = (copy.pk, copy.path)
+                # Dependencies are not copied, any distinct rank will do
+                copy.topo_rank = copy.pk
+            Task.objects.bulk_update(copies, ['parent', 'path', 'topo_rank'])
+            record_created(copies)
+
+            last_path, last_pk = rows[-1][7], rows[-1][0]
+
+    # bulk_create skips the signals that invalidate cached responses
+    bump_versions(access.user_id for access in accesses)
+
+    return clone
+
+
+@job_handler('clone_project')
+def clone_project_job(job: Job):
+    clone = clone_project(Project.objects.get(pk=job.payload['project']),
+                          job.owner,
+                          title=job.payload.get('title'),
+                          include_access=job.payload['include_access'],
+                          shift=timedelta(days=job.payload['shift_days']))
+    return {'project': clone.pk}
@@ -0,0 +1,200 @@
+import atexit
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from tasks.caching import get_version
+from tasks.jobs import job_handler
+from tasks.models import Job, ProjectAccess, Task, add_to_subtrees
+from tasks.progress import buffer_events, task_event
+
+# Task id -> time of the first unwritten update, guarded by the lock
+DIRTY_KEY = 'pending-progress:dirty'
+LOCK_KEY = 'pending-progress:lock'
+
+
+def _progress_key(task_id) -> str:
+    return f'pending-progress:{task_id}'
+
+
+def _project_key(task_id) -> str:
+    return f'task-project:{task_id}'
+
+
+@contextmanager
+def dirty_lock():
+    """
+    Serializes changes to the dirty set. The lock expires on its own if
+    its holder dies.
+    """
+    while not cache.add(LOCK_KEY, 1, settings.PENDING_PROGRESS_LOCK_TIMEOUT):
+        time.sleep(0.005)
+    try:
+        yield
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+def task_project_id(task_id: int):
+    """
+    Returns the project of the task from the cache, None if there is no
+    such task
+    """
+    key = _project_key(task_id)
+    project_id = cache.get(key)
+
+    if project_id is None:
+        project_id = Task.objects.filter(pk=task_id).values_list(
+            'project_id', flat=True).first()
+        if project_id is not None:
+            cache.set(key, project_id, settings.PENDING_PROGRESS_CACHE_TIMEOUT)
+
+    return project_id
+
+
+def forget_task_projects(task_ids):
+    """
+    Drops the cached projects of tasks that were moved or deleted
+    """
+    cache.delete_many([_project_key(task_id) for task_id in task_ids])
+
+
+def cached_project_ids(user) -> set:
+    """
+    Returns the ids of the user's projects from the cache, kept until the
+    user's memberships change
+    """
+    key = f'member-projects:{user.pk}:{get_version(user.pk)}'
+    project_ids = cache.get(key)
+
+    if project_ids is None:
+        project_ids = set(
+            ProjectAccess.objects.filter(user=user).values_list('project_id',
+                                                                flat=True))
+        cache.set(key, project_ids, settings.PENDING_PROGRESS_CACHE_TIMEOUT)
+
+    return project_ids
+
+
+def set_pending(task_id: int, progress: int):
+    """
+    Records the progress to write, replacing any pending one for the task
+    """
+    with dirty_lock():
+        dirty = cache.get(DIRTY_KEY) or {}
+        dirty.setdefault(task_id, time.time())
+        cache.set_many({_progress_key(task_id): progress, DIRTY_KEY: dirty},
+                       None)
+
+
+def discard_pending(task_ids):
+    """
+    Drops the pending progress of tasks saved or deleted since
+    """
+    cache.delete_many([_progress_key(task_id) for task_id in task_ids])
+
+
+def pending_progress(task_ids) -> dict:
+    """
+    Returns the {task id: progress} of the tasks with an unwritten update
+    """
+    keys = {_progress_key(task_id): task_id for task_id in task_ids}
+    return {
+        keys[key]: progress
+        for key, progress in cache.get_many(keys).items()
+    }
+
+
+def overlay_pending(items: list) -> list:
+    """
+    Replaces the progress of serialized tasks with their pending progress
+    """
+    if not items or 'id' not in items[0] or 'progress' not in items[0]:
+        return items
+
+    pending = pending_progress(item['id'] for item in items)
+    for item in items:
+        if item['id'] in pending:
+            item['progress'] = pending[item['id']]
+
+    return items
+
+
+def flush_pending(force: bool = False) -> int:
+    """
+    Writes the pending progress with bulk_update, returning the number of
+    tasks changed.
+
+    Unless forced, nothing is written before the oldest update is
+    PROGRESS_COALESCE_SECONDS old, so a burst of updates to a task is
+    written once with its last value. The dirty set is swapped out under
+    the lock and written after releasing it; the pending values are
+    dropped once written, unless replaced meanwhile, so readers see either
+    the pending or the written progress.
+    """
+    dirty = cache.get(DIRTY_KEY)
+    if not dirty or (not force and time.time() - min(dirty.values()) <
+                     settings.PROGRESS_COALESCE_SECONDS):
+        return 0
+
+    with dirty_lock():
+        dirty = cache.get(DIRTY_KEY) or {}
+        cache.delete(DIRTY_KEY)
+        pending = pending_progress(dirty)
+
+    try:
+        tasks = []
+        events = []
+        changes = []
+        for task in Task.objects.filter(pk__in=pending).only(
+                'pk', 'project', 'progress', 'path'):
+            if task.progress != pending[task.pk]:
+                delta = pending[task.pk] - task.progress
+                task.progress = pending[task.pk]
+                tasks.append(task)
+                events.append(task_event(task, task.project_id, delta))
+                changes.append((task.project_id, task.path, 0, delta))
+
+        # bulk_update skips save(), log the progress history and sum it up
+        # along the paths here
+        with transaction.atomic():
+            Task.objects.bulk_update(
+                tasks, ['progress'],
+                batch_size=settings.BULK_CREATE_BATCH_SIZE)
+            add_to_subtrees(changes)
+            buffer_events(events)
+    except Exception:
+        # Put the updates back for the next flush
+        with dirty_lock():
+            restored = cache.get(DIRTY_KEY) or {}
+            for task_id, since in dirty.items():
+                restored[task_id] = min(since, restored.get(task_id, since))
+            cache.set(DIRTY_KEY, restored, None)
+        raise
+
+    with dirty_lock():
+        written = pending_progress(pending)
+        cache.delete_many([
+            _progress_key(task_id) for task_id, progress in written.items()
+            if progress == pending[task_id]
+        ])
+
+    return len(tasks)
+
+
+@job_handler('flush_progress')
+def flush_progress_job(job: Job):
+    return {'written': flush_pending(force=True)}
+
+
+def flush_at_exit():
+    if settings.CACHE_IS_SHARED:
+        flush_pending(force=True)
+
+
+# Exiting processes, such as recycled uWSGI workers, write what is pending.
+# Registered after the progress events' handler, so it runs before it.
+atexit.register(flush_at_exit)
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import Count
+
+
+def bounded_count(queryset, limit: int) -> int:
+    """
+    Counts the rows of the queryset, but no more than limit + 1 of them, so
+    the cost is bounded whatever the size of the table
+    """
+    return queryset.order_by()[:limit + 1].count()
+
+
+def estimated_rows(model):
+    """
+    Returns the number of rows of the model's table as estimated by the
+    database statistics, None when there are none.
+
+    PostgreSQL and MySQL keep estimates up to date, SQLite only after
+    ANALYZE.
+    """
+    alias = router.db_for_read(model)
+    connection = connections[alias]
+    table = model._meta.db_table
+    queries = {
+        'postgresql':
+        "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+        'mysql': ("SELECT table_rows FROM information_schema.tables "
+                  "WHERE table_schema = DATABASE() AND table_name = %s"),
+        'sqlite': "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1",
+    }
+    if connection.vendor not in queries:
+        return None
+
+    try:
+        # A failed query must not break the surrounding transaction
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            cursor.execute(queries[connection.vendor], [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        # No statistics table, as before SQLite's first ANALYZE
+        return None
+
+    if row is None or row[0] is None:
+        return None
+    # SQLite stats start with the number of rows
+    rows = int(str(row[0]).split()[0])
+    # PostgreSQL reports -1 for tables never analyzed
+    return rows if rows >= 0 else None
+
+
+def project_counts(model, project_ids) -> dict:
+    """
+    Returns the {project id: number of rows} of the model, cached for
+    APPROXIMATE_COUNT_TIMEOUT seconds, which bounds how stale they get.
+    Projects missing from the cache are counted with one GROUP BY.
+    """
+    label = model._meta.label_lower
+    keys = {f'count:{label}:{project_id}': project_id
+            for project_id in project_ids}
+    counts = {
+        keys[key]: count
+        for key, count in cache.get_many(keys).items()
+    }
+
+    missing = [
+        project_id for project_id in keys.values() if project_id not in counts
+    ]
+    if missing:
+        counted = dict.fromkeys(missing, 0)
+        counted.update(
+            model.objects.filter(project__in=missing).order_by().values_list(
+                'project').annotate(rows=Count('pk')))
+        cache.set_many(
+            {
+                f'count:{label}:{project_id}': count
+                for project_id, count in counted.items()
+            }, settings.APPROXIMATE_COUNT_TIMEOUT)
+        counts.update(counted)
+
+    return counts
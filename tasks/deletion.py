@@ -0,0 +1,127 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+
+from tasks.caching import bump_versions
+from tasks.coalescing import discard_pending, forget_task_projects
+from tasks.jobs import enqueue, job_handler
+from tasks.models import (ArchivedTask, Job, Project, ProjectAccess, Task,
+                          TaskDependency)
+from tasks.progress import record_deleted
+
+
+def delete_project(project: Project, on_progress=None) -> int:
+    """
+    Deletes the project and its tasks, returning the number of tasks.
+
+    Tasks are deleted in chunks of DELETE_BATCH_SIZE, each in its own
+    transaction, so neither memory nor lock time grow with the project.
+    The dependencies go first, then the chunks are taken in descending path
+    order, subtasks before their parents. Nothing is left to cascade to,
+    so each chunk is a single DELETE without signals.
+    """
+    dependencies = TaskDependency.objects.filter(
+        Q(project=project) | Q(blocker__project=project)
+        | Q(blocked__project=project))
+    while True:
+        pks = list(
+            dependencies.values_list('pk',
+                                     flat=True)[:settings.DELETE_BATCH_SIZE])
+        if not pks:
+            break
+        TaskDependency.objects.filter(pk__in=pks).delete()
+
+    tasks = Task.objects.filter(project=project).order_by('-path')
+    total = tasks.count()
+    deleted = 0
+
+    while True:
+        chunk = list(
+            tasks.only('pk', 'project', 'progress')
+            [:settings.DELETE_BATCH_SIZE])
+        if not chunk:
+            break
+
+        pks = [task.pk for task in chunk]
+        with transaction.atomic():
+            chunk_tasks = Task.objects.filter(pk__in=pks)
+            chunk_tasks._raw_delete(chunk_tasks.db)
+            record_deleted(chunk)
+        # What the post_delete receivers would do
+        discard_pending(pks)
+        forget_task_projects(pks)
+
+        deleted += len(chunk)
+        if on_progress is not None:
+            on_progress(deleted, total)
+
+    # Archived tasks have nothing to cascade to, delete them in chunks too
+    archived = ArchivedTask.objects.filter(project=project)
+    while True:
+        chunk = list(
+            archived.only('pk', 'project', 'progress')
+            [:settings.DELETE_BATCH_SIZE])
+        if not chunk:
+            break
+        with transaction.atomic():
+            ArchivedTask.objects.filter(
+                pk__in=[task.pk for task in chunk]).delete()
+            record_deleted(chunk)
+
+    # Only the members and roll-ups are left to cascade
+    project.delete()
+
+    return deleted
+
+
+def start_background_deletion(project: Project, user: User) -> Job:
+    """
+    Deletes the project outside of the request.
+
+    Removing the members first hides the project from every user at once;
+    the tasks are then deleted by a background job, which gives the members
+    back if it fails for good.
+    """
+    memberships = ProjectAccess.objects.filter(project=project)
+    with transaction.atomic():
+        members = list(
+            memberships.values_list('user_id', 'membership_level'))
+        memberships.delete()
+        payload = {'project': project.pk, 'members': members}
+        return enqueue('delete_project', payload, owner=user)
+
+
+def restore_members(job: Job):
+    """
+    Gives the project back to its members after its deletion failed
+    """
+    project = Project.objects.filter(pk=job.payload['project']).first()
+    if project is None:
+        return
+
+    members = job.payload.get('members', [])
+    ProjectAccess.objects.bulk_create(
+        [
+            ProjectAccess(project=project,
+                          user_id=user_id,
+                          membership_level=membership_level)
+            for user_id, membership_level in members
+        ],
+        ignore_conflicts=True)
+    # bulk_create skips the post_save receivers
+    bump_versions([user_id for user_id, _ in members])
+
+
+@job_handler('delete_project', on_failure=restore_members)
+def delete_project_job(job: Job):
+    try:
+        project = Project.objects.get(pk=job.payload['project'])
+    except Project.DoesNotExist:
+        # Deleted by an earlier attempt
+        return {'deleted': 0}
+
+    deleted = delete_project(
+        project,
+        lambda deleted, total: job.set_progress(deleted * 100 / total))
+    return {'deleted': deleted}
@@ -0,0 +1,175 @@
+from django.conf import settings
+from django.db import transaction
+
+from tasks.caching import bump_stamps, get_response_cache, get_stamp
+from tasks.models import Project, Task, TaskDependency
+
+
+class DependencyCycle(Exception):
+    """
+    Raised when a dependency would make a task block itself
+    """
+
+
+def _reachable(edges, start: int, source: str, target: str,
+               **rank_filter) -> dict:
+    """
+    Returns the {id: rank} of the tasks reachable from the start task,
+    following the edges from their source to their target field and
+    visiting only the tasks whose rank passes the filter. One query per
+    level of the search.
+    """
+    rank_filter = {
+        f'{target}__{lookup}': value
+        for lookup, value in rank_filter.items()
+    }
+    found = {}
+    frontier = [start]
+
+    while frontier:
+        rows = edges.filter(**{
+            f'{source}__in': frontier
+        }, **rank_filter).values_list(target, f'{target}__topo_rank')
+        frontier = [pk for pk, rank in rows if pk not in found]
+        found.update(rows)
+
+    return found
+
+
+def add_dependency(blocker: Task, blocked: Task) -> TaskDependency:
+    """
+    Records that the blocker blocks the other task, keeping the topological
+    ranks of the project in order.
+
+    This is the Pearce-Kelly algorithm: an edge that already goes from a
+    lower to a higher rank needs no work. Otherwise only the tasks ranked
+    between the two ends are searched, forwards from the blocked task
+    (reaching the blocker means a cycle) and backwards from the blocker.
+    The ranks of both sets are then handed out again, the backward set
+    first, with a single UPDATE.
+    """
+    if blocker.pk == blocked.pk:
+        raise DependencyCycle("A task can't block itself")
+
+    with transaction.atomic():
+        # Serialize changes to the dependencies of a project
+        Project.objects.select_for_update().filter(
+            pk=blocker.project_id).first()
+        ranks = dict(
+            Task.objects.filter(pk__in=[blocker.pk, blocked.pk]).values_list(
+                'pk', 'topo_rank'))
+        lower, upper = ranks[blocked.pk], ranks[blocker.pk]
+
+        if lower <= upper:
+            edges = TaskDependency.objects.filter(project=blocker.project_id)
+            forward = _reachable(edges,
+                                 blocked.pk,
+                                 'blocker',
+                                 'blocked',
+                                 topo_rank__lte=upper)
+            if blocker.pk in forward:
+                raise DependencyCycle(
+                    "This dependency would make the task block itself")
+            forward[blocked.pk] = lower
+            backward = _reachable(edges,
+                                  blocker.pk,
+                                  'blocked',
+                                  'blocker',
+                                  topo_rank__gte=lower)
+            backward[blocker.pk] = upper
+
+            # Reuse the ranks of the region, blockers first
+            order = sorted(backward, key=backward.get) + sorted(
+                forward, key=forward.get)
+            pool = sorted([*backward.values(), *forward.values()])
+            tasks = [
+                Task(pk=pk, topo_rank=rank) for pk, rank in zip(order, pool)
+            ]
+            Task.objects.bulk_update(tasks, ['topo_rank'])
+
+        dependency = TaskDependency.objects.create(
+            project_id=blocker.project_id, blocker=blocker, blocked=blocked)
+
+    invalidate_critical_paths([blocker.project_id])
+    return dependency
+
+
+def remove_dependency(dependency: TaskDependency):
+    """
+    Deletes the dependency, the ranks stay in order without it
+    """
+    dependency.delete()
+    invalidate_critical_paths([dependency.project_id])
+
+
+def _critical_path_stamp_key(project_id) -> str:
+    return f'critical-path:version:{project_id}'
+
+
+def invalidate_critical_paths(project_ids):
+    """
+    Drops the cached critical paths of the projects
+    """
+    bump_stamps(
+        _critical_path_stamp_key(project_id) for project_id in project_ids)
+
+
+def compute_critical_path(project_id: int) -> dict:
+    """
+    Returns the chain of dependencies that decides when the project can be
+    completed.
+
+    A task finishes at its due date, or when its last blocker finishes if
+    that is later. Tasks are visited in topological rank order, so every
+    blocker is finished before the tasks it blocks; the path is then
+    followed back from the last task to finish, through the blocker that
+    finishes last. Tasks finishing after their due date are late.
+    """
+    tasks = Task.objects.filter(project=project_id).order_by('topo_rank')
+    blockers = {}
+    for blocker_id, blocked_id in TaskDependency.objects.filter(
+            project=project_id).values_list('blocker_id', 'blocked_id'):
+        blockers.setdefault(blocked_id, []).append(blocker_id)
+
+    due_dates = {}
+    finish = {}
+    for pk, due_date in tasks.values_list('pk', 'due_date'):
+        due_dates[pk] = due_date
+        finish[pk] = max([due_date] +
+                         [finish[blocker] for blocker in blockers.get(pk, [])])
+
+    # On ties the last task in topological order ends the path
+    path = []
+    pk = max(reversed(finish), key=finish.get, default=None)
+    while pk is not None:
+        path.append({
+            'id': pk,
+            'due_date': due_dates[pk].isoformat(),
+            'finish': finish[pk].isoformat(),
+            'late': finish[pk] > due_dates[pk]
+        })
+        pk = max(blockers.get(pk, []), key=finish.get, default=None)
+    path.reverse()
+
+    return {'finish': path[-1]['finish'] if path else None, 'path': path}
+
+
+def critical_path(project_id: int) -> dict:
+    """
+    Returns the project's critical path, cached until its dependencies or
+    due dates change when the cache is shared
+    """
+    # Other workers' stamp bumps don't reach a process-local cache
+    if not settings.CACHE_IS_SHARED:
+        return compute_critical_path(project_id)
+
+    cache = get_response_cache()
+    key = (f'critical-path:{project_id}:'
+           f'{get_stamp(_critical_path_stamp_key(project_id))}')
+
+    result = cache.get(key)
+    if result is None:
+        result = compute_critical_path(project_id)
+        cache.set(key, result, settings.CRITICAL_PATH_CACHE_TIMEOUT)
+
+    return result
@@ -0,0 +1,68 @@
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import BaseSerializer
+
+
+def parse_list_param(value: str) -> list:
+    """
+    Parses a comma separated query parameter such as ?fields=id,title
+    """
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+class SparseFieldsViewMixin:
+    """
+    View mixin for ``?fields=`` and ``?expand=`` on read requests.
+
+    The serializer is restricted to the requested fields and expands the
+    requested relations, see ``SparseFieldsMixin``. The queryset then loads
+    only the columns those fields read, and joins the relations they
+    follow, so neither unused TextFields nor N+1 queries are paid for.
+    """
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+
+        if self.request.method in SAFE_METHODS:
+            context['fields'] = set(
+                parse_list_param(self.request.query_params.get('fields')))
+            context['expand'] = set(
+                parse_list_param(self.request.query_params.get('expand')))
+
+        return context
+
+    def get_field_paths(self):
+        """
+        Returns the ORM paths of the columns read by the serializer
+        """
+        paths = []
+        for field in self.get_serializer().fields.values():
+            if isinstance(field, BaseSerializer):
+                # Expanded relation, read every column of the nested fields
+                paths.extend(f"{field.source}__{child.source}"
+                             for child in field.fields.values())
+            else:
+                paths.append(field.source.replace('.', '__'))
+        return paths
+
+    def sparse_queryset(self, queryset):
+        """
+        Restricts the queryset to the columns the response needs
+        """
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+
+        model_fields = {field.name for field in queryset.model._meta.fields}
+        paths = [
+            path for path in self.get_field_paths()
+            if path.split('__')[0] in model_fields
+        ]
+
+        # Join the relations followed by the fields
+        related = {path.rsplit('__', 1)[0] for path in paths if '__' in path}
+        if related:
+            queryset = queryset.select_related(*related)
+
+        if self.request.query_params.get('fields'):
+            queryset = queryset.only(queryset.model._meta.pk.name, *related,
+                                     *paths)
+
+        return queryset
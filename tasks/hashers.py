@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+HASHING_SLOTS_KEY = 'auth:hashing:active'
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 hasher using the iteration count from
+    ``settings.PASSWORD_PBKDF2_ITERATIONS``.
+
+    It shares the ``pbkdf2_sha256`` format, so existing hashes keep working
+    and are upgraded to the configured count on the next successful login.
+    """
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class HashingBusy(APIException):
+    """
+    Raised when all password hashing slots are in use
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many logins in progress, try again shortly'
+    default_code = 'hashing_busy'
+    wait = 1
+
+
+@contextmanager
+def hashing_slot():
+    """
+    Bounds how many requests may hash passwords at the same time.
+
+    Password hashing is deliberately CPU bound; without a bound a login
+    storm occupies every worker. The counter lives in the cache, so the
+    limit applies across worker processes only with a shared cache
+    (``CACHE_IS_SHARED``); a process-local cache bounds each process alone.
+    Raises ``HashingBusy`` when no slot is free.
+    """
+    limit = settings.PASSWORD_HASHING_CONCURRENCY
+    if not limit:
+        yield
+        return
+
+    # The timeout frees slots leaked by killed workers
+    timeout = settings.PASSWORD_HASHING_SLOT_TIMEOUT
+    cache.add(HASHING_SLOTS_KEY, 0, timeout)
+    try:
+        active = cache.incr(HASHING_SLOTS_KEY)
+    except ValueError:
+        # The counter expired in between, hash without taking a slot
+        yield
+        return
+    # incr() keeps the expiry set by add(), push it back while slots are
+    # taken so the counter does not restart at 0 under a sustained storm
+    cache.touch(HASHING_SLOTS_KEY, timeout)
+
+    try:
+        if active > limit:
+            raise HashingBusy()
+        yield
+    finally:
+        try:
+            remaining = cache.decr(HASHING_SLOTS_KEY)
+        except ValueError:
+            remaining = 0
+        if remaining < 0:
+            # Slots taken before the counter expired, never go below 0
+            cache.incr(HASHING_SLOTS_KEY, -remaining)
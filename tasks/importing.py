@@ -0,0 +1,217 @@
+import csv
+import io
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import SkipField, empty
+
+from tasks.dependencies import invalidate_critical_paths
+from tasks.jobs import enqueue, job_handler
+from tasks.models import Job, Task, root_path
+from tasks.progress import record_created
+from tasks.serializers import TaskSerializer
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# Columns validated with the TaskSerializer field of the same name
+VALIDATED_FIELDS = ('title', 'description', 'progress', 'due_date')
+
+
+def guess_format(filename: str) -> str:
+    """
+    Returns the import format matching the file extension, None if unknown
+    """
+    extension = os.path.splitext(filename or '')[1].lower()
+    return {
+        '.csv': 'csv',
+        '.ndjson': 'ndjson',
+        '.jsonl': 'ndjson'
+    }.get(extension)
+
+
+def read_rows(stream, format: str):
+    """
+    Lazily parses a binary stream into (line number, row) pairs.
+
+    Only one line is held in memory at a time. Rows that cannot be parsed
+    are yielded as a ValidationError instead of a dict.
+    """
+    if format not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format '{format}'")
+
+    text = io.TextIOWrapper(stream,
+                            encoding='utf-8-sig',
+                            errors='replace',
+                            newline='')
+    try:
+        if format == 'csv':
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_num, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = ValidationError('Invalid JSON')
+                if not isinstance(row, (dict, ValidationError)):
+                    row = ValidationError('Expected a JSON object')
+                yield line_num, row
+    finally:
+        # Leave the stream open for the caller
+        text.detach()
+
+
+class TaskImporter:
+    """
+    Validates rows against the TaskSerializer rules and writes the valid
+    ones with chunked bulk_create.
+
+    The serializer fields are instantiated once and the user's projects are
+    loaded once, so validating a row needs no query. Only the first
+    TASK_IMPORT_MAX_ERRORS errors are kept, keeping memory bounded.
+    """
+    def __init__(self, user: User, on_progress=None):
+        self.user = user
+        self.on_progress = on_progress
+        self.fields = TaskSerializer().fields
+        self.project_ids = set(user.project_set.values_list('pk',
+                                                            flat=True))
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+
+    def validate_row(self, row: dict) -> Task:
+        """
+        Returns the Task for the row, raises ValidationError if invalid
+        """
+        values = {}
+        errors = {}
+
+        for name in VALIDATED_FIELDS:
+            value = row.get(name, empty)
+            # Empty CSV cells count as missing
+            if value == '':
+                value = empty
+            try:
+                values[name] = self.fields[name].run_validation(value)
+            except SkipField:
+                pass
+            except ValidationError as exc:
+                errors[name] = exc.detail
+
+        # Only projects the user is part of are accepted
+        try:
+            project_id = int(row.get('project'))
+        except (TypeError, ValueError):
+            project_id = None
+        if project_id not in self.project_ids:
+            errors['project'] = [
+                "Could not find that project or you don't have permission"
+            ]
+
+        if errors:
+            raise ValidationError(errors)
+
+        return Task(project_id=project_id, owner=self.user, **values)
+
+    def add_error(self, line_num: int, detail):
+        self.error_count += 1
+        if len(self.errors) < settings.TASK_IMPORT_MAX_ERRORS:
+            self.errors.append({'line': line_num, 'errors': detail})
+
+    def write(self, tasks: list):
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            # bulk_create skips save(), imported tasks are roots without
+            # dependencies or subtasks
+            Task.objects.filter(pk__in=[task.pk for task in tasks]).update(
+                path=root_path(),
+                topo_rank=F('id'),
+                subtree_progress=F('progress'))
+            record_created(tasks)
+        invalidate_critical_paths({task.project_id for task in tasks})
+        self.created += len(tasks)
+        if self.on_progress is not None:
+            self.on_progress(self)
+
+    def run(self, rows) -> dict:
+        """
+        Imports the (line number, row) pairs and returns a report
+        """
+        batch = []
+
+        for line_num, row in rows:
+            try:
+                if isinstance(row, ValidationError):
+                    raise row
+                batch.append(self.validate_row(row))
+            except ValidationError as exc:
+                self.add_error(line_num, exc.detail)
+                continue
+
+            if len(batch) >= settings.BULK_CREATE_BATCH_SIZE:
+                self.write(batch)
+                batch = []
+
+        if batch:
+            self.write(batch)
+
+        return self.report()
+
+    def report(self) -> dict:
+        return {
+            'created': self.created,
+            'error_count': self.error_count,
+            'errors': self.errors
+        }
+
+
+def import_tasks(stream, format: str, user: User, on_progress=None) -> dict:
+    """
+    Imports tasks from a CSV or NDJSON binary stream for the user
+    """
+    return TaskImporter(user, on_progress).run(read_rows(stream, format))
+
+
+@job_handler('import_tasks')
+def import_tasks_job(job: Job):
+    path = job.payload['path']
+    size = os.path.getsize(path) or 1
+
+    # Imports are queued without retries, a retry would duplicate the
+    # batches already written
+    try:
+        with open(path, 'rb') as stream:
+            return import_tasks(
+                stream, job.payload['format'], job.owner,
+                lambda importer: job.set_progress(stream.tell() * 100 / size))
+    finally:
+        os.remove(path)
+
+
+def start_background_import(uploaded_file, format: str, user: User) -> Job:
+    """
+    Stores the uploaded file and queues its import
+    """
+    os.makedirs(settings.TASK_IMPORT_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=f'.{format}',
+                                dir=settings.TASK_IMPORT_DIR)
+    with os.fdopen(fd, 'wb') as destination:
+        for chunk in uploaded_file.chunks():
+            destination.write(chunk)
+
+    return enqueue('import_tasks', {
+        'path': path,
+        'format': format
+    },
+                   owner=user,
+                   max_attempts=1)
@@ -0,0 +1,183 @@
+import logging
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.dispatch import Signal
+from django.utils import timezone
+
+from tasks.models import Job
+
+logger = logging.getLogger(__name__)
+
+# Sent with the job once it has run, whatever the outcome
+job_finished = Signal()
+
+# Job kind -> handler, filled by the job_handler decorator
+HANDLERS = {}
+# Job kind -> function called once a job has failed for good
+FAILURE_HANDLERS = {}
+
+
+def job_handler(kind: str, on_failure=None):
+    """
+    Registers the decorated function as the handler of a job kind. The
+    handler is called with the Job and returns a JSON serializable result.
+
+    on_failure is called with the Job once it has run out of attempts, to
+    undo what was done when the job was queued.
+    """
+    def register(func):
+        HANDLERS[kind] = func
+        if on_failure is not None:
+            FAILURE_HANDLERS[kind] = on_failure
+        return func
+
+    return register
+
+
+def _job_failed(job: Job):
+    on_failure = FAILURE_HANDLERS.get(job.kind)
+    if on_failure is not None:
+        on_failure(job)
+
+
+def enqueue(kind: str,
+            payload: dict = None,
+            owner: User = None,
+            max_attempts: int = None) -> Job:
+    """
+    Queues a job for the worker started with ``manage.py runworker``
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+
+    return Job.objects.create(kind=kind,
+                              payload=payload or {},
+                              owner=owner,
+                              max_attempts=max_attempts
+                              or settings.JOB_MAX_ATTEMPTS)
+
+
+def claim_next_job() -> Job:
+    """
+    Marks the next due job as running and returns it, None if there is none.
+
+    The claim is a conditional UPDATE, so concurrent workers never run the
+    same job.
+    """
+    while True:
+        pk = Job.objects.filter(
+            status=Job.Status.QUEUED,
+            run_after__lte=timezone.now()).order_by(
+                'run_after', 'pk').values_list('pk', flat=True).first()
+        if pk is None:
+            return None
+
+        claimed = Job.objects.filter(pk=pk, status=Job.Status.QUEUED).update(
+            status=Job.Status.RUNNING,
+            attempts=F('attempts') + 1,
+            updated_at=timezone.now())
+        if claimed:
+            return Job.objects.get(pk=pk)
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Queues again the jobs whose worker died while running them, returning
+    how many were queued. Jobs out of attempts are marked as failed.
+    """
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING,
+        updated_at__lt=timezone.now() -
+        timedelta(seconds=settings.JOB_TIMEOUT))
+    for job in stale.filter(attempts__gte=F('max_attempts')):
+        if Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING).update(
+                status=Job.Status.FAILED,
+                error="The worker stopped while running the job",
+                updated_at=timezone.now()):
+            _job_failed(job)
+    return stale.update(status=Job.Status.QUEUED, updated_at=timezone.now())
+
+
+@contextmanager
+def heartbeat(job: Job):
+    """
+    Touches the running job every JOB_HEARTBEAT_INTERVAL seconds from
+    another thread, so long steps without progress do not look stale
+    """
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(settings.JOB_HEARTBEAT_INTERVAL):
+                try:
+                    Job.objects.filter(pk=job.pk,
+                                       status=Job.Status.RUNNING).update(
+                                           updated_at=timezone.now())
+                except DatabaseError:
+                    # Try again at the next beat, on a new connection
+                    logger.warning("Heartbeat of job %s failed",
+                                   job.pk,
+                                   exc_info=True)
+                    connection.close()
+        finally:
+            # The thread's own connection
+            connection.close()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job: Job) -> Job:
+    """
+    Runs a claimed job. Failed jobs are retried with exponential backoff
+    until they run out of attempts.
+    """
+    try:
+        with heartbeat(job):
+            result = HANDLERS[job.kind](job)
+    except Exception:
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            delay = settings.JOB_RETRY_BACKOFF * 2**(job.attempts - 1)
+            job.status = Job.Status.QUEUED
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+        else:
+            job.status = Job.Status.FAILED
+        job.save(update_fields=['status', 'error', 'run_after', 'updated_at'])
+        if job.status == Job.Status.FAILED:
+            _job_failed(job)
+    else:
+        job.status = Job.Status.DONE
+        job.progress = 100
+        job.result = result
+        job.save(
+            update_fields=['status', 'progress', 'result', 'updated_at'])
+    finally:
+        job_finished.send(sender=Job, job=job)
+
+    return job
+
+
+def run_pending_jobs() -> int:
+    """
+    Runs jobs until none is due, returning how many were run
+    """
+    count = 0
+    job = claim_next_job()
+    while job is not None:
+        run_job(job)
+        count += 1
+        job = claim_next_job()
+    return count
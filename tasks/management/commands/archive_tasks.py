@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.archiving import archive_tasks
+from tasks.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = ("Moves completed tasks past their due date to the archive, meant "
+            "to be run on a schedule")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days',
+                            type=int,
+                            help="Archive tasks due more than this many days "
+                            "ago (default: ARCHIVE_AFTER_DAYS)")
+        parser.add_argument('--background',
+                            action='store_true',
+                            help="Queue a job for the worker instead")
+
+    def handle(self, *args, **options):
+        days = options['days']
+        if days is not None and days < 0:
+            raise CommandError("--days can't be negative")
+
+        if options['background']:
+            job = enqueue('archive_tasks', {'days': days})
+            self.stdout.write(f"Queued job {job.pk}")
+            return
+
+        archived = archive_tasks(
+            days, lambda archived: self.stdout.write(
+                f"{archived} task(s) archived"))
+        self.stdout.write(f"Done, {archived} task(s) archived")
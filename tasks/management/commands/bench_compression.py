@@ -0,0 +1,86 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from tasks.middleware import BrotliCompressor, GzipCompressor, brotli
+
+
+def sample_tasks(count: int) -> list:
+    """
+    Returns serialized tasks shaped like a typical /api/tasks response
+    """
+    now = timezone.now()
+    return [{
+        'id': pk,
+        'title': f"Task {pk}: update the onboarding checklist",
+        'description': ("Go through the checklist with the team and update "
+                        f"the steps that changed in sprint {pk % 20}."),
+        'project': pk % 7 + 1,
+        'owner': f"user{pk % 13}@example.com",
+        'progress': pk * 7 % 101,
+        'due_date': (now + timedelta(hours=pk)).isoformat()
+    } for pk in range(1, count + 1)]
+
+
+class Command(BaseCommand):
+    help = "Reports compressed size and CPU cost for typical task lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks',
+                            type=int,
+                            nargs='+',
+                            default=[10, 100, 1000, 10000],
+                            help="List sizes to benchmark")
+        parser.add_argument('--levels',
+                            type=int,
+                            nargs='+',
+                            default=[1, 6, 9],
+                            help="Brotli qualities to benchmark, gzip "
+                            "uses COMPRESSION_GZIP_LEVEL")
+        parser.add_argument('--repeat',
+                            type=int,
+                            default=20,
+                            help="Compressions to average over")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'tasks':>6} {'encoding':>8} {'level':>5} "
+                          f"{'bytes':>10} {'ratio':>6} {'ms':>8}")
+
+        for count in options['tasks']:
+            content = JSONRenderer().render(sample_tasks(count))
+            self.stdout.write(f"{count:>6} {'identity':>8} {'-':>5} "
+                              f"{len(content):>10} {1:>6.2f} {0:>8.3f}")
+
+            # Gzip as compressed by CompressionMiddleware
+            started = time.process_time()
+            for _ in range(options['repeat']):
+                compressor = GzipCompressor(max_random_bytes=100)
+                compressed = compressor.compress(content) + compressor.finish()
+            elapsed = (time.process_time() - started) / options['repeat']
+            self.report(count, 'gzip', settings.COMPRESSION_GZIP_LEVEL,
+                        content, compressed, elapsed)
+
+            if brotli is None:
+                continue
+            for level in options['levels']:
+                with override_settings(COMPRESSION_BROTLI_QUALITY=level):
+                    started = time.process_time()
+                    for _ in range(options['repeat']):
+                        compressor = BrotliCompressor()
+                        compressed = (compressor.compress(content) +
+                                      compressor.finish())
+                    elapsed = ((time.process_time() - started) /
+                               options['repeat'])
+                self.report(count, 'br', level, content, compressed, elapsed)
+
+    def report(self, count: int, encoding: str, level: int, content: bytes,
+               compressed: bytes, elapsed: float):
+        self.stdout.write(f"{count:>6} {encoding:>8} {level:>5} "
+                          f"{len(compressed):>10} "
+                          f"{len(content) / len(compressed):>6.2f} "
+                          f"{elapsed * 1000:>8.3f}")
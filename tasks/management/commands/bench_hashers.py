@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+
+class Command(BaseCommand):
+    help = "Reports password checks (logins) per second for each hasher"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration',
+                            type=float,
+                            default=2.0,
+                            help="Seconds to benchmark each hasher")
+        parser.add_argument('--workers',
+                            type=int,
+                            default=4,
+                            help="Worker processes to extrapolate for")
+        parser.add_argument('--hasher',
+                            action='append',
+                            choices=list(settings.PASSWORD_HASHER_CHOICES),
+                            help="Hasher to benchmark, repeatable "
+                            "(default: all available)")
+
+    def handle(self, *args, **options):
+        names = options['hasher'] or list(settings.PASSWORD_HASHER_CHOICES)
+
+        workers = f"x{options['workers']} workers"
+        self.stdout.write(f"{'hasher':<10} {'ms/login':>10} "
+                          f"{'logins/s':>10} {workers:>12}")
+
+        for name in names:
+            path = settings.PASSWORD_HASHER_CHOICES[name]
+            with override_settings(PASSWORD_HASHERS=[path]):
+                try:
+                    encoded = make_password('correct horse battery staple')
+                except ValueError as exc:
+                    # Optional hasher library is not installed
+                    self.stdout.write(f"{name:<10} skipped: {exc}")
+                    continue
+
+                # Check the password repeatedly, like a login would
+                count = 0
+                started = time.perf_counter()
+                elapsed = 0.0
+                while elapsed < options['duration']:
+                    check_password('correct horse battery staple', encoded)
+                    count += 1
+                    elapsed = time.perf_counter() - started
+
+            rate = count / elapsed
+            self.stdout.write(f"{name:<10} {1000 / rate:>10.1f} "
+                              f"{rate:>10.1f} "
+                              f"{rate * options['workers']:>12.1f}")
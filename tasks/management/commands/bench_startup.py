@@ -0,0 +1,98 @@
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Run in a fresh interpreter: loads the WSGI application, then times the
+# first and the second request through it
+PROBE = '''
+import sys, time, wsgiref.util
+
+start = time.perf_counter()
+from spizy.wsgi import application
+loaded = time.perf_counter()
+
+
+def request(path):
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path}
+    wsgiref.util.setup_testing_defaults(environ)
+    begin = time.perf_counter()
+    b''.join(application(environ, lambda status, headers: None))
+    return time.perf_counter() - begin
+
+
+first = request(sys.argv[1])
+second = request(sys.argv[1])
+print(loaded - start, first, second)
+'''
+
+
+class Command(BaseCommand):
+    help = ("Reports import time by package and the first-request latency "
+            "of fresh WSGI processes with and without warm-up")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path',
+                            default='/api/check-login',
+                            help="Path of the timed requests")
+        parser.add_argument('--repeat',
+                            type=int,
+                            default=5,
+                            help="Fresh processes to take the median over")
+        parser.add_argument('--top',
+                            type=int,
+                            default=15,
+                            help="Packages to list in the import report")
+
+    def run_python(self, args, warmup: bool) -> subprocess.CompletedProcess:
+        env = {
+            **os.environ, 'DJANGO_SETTINGS_MODULE': 'spizy.settings',
+            'WARMUP': str(warmup).lower()
+        }
+        return subprocess.run([sys.executable, *args],
+                              cwd=settings.BASE_DIR,
+                              env=env,
+                              capture_output=True,
+                              text=True,
+                              check=True)
+
+    def import_report(self, top: int):
+        # -X importtime writes "self | cumulative | module" lines in us
+        result = self.run_python(
+            ['-X', 'importtime', '-c', 'from spizy.wsgi import application'],
+            warmup=True)
+        packages = defaultdict(int)
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            own, _, module = line[len('import time:'):].split('|')
+            packages[module.strip().split('.')[0]] += int(own)
+
+        self.stdout.write(f"{'package':<24} {'import ms':>10}")
+        for package, own in sorted(packages.items(),
+                                   key=lambda item: item[1],
+                                   reverse=True)[:top]:
+            self.stdout.write(f"{package:<24} {own / 1000:>10.1f}")
+        self.stdout.write(
+            f"{'total':<24} {sum(packages.values()) / 1000:>10.1f}\n")
+
+    def handle(self, *args, **options):
+        self.import_report(options['top'])
+
+        self.stdout.write(f"{'warmup':>6} {'load ms':>9} {'first ms':>9} "
+                          f"{'second ms':>9}")
+        for warmup in (False, True):
+            timings = [
+                map(float,
+                    self.run_python(['-c', PROBE, options['path']],
+                                    warmup).stdout.split())
+                for _ in range(options['repeat'])
+            ]
+            load, first, second = (statistics.median(column) * 1000
+                                   for column in zip(*timings))
+            self.stdout.write(f"{'on' if warmup else 'off':>6} {load:>9.1f} "
+                              f"{first:>9.1f} {second:>9.1f}")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tasks.coalescing import flush_pending
+
+
+class Command(BaseCommand):
+    help = ("Writes the pending coalesced progress updates right away, such "
+            "as before a deploy")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{flush_pending(force=True)} task(s) updated")
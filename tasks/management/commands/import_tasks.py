@@ -0,0 +1,36 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importing import IMPORT_FORMATS, guess_format, import_tasks
+
+
+class Command(BaseCommand):
+    help = "Imports tasks from a CSV or NDJSON file on behalf of a user"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import")
+        parser.add_argument('--user',
+                            required=True,
+                            help="Username owning the imported tasks")
+        parser.add_argument('--format',
+                            choices=IMPORT_FORMATS,
+                            help="File format (default: from the extension)")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist")
+
+        format = options['format'] or guess_format(options['path'])
+        if format is None:
+            raise CommandError("Could not guess the format, use --format")
+
+        with open(options['path'], 'rb') as stream:
+            report = import_tasks(
+                stream, format, user, lambda importer: self.stdout.write(
+                    f"{importer.created} task(s) imported"))
+
+        self.stdout.write(json.dumps(report, indent=2, default=str))
@@ -0,0 +1,445 @@
+import http.client
+import importlib.util
+import json
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import (ThreadedWSGIServer,
+                                          WSGIRequestHandler)
+from django.db import connections
+from django.db.models import F
+from django.utils import timezone
+
+from tasks.authentication import issue_token
+from tasks.deletion import delete_project
+from tasks.models import Project, ProjectAccess, Task, root_path
+
+SCENARIOS = ('login', 'list', 'browse', 'create', 'patch', 'membership')
+DEFAULT_MIX = 'login=1,list=4,browse=2,create=2,patch=4,membership=1'
+PASSWORD = 'loadtest-password'
+
+
+def parse_mix(value: str) -> dict:
+    """
+    Parses "scenario=weight,..." into {scenario: weight}
+    """
+    mix = {}
+    for part in filter(None, value.split(',')):
+        name, _, weight = part.partition('=')
+        if name not in SCENARIOS:
+            raise CommandError(f"Unknown scenario '{name}', use one of "
+                               f"{', '.join(SCENARIOS)}")
+        try:
+            mix[name] = int(weight or 1)
+        except ValueError:
+            raise CommandError(f"Invalid weight '{weight}' for '{name}'")
+    if not any(mix.values()):
+        raise CommandError("The mix needs a scenario with a weight above 0")
+    return mix
+
+
+def client_address(index: int) -> str:
+    """
+    Returns the loopback address a client connects from, so per-IP rate
+    limits apply to each client rather than to all of them
+    """
+    return f'127.0.{index // 254}.{index % 254 + 1}'
+
+
+def has_loopback_aliases() -> bool:
+    """
+    Returns whether the addresses of 127.0.0.0/8 other than 127.0.0.1 can be
+    bound, as on Linux
+    """
+    try:
+        with socket.socket() as probe:
+            probe.bind((client_address(1), 0))
+        return True
+    except OSError:
+        return False
+
+
+def percentile(values: list, percent: float) -> float:
+    """
+    Returns the nearest-rank percentile of sorted values
+    """
+    if not values:
+        return 0.0
+    rank = max(1, round(percent / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_wsgi(listener: socket.socket):
+    """
+    Worker process: serves the WSGI application on the shared socket with
+    one thread per connection, like a uWSGI worker
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from spizy.wsgi import application
+
+    host, port = listener.getsockname()[:2]
+    server = ThreadedWSGIServer((host, port),
+                                QuietRequestHandler,
+                                bind_and_activate=False)
+    server.socket.close()
+    server.socket = listener
+    server.server_name, server.server_port = host, port
+    server.setup_environ()
+    server.set_app(application)
+    server.serve_forever()
+
+
+class Client(threading.Thread):
+    """
+    Simulated client replaying the scenario mix as one seeded user
+    """
+    def __init__(self, address, source: str, user: dict, mix: dict,
+                 deadline: float, seed: int):
+        super().__init__(daemon=True)
+        self.address = address
+        self.source = source
+        self.user = user
+        self.scenarios = list(mix)
+        self.weights = list(mix.values())
+        self.deadline = deadline
+        self.random = random.Random(seed)
+        # (scenario, status, seconds) of every request
+        self.results = []
+
+    def request(self, scenario: str, method: str, path: str, body=None):
+        connection = http.client.HTTPConnection(*self.address,
+                                                timeout=30,
+                                                source_address=(self.source,
+                                                                0))
+        headers = {'Content-Type': 'application/json'}
+        if scenario != 'login':
+            headers['Authorization'] = f"Bearer {self.user['token']}"
+
+        start = time.perf_counter()
+        try:
+            connection.request(method, path,
+                               None if body is None else json.dumps(body),
+                               headers)
+            response = connection.getresponse()
+            content = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            content, status = b'', 0
+        finally:
+            connection.close()
+        self.results.append((scenario, status, time.perf_counter() - start))
+
+        try:
+            return json.loads(content) if 200 <= status < 300 else None
+        except ValueError:
+            return None
+
+    def login(self):
+        self.request('login', 'POST', '/api/token', {
+            'username': self.user['username'],
+            'password': PASSWORD
+        })
+
+    def list(self):
+        self.request('list', 'GET', '/api/tasks/mine?page_size=50')
+
+    def browse(self):
+        # Uncached, unlike the user's own tasks
+        offset = self.random.randrange(max(1, len(self.user['tasks'])))
+        self.request('browse', 'GET',
+                     f'/api/tasks?limit=50&offset={offset // 50 * 50}')
+
+    def create(self):
+        task = self.request(
+            'create', 'POST', '/api/tasks', {
+                'title': 'Load test task',
+                'description': 'Created by manage.py loadtest',
+                'project': self.user['project']
+            })
+        if task is not None:
+            self.user['tasks'].append(task['id'])
+
+    def patch(self):
+        if not self.user['tasks']:
+            return self.create()
+        task_id = self.random.choice(self.user['tasks'])
+        self.request('patch', 'PATCH', f'/api/task/{task_id}',
+                     {'progress': self.random.randint(0, 100)})
+
+    def membership(self):
+        access = self.request(
+            'membership', 'POST', '/api/project-access', {
+                'project': self.user['project'],
+                'user': self.user['peer'],
+                'membership_level': ProjectAccess.MembershipLevel.MEMBER
+            })
+        if access is not None:
+            self.request('membership', 'DELETE',
+                         f"/api/project-access/{access['id']}")
+
+    def run(self):
+        while time.monotonic() < self.deadline:
+            scenario = self.random.choices(self.scenarios, self.weights)[0]
+            getattr(self, scenario)()
+
+
+class Command(BaseCommand):
+    help = ("Boots the app on a local port and replays a scenario mix from "
+            "concurrent clients, reporting throughput, latency and errors. "
+            "It migrates and writes to the configured database, set DB_ENGINE "
+            "and DB_NAME to a scratch one.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server',
+                            choices=['wsgi', 'asgi'],
+                            default='wsgi',
+                            help="wsgi: pre-forked threaded wsgiref workers, "
+                            "asgi: uvicorn workers (needs uvicorn)")
+        parser.add_argument('--processes',
+                            type=int,
+                            default=4,
+                            help="Server processes, uwsgi.ini runs 4")
+        parser.add_argument('--clients',
+                            type=int,
+                            default=16,
+                            help="Concurrent clients, one user each")
+        parser.add_argument('--duration',
+                            type=float,
+                            default=10,
+                            help="Seconds to run the clients for")
+        parser.add_argument('--mix',
+                            default=DEFAULT_MIX,
+                            help="Weighted scenarios, from "
+                            f"{', '.join(SCENARIOS)} (default: {DEFAULT_MIX})")
+        parser.add_argument('--tasks',
+                            type=int,
+                            default=200,
+                            help="Tasks seeded in each client's project")
+        parser.add_argument('--port',
+                            type=int,
+                            default=0,
+                            help="Port to listen on (default: any free one)")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--yes',
+                            action='store_true',
+                            help="Confirm migrating and writing to the "
+                            "configured database")
+        parser.add_argument('--keep',
+                            action='store_true',
+                            help="Keep the seeded users and projects")
+        parser.add_argument('--json',
+                            action='store_true',
+                            help="Print the report as JSON")
+
+    def seed(self, clients: int, tasks: int) -> list:
+        """
+        Creates one user owning one project of tasks per client, each paired
+        with the next user for the membership scenario
+        """
+        now = timezone.now()
+        users = []
+        for i in range(clients):
+            user = User(username=f'loadtest-{i}@example.com',
+                        email=f'loadtest-{i}@example.com')
+            user.set_password(PASSWORD)
+            user.save()
+            project = Project.objects.create(title=f'Load test {i}',
+                                             description='manage.py loadtest')
+            ProjectAccess.objects.create(
+                project=project,
+                user=user,
+                membership_level=ProjectAccess.MembershipLevel.OWNER)
+            created = Task.objects.bulk_create(
+                [
+                    Task(title=f'Task {j}',
+                         description='Seeded by manage.py loadtest',
+                         project=project,
+                         owner=user,
+                         due_date=now + timedelta(days=j % 60))
+                    for j in range(tasks)
+                ],
+                batch_size=settings.BULK_CREATE_BATCH_SIZE)
+            users.append({
+                'username': user.username,
+                'token': issue_token(user),
+                'project': project.pk,
+                'tasks': [task.pk for task in created]
+            })
+
+        # bulk_create skips save(), seeded tasks are roots
+        Task.objects.filter(
+            project__in=[user['project'] for user in users]).update(
+                path=root_path(), topo_rank=F('id'))
+        for i, user in enumerate(users):
+            user['peer'] = users[(i + 1) % len(users)]['username']
+
+        return users
+
+    def cleanup(self, users: list):
+        for project in Project.objects.filter(
+                pk__in=[user['project'] for user in users]):
+            delete_project(project)
+        User.objects.filter(
+            username__in=[user['username'] for user in users]).delete()
+
+    def start_server(self, options, listener: socket.socket) -> list:
+        """
+        Starts the server processes, returns them once the port answers
+        """
+        if options['server'] == 'wsgi':
+            # Workers must not inherit this process' connections
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            workers = [
+                context.Process(target=serve_wsgi, args=(listener, ))
+                for _ in range(options['processes'])
+            ]
+            for worker in workers:
+                worker.start()
+        else:
+            workers = [
+                subprocess.Popen([
+                    sys.executable, '-m', 'uvicorn', 'spizy.asgi:application',
+                    '--fd',
+                    str(listener.fileno()), '--workers',
+                    str(options['processes']), '--no-access-log',
+                    '--log-level', 'warning'
+                ],
+                                 cwd=settings.BASE_DIR,
+                                 env=os.environ.copy(),
+                                 pass_fds=[listener.fileno()])
+            ]
+
+        # Wait until a worker accepts and answers
+        address = listener.getsockname()[:2]
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                connection = http.client.HTTPConnection(*address, timeout=5)
+                connection.request('GET', '/api/csrftoken')
+                connection.getresponse().read()
+                connection.close()
+                return workers
+            except OSError:
+                if time.monotonic() > deadline:
+                    self.stop_server(workers)
+                    raise CommandError("The server did not start")
+                time.sleep(0.1)
+
+    def stop_server(self, workers: list):
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            if hasattr(worker, 'join'):
+                worker.join()
+            else:
+                worker.wait()
+
+    def report(self, results: list, elapsed: float) -> dict:
+        by_scenario = defaultdict(list)
+        for scenario, status, seconds in results:
+            by_scenario[scenario].append((status, seconds))
+            by_scenario['total'].append((status, seconds))
+
+        report = {}
+        for scenario, rows in by_scenario.items():
+            latencies = sorted(seconds * 1000 for status, seconds in rows)
+            report[scenario] = {
+                'requests': len(rows),
+                'throughput': len(rows) / elapsed,
+                'errors': sum(1 for status, _ in rows
+                              if status == 0 or status >= 500),
+                'rejected': sum(1 for status, _ in rows
+                                if 400 <= status < 500),
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99)
+            }
+        return report
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'])
+        if (options['server'] == 'asgi'
+                and importlib.util.find_spec('uvicorn') is None):
+            raise CommandError("--server asgi needs uvicorn installed")
+        if options['clients'] < 2 and mix.get('membership'):
+            raise CommandError("The membership scenario needs 2 clients")
+
+        database = settings.DATABASES['default']
+        self.stdout.write(f"Database: {database['ENGINE']} {database['NAME']}")
+        if not options['yes']:
+            raise CommandError(
+                "The load test migrates and writes to this database, point "
+                "DB_ENGINE and DB_NAME to a scratch one and pass --yes")
+
+        if has_loopback_aliases():
+            sources = [client_address(i) for i in range(options['clients'])]
+        else:
+            self.stderr.write("Clients share 127.0.0.1, per-IP rate limits "
+                              "will reject some of their requests")
+            sources = ['127.0.0.1'] * options['clients']
+
+        call_command('migrate', verbosity=0)
+        users = self.seed(options['clients'], options['tasks'])
+
+        listener = socket.create_server(('127.0.0.1', options['port']),
+                                        backlog=1024)
+        try:
+            workers = self.start_server(options, listener)
+            try:
+                start = time.monotonic()
+                clients = [
+                    Client(listener.getsockname()[:2], sources[i], user, mix,
+                           start + options['duration'], options['seed'] + i)
+                    for i, user in enumerate(users)
+                ]
+                for client in clients:
+                    client.start()
+                for client in clients:
+                    client.join()
+                elapsed = time.monotonic() - start
+            finally:
+                self.stop_server(workers)
+        finally:
+            listener.close()
+            if not options['keep']:
+                self.cleanup(users)
+
+        report = self.report(
+            [result for client in clients for result in client.results],
+            elapsed)
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"{options['server']} with {options['processes']} "
+                          f"process(es), {options['clients']} client(s) "
+                          f"for {elapsed:.1f}s")
+        self.stdout.write(f"{'scenario':<12} {'requests':>8} {'req/s':>8} "
+                          f"{'errors':>6} {'4xx':>6} {'p50 ms':>8} "
+                          f"{'p95 ms':>8} {'p99 ms':>8}")
+        for scenario, row in sorted(report.items(),
+                                    key=lambda item: item[0] == 'total'):
+            self.stdout.write(
+                f"{scenario:<12} {row['requests']:>8} "
+                f"{row['throughput']:>8.1f} {row['errors']:>6} "
+                f"{row['rejected']:>6} {row['p50']:>8.1f} "
+                f"{row['p95']:>8.1f} {row['p99']:>8.1f}")
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from tasks.jobs import enqueue
+from tasks.progress import rollup_progress
+
+
+class Command(BaseCommand):
+    help = ("Sums up new progress events into the daily and weekly burndown "
+            "roll-ups, meant to be run on a schedule")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--background',
+                            action='store_true',
+                            help="Queue a job for the worker instead")
+
+    def handle(self, *args, **options):
+        if options['background']:
+            job = enqueue('rollup_progress')
+            self.stdout.write(f"Queued job {job.pk}")
+            return
+
+        events = rollup_progress(lambda events: self.stdout.write(
+            f"{events} event(s) rolled up"))
+        self.stdout.write(f"Done, {events} event(s) rolled up")
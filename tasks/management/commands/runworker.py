@@ -0,0 +1,98 @@
+import multiprocessing
+import signal
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from tasks.coalescing import flush_pending
+from tasks.jobs import (claim_next_job, requeue_stale_jobs, run_job,
+                        run_pending_jobs)
+from tasks.progress import flush_events
+
+
+def work(poll_interval: float):
+    """
+    Worker process loop, runs jobs until terminated
+    """
+    # Never share the parent's database connections
+    connections.close_all()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Unwind on terminate(), so run_job() writes what it buffered
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit())
+
+    while True:
+        close_old_connections()
+        job = claim_next_job()
+        if job is None:
+            time.sleep(poll_interval)
+        else:
+            run_job(job)
+
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs in a pool of worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes',
+                            type=int,
+                            default=settings.JOB_WORKER_PROCESSES,
+                            help="Number of worker processes")
+        parser.add_argument('--poll-interval',
+                            type=float,
+                            default=settings.JOB_POLL_INTERVAL,
+                            help="Seconds to wait when no job is due")
+        parser.add_argument('--once',
+                            action='store_true',
+                            help="Run the jobs due now in this process, "
+                            "then exit")
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s)")
+
+        if options['once']:
+            self.stdout.write(f"Ran {run_pending_jobs()} job(s)")
+            return
+
+        # Children must open their own connections
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=work,
+                                    args=(options['poll_interval'], ),
+                                    daemon=True)
+            for _ in range(options['processes'])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f"Started {len(workers)} worker(s)")
+
+        try:
+            while True:
+                # Replace crashed workers, their jobs go stale and are
+                # queued again
+                for i, worker in enumerate(workers):
+                    if not worker.is_alive():
+                        workers[i] = multiprocessing.Process(
+                            target=work,
+                            args=(options['poll_interval'], ),
+                            daemon=True)
+                        workers[i].start()
+
+                close_old_connections()
+                requeue_stale_jobs()
+                # Write the coalesced progress updates even when no request
+                # comes to do it
+                flush_pending()
+                flush_events()
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers")
+        finally:
+            for worker in workers:
+                worker.terminate()
+            for worker in workers:
+                worker.join()
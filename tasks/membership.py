@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+
+# Attribute holding the memoized project ids on the user object
+PROJECT_IDS_ATTR = '_member_project_ids'
+
+
+def user_project_ids(user: User) -> list:
+    """
+    Returns the ids of the projects the user is part of.
+
+    The ids are memoized on the user object, which lives for one request, so
+    every queryset and permission check of that request shares one lookup.
+    """
+    project_ids = getattr(user, PROJECT_IDS_ATTR, None)
+
+    if project_ids is None:
+        project_ids = list(user.project_set.values_list('pk', flat=True))
+        setattr(user, PROJECT_IDS_ATTR, project_ids)
+
+    return project_ids
+
+
+def forget_project_ids(user: User):
+    """
+    Drops the memoized project ids after the user's memberships changed
+    """
+    if hasattr(user, PROJECT_IDS_ATTR):
+        delattr(user, PROJECT_IDS_ATTR)
@@ -0,0 +1,218 @@
+import gzip
+import re
+import secrets
+import struct
+import zlib
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+
+from tasks.routers import replica_reads
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+re_compressible = re.compile(
+    r'^(text/|application/(json|javascript|xml)|application/\S+\+json)')
+
+
+class BrotliCompressor:
+    encoding = 'br'
+
+    def __init__(self):
+        self.compressor = brotli.Compressor(
+            quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class GzipCompressor:
+    """
+    Gzip at COMPRESSION_GZIP_LEVEL, with the BREACH mitigation of Django's
+    GZipMiddleware: a file name of random length in the header varies the
+    length of the compressed response
+    """
+    encoding = 'gzip'
+
+    def __init__(self, max_random_bytes: int):
+        self.compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL,
+                                           zlib.DEFLATED, -zlib.MAX_WBITS)
+        self.crc = 0
+        self.size = 0
+        # Magic, deflate, file name flag, no mtime, no extra flags, unknown OS
+        self.header = (b'\x1f\x8b\x08' + bytes([gzip.FNAME]) +
+                       b'\x00\x00\x00\x00\x00\xff' +
+                       b'a' * secrets.randbelow(max_random_bytes) + b'\x00')
+
+    def compress(self, data: bytes) -> bytes:
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        header, self.header = self.header, b''
+        return header + self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        header, self.header = self.header, b''
+        return (header + self.compressor.flush() +
+                struct.pack('<LL', self.crc, self.size & 0xffffffff))
+
+
+# Supported encodings, most preferred first
+ENCODINGS = ['gzip']
+if brotli is not None:
+    ENCODINGS.insert(0, 'br')
+
+
+def choose_encoding(accept_encoding: str, encodings=ENCODINGS):
+    """
+    Returns the preferred of the encodings accepted by the client, None if
+    the client accepts none of them
+    """
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        match = re.search(r'q=([0-9.]+)', params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def has_credentials(request) -> bool:
+    """
+    Returns whether the request carries a session or a token, so its
+    response may hold secrets
+    """
+    return ('HTTP_AUTHORIZATION' in request.META
+            or settings.SESSION_COOKIE_NAME in request.COOKIES)
+
+
+def compress_sequence(compressor, sequence):
+    """
+    Compresses a streamed response chunk by chunk. Every chunk is flushed
+    so clients receive data as soon as it is produced.
+    """
+    for chunk in sequence:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def compress_async_sequence(compressor, sequence):
+    async for chunk in sequence:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Django's GZipMiddleware, with its BREACH length randomization, at
+    COMPRESSION_GZIP_LEVEL, that prefers brotli (when installed) if the
+    client accepts it.
+
+    Brotli has no header to randomize the length with, so it is only used
+    for requests without credentials, whose responses hold no secrets.
+    Only text and JSON responses are compressed, and only from
+    COMPRESSION_MIN_SIZE bytes, since compressing smaller ones costs more
+    CPU than the bytes it saves. Accept-Encoding quality values are
+    honoured.
+    """
+    def process_response(self, request, response):
+        # Avoid compressing twice or compressing binary content
+        if response.has_header('Content-Encoding'):
+            return response
+        if not re_compressible.match(response.get('Content-Type', '')):
+            return response
+        if (not response.streaming
+                and len(response.content) < settings.COMPRESSION_MIN_SIZE):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding', ))
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''),
+            ['gzip'] if has_credentials(request) else ENCODINGS)
+        if encoding is None:
+            return response
+        if encoding == 'gzip':
+            compressor = GzipCompressor(self.max_random_bytes)
+        else:
+            compressor = BrotliCompressor()
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_sequence(
+                    compressor, response.streaming_content)
+            else:
+                response.streaming_content = compress_sequence(
+                    compressor, response.streaming_content)
+            # The compressed size is unknown until streamed
+            del response.headers['Content-Length']
+        else:
+            content = (compressor.compress(response.content) +
+                       compressor.finish())
+            # Return the compressed content only if it's actually shorter
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        # Compressed bodies may only carry weak ETags
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = compressor.encoding
+
+        return response
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """
+    Lets safe-method requests read from the replicas, see
+    tasks.routers.ReplicaRouter.
+
+    Clients that wrote within the last PRIMARY_PIN_SECONDS carry a cookie
+    pinning their reads to the primary, so they see their own writes.
+    """
+    def process_request(self, request):
+        use_replica = (request.method in SAFE_METHODS and
+                       settings.PRIMARY_PIN_COOKIE not in request.COOKIES)
+        request._replica_reads_token = replica_reads.set(use_replica)
+
+    def process_response(self, request, response):
+        token = getattr(request, '_replica_reads_token', None)
+        if token is not None:
+            replica_reads.reset(token)
+
+        if request.method not in SAFE_METHODS and settings.DATABASE_REPLICAS:
+            response.set_cookie(settings.PRIMARY_PIN_COOKIE,
+                                '1',
+                                max_age=settings.PRIMARY_PIN_SECONDS,
+                                httponly=True,
+                                samesite='Lax')
+
+        return response
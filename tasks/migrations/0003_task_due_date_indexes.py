@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', 'due_date', 'id'], name='tasks_task_owner_i_c8253c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'due_date', 'id'], name='tasks_task_project_eddb47_idx'),
+        ),
+    ]
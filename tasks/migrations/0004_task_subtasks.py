@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Cast, LPad
+
+
+def set_root_paths(apps, schema_editor):
+    # Existing tasks have no parent, their path is their id padded to 10
+    # digits. Computed here so later changes to the models can't alter it.
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.update(
+        path=LPad(Cast('id', models.TextField()), 10, models.Value('0')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_due_date_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='depth',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='subtasks', to='tasks.task'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='path',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(set_root_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'path'], name='tasks_task_project_b97bfd_idx'),
+        ),
+    ]
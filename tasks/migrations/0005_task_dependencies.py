@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def set_topo_ranks(apps, schema_editor):
+    # Without dependencies any distinct ranks are a topological order
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.update(topo_rank=models.F('id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_subtasks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='topo_rank',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(set_topo_ranks, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='TaskDependency',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('blocked', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocked_by', to='tasks.task')),
+                ('blocker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocks', to='tasks.task')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tasks.project')),
+            ],
+            options={
+                'verbose_name': 'task dependency',
+                'verbose_name_plural': 'task dependencies',
+                'unique_together': {('blocker', 'blocked')},
+            },
+        ),
+    ]
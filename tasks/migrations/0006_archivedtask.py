@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_dependencies'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('title', models.TextField()),
+                ('description', models.TextField()),
+                ('progress', models.IntegerField(default=100)),
+                ('due_date', models.DateTimeField()),
+                ('path', models.TextField(default='')),
+                ('depth', models.IntegerField(default=0)),
+                ('topo_rank', models.BigIntegerField(default=0)),
+                ('owner', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_tasks', to=settings.AUTH_USER_MODEL)),
+                ('parent', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.task')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to='tasks.project')),
+            ],
+            options={
+                'verbose_name': 'archived task',
+                'verbose_name_plural': 'archived tasks',
+                'indexes': [models.Index(fields=['project', 'path'], name='tasks_archi_project_2ec0ec_idx')],
+            },
+        ),
+    ]
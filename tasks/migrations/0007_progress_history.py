@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:23
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def log_existing_tasks(apps, schema_editor):
+    # The history starts with the tasks as they are now
+    Task = apps.get_model('tasks', 'Task')
+    ProgressEvent = apps.get_model('tasks', 'ProgressEvent')
+    now = django.utils.timezone.now()
+    events = []
+    for pk, project_id, progress in Task.objects.values_list(
+            'pk', 'project_id', 'progress').iterator():
+        events.append(
+            ProgressEvent(project_id=project_id,
+                          task_id=pk,
+                          progress=progress,
+                          delta=progress,
+                          added=1,
+                          created_at=now))
+        if len(events) == 1000:
+            ProgressEvent.objects.bulk_create(events)
+            events = []
+    ProgressEvent.objects.bulk_create(events)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_archivedtask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgressEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('project_id', models.IntegerField()),
+                ('task_id', models.IntegerField()),
+                ('progress', models.IntegerField()),
+                ('delta', models.IntegerField()),
+                ('added', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'progress event',
+                'verbose_name_plural': 'progress events',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProgressRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week')], max_length=8)),
+                ('start', models.DateField()),
+                ('delta', models.IntegerField(default=0)),
+                ('added', models.IntegerField(default=0)),
+                ('events', models.IntegerField(default=0)),
+                ('last_event_id', models.BigIntegerField(db_index=True, default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress_rollups', to='tasks.project')),
+            ],
+            options={
+                'verbose_name': 'progress rollup',
+                'verbose_name_plural': 'progress rollups',
+                'unique_together': {('project', 'period', 'start')},
+            },
+        ),
+        migrations.RunPython(log_existing_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:14
+
+from django.db import migrations, models
+
+
+def set_subtree_totals(apps, schema_editor):
+    # Sum the subtrees up from the leaves, one project at a time
+    Task = apps.get_model('tasks', 'Task')
+    project_ids = Task.objects.values_list('project_id',
+                                           flat=True).distinct()
+    for project_id in project_ids:
+        totals = {}
+        for pk, parent_id, progress in Task.objects.filter(
+                project_id=project_id).order_by('-depth').values_list(
+                    'pk', 'parent_id', 'progress').iterator():
+            total = totals.setdefault(pk, [0, 0])
+            total[0] += 1
+            total[1] += progress
+            if parent_id is not None:
+                parent = totals.setdefault(parent_id, [0, 0])
+                parent[0] += total[0]
+                parent[1] += total[1]
+
+        Task.objects.bulk_update([
+            Task(pk=pk, subtree_tasks=tasks, subtree_progress=progress)
+            for pk, (tasks, progress) in totals.items()
+            if (tasks, progress) != (1, 0)
+        ], ['subtree_tasks', 'subtree_progress'],
+                                 batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtask',
+            name='subtree_tasks',
+            field=models.IntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='subtree_progress',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='subtree_tasks',
+            field=models.IntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='subtree_progress',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(set_subtree_totals, migrations.RunPython.noop),
+    ]
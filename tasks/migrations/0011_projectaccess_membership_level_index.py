@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_task_subtree_totals'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectaccess',
+            index=models.Index(fields=['membership_level', 'id'], name='tasks_proje_members_a00361_idx'),
+        ),
+    ]
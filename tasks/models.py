@@ -1,10 +1,72 @@
+from collections import defaultdict
+
 from django.utils import timezone
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Cast, Concat, LPad, Substr
 from django.shortcuts import reverse
 
+# Digits per task in a materialized path, ids are zero-padded to this width
+PATH_STEP = 10
+
+
+def path_segment(pk: int) -> str:
+    return str(pk).zfill(PATH_STEP)
+
+
+def root_path():
+    """
+    Returns the database expression of the path of a task without parent
+    """
+    return LPad(Cast('id', models.TextField()), PATH_STEP, models.Value('0'))
+
+
+def subtree_lookup(project_id: int, path: str) -> dict:
+    """
+    Returns the filter of the tasks whose path starts with the given one.
+
+    Paths are digits only, so every collation orders them like strings and
+    the subtree is the (project, path) index range [path, upper), upper
+    being the path with its last non-9 digit incremented.
+    """
+    lookup = {'project_id': project_id, 'path__gte': path}
+    stripped = path.rstrip('9')
+    if stripped:
+        lookup['path__lt'] = stripped[:-1] + str(int(stripped[-1]) + 1)
+    return lookup
+
+
+def add_to_subtrees(changes):
+    """
+    Adds to the subtree totals of tasks and of their ancestors, changes
+    being (project id, path, tasks, progress) tuples.
+
+    The amounts are summed per ancestor first, ancestors changed by the same
+    amounts are updated with one UPDATE over the (project, path) index.
+    """
+    totals = defaultdict(lambda: [0, 0])
+    for project_id, path, tasks, progress in changes:
+        for end in range(PATH_STEP, len(path) + 1, PATH_STEP):
+            total = totals[project_id, path[:end]]
+            total[0] += tasks
+            total[1] += progress
+
+    paths = defaultdict(list)
+    for (project_id, path), (tasks, progress) in totals.items():
+        if tasks or progress:
+            paths[project_id, tasks, progress].append(path)
+
+    for (project_id, tasks, progress), ancestor_paths in paths.items():
+        Task.objects.filter(project_id=project_id,
+                            path__in=ancestor_paths).update(
+                                subtree_tasks=models.F('subtree_tasks') +
+                                tasks,
+                                subtree_progress=models.F('subtree_progress')
+                                + progress)
+
 
 class Project(models.Model):
 
@@ -42,6 +104,8 @@ class ProjectAccess(models.Model):
         verbose_name = "projectaccess"
         verbose_name_plural = "projectaccess"
         unique_together = (('project', 'user'))
+        # Serve the admin's membership level filter in its -id order
+        indexes = [models.Index(fields=['membership_level', 'id'])]
 
     def __str__(self):
         return f"{self.project.title} - {self.user.username}"
@@ -60,13 +124,332 @@ class Task(models.Model):
         validators=[MinValueValidator(0),
                     MaxValueValidator(100)], default=0)
     due_date = models.DateTimeField(default=timezone.now)
+    parent = models.ForeignKey('self',
+                               on_delete=models.CASCADE,
+                               null=True,
+                               blank=True,
+                               related_name='subtasks')
+    # Materialized path: the zero-padded ids from the root down to this
+    # task, maintained by save()
+    path = models.TextField(default='', editable=False)
+    depth = models.IntegerField(default=0, editable=False)
+    # Position in a topological order of the dependencies, blockers rank
+    # lower than the tasks they block; see tasks.dependencies
+    topo_rank = models.BigIntegerField(default=0, editable=False)
+    # Number of tasks and sum of their progress in the subtree of the task,
+    # itself included, kept up to date along the path by add_to_subtrees()
+    subtree_tasks = models.IntegerField(default=1, editable=False)
+    subtree_progress = models.BigIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = "task"
         verbose_name_plural = "tasks"
+        # Serve "my tasks" and "due soon" in (due_date, id) order, subtrees
+        # as path ranges, and due date ranges across projects to the admin
+        # and archival
+        indexes = [
+            models.Index(fields=['owner', 'due_date', 'id']),
+            models.Index(fields=['project', 'due_date', 'id']),
+            models.Index(fields=['project', 'path']),
+            models.Index(fields=['due_date']),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        task = super().from_db(db, field_names, values)
+        # Remember where the task was, to detect moves on save
+        task._saved_position = (task.__dict__.get('parent_id'),
+                                task.__dict__.get('project_id'))
+        task._saved_due_date = task.__dict__.get('due_date')
+        task._saved_progress = task.__dict__.get('progress')
+        return task
 
     def __str__(self):
         return self.title
 
     def get_absolute_url(self):
         return reverse("tasks:task_detail", kwargs={"pk": self.pk})
+
+    def get_subtree(self):
+        """
+        Returns the task and all its subtasks
+        """
+        return Task.objects.filter(
+            **subtree_lookup(self.project_id, self.path))
+
+    def save(self, *args, **kwargs):
+        saved_position = getattr(self, '_saved_position', None)
+        moved = (self.pk is not None and self.path
+                 and saved_position is not None
+                 and saved_position != (self.parent_id, self.project_id))
+        added = not self.path
+        progress_delta = 0
+
+        if added:
+            self.subtree_tasks, self.subtree_progress = 1, self.progress
+        else:
+            # The subtree totals are only changed in the database, the
+            # ones read with the task may be outdated
+            if kwargs.get('update_fields') is None:
+                skipped = {'subtree_tasks', 'subtree_progress',
+                           *self.get_deferred_fields()}
+                kwargs['update_fields'] = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in skipped
+                ]
+            saved_progress = getattr(self, '_saved_progress', None)
+            if ('progress' in kwargs['update_fields']
+                    and saved_position is not None
+                    and saved_progress is not None):
+                progress_delta = self.progress - saved_progress
+
+        with transaction.atomic():
+            # Where the task still is, a move takes the totals along after
+            if progress_delta:
+                add_to_subtrees([(saved_position[1], self.path, 0,
+                                  progress_delta)])
+            super().save(*args, **kwargs)
+            if moved or added:
+                self.update_path(saved_position[1] if moved else None)
+
+        self._saved_position = (self.parent_id, self.project_id)
+        self._saved_due_date = self.due_date
+        self._saved_progress = self.progress
+
+    def update_path(self, saved_project_id: int = None):
+        """
+        Sets the path after an insert or a move. A move rewrites the whole
+        subtree, and moves it to the task's project, with one UPDATE.
+        """
+        if self.parent_id is None:
+            path = path_segment(self.pk)
+        elif self.path and self.parent.path.startswith(self.path):
+            raise ValueError("A task can't be moved under itself")
+        else:
+            path = self.parent.path + path_segment(self.pk)
+        depth = len(path) // PATH_STEP - 1
+
+        if not self.path:
+            if depth > settings.TASK_MAX_DEPTH:
+                raise ValueError("Subtasks can't be nested deeper than "
+                                 f"{settings.TASK_MAX_DEPTH} levels")
+            # The id is a free rank, the new task has no dependencies
+            Task.objects.filter(pk=self.pk).update(path=path,
+                                                   depth=depth,
+                                                   topo_rank=self.pk)
+            self.topo_rank = self.pk
+            add_to_subtrees([(self.project_id, path[:-PATH_STEP], 1,
+                              self.progress)])
+        else:
+            saved_project_id = saved_project_id or self.project_id
+            subtree = Task.objects.filter(
+                **subtree_lookup(saved_project_id, self.path))
+            if (subtree.aggregate(deepest=models.Max('depth'))['deepest'] +
+                    depth - self.depth > settings.TASK_MAX_DEPTH):
+                raise ValueError("Subtasks can't be nested deeper than "
+                                 f"{settings.TASK_MAX_DEPTH} levels")
+
+            # Take the subtree's totals from its old ancestors to the new
+            tasks, progress = Task.objects.filter(pk=self.pk).values_list(
+                'subtree_tasks', 'subtree_progress').get()
+            add_to_subtrees([
+                (saved_project_id, self.path[:-PATH_STEP], -tasks,
+                 -progress),
+                (self.project_id, path[:-PATH_STEP], tasks, progress),
+            ])
+
+            # Dependencies never cross projects
+            if saved_project_id != self.project_id:
+                TaskDependency.objects.filter(
+                    models.Q(blocker__in=subtree)
+                    | models.Q(blocked__in=subtree)).delete()
+
+            subtree.update(path=Concat(models.Value(path),
+                                       Substr('path',
+                                              len(self.path) + 1),
+                                       output_field=models.TextField()),
+                           depth=models.F('depth') + depth - self.depth,
+                           project=self.project_id)
+
+        self.path, self.depth = path, depth
+
+
+class ArchivedTask(models.Model):
+    """
+    Completed tasks moved out of the Task table by tasks.archiving.
+
+    The columns are those of Task, in the same order, so both tables can
+    be read with one UNION.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    title = models.TextField()
+    description = models.TextField()
+    project = models.ForeignKey(Project,
+                                on_delete=models.CASCADE,
+                                related_name='archived_tasks')
+    owner = models.ForeignKey(User,
+                              on_delete=models.SET_NULL,
+                              null=True,
+                              related_name='archived_tasks')
+    progress = models.IntegerField(default=100)
+    due_date = models.DateTimeField()
+    # The parent may be archived too, or still in the Task table
+    parent = models.ForeignKey(Task,
+                               on_delete=models.DO_NOTHING,
+                               null=True,
+                               db_constraint=False,
+                               related_name='+')
+    path = models.TextField(default='')
+    depth = models.IntegerField(default=0)
+    topo_rank = models.BigIntegerField(default=0)
+    subtree_tasks = models.IntegerField(default=1)
+    subtree_progress = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "archived task"
+        verbose_name_plural = "archived tasks"
+        indexes = [models.Index(fields=['project', 'path'])]
+
+    def __str__(self):
+        return self.title
+
+
+class TaskDependency(models.Model):
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    blocker = models.ForeignKey(Task,
+                                on_delete=models.CASCADE,
+                                related_name='blocks')
+    blocked = models.ForeignKey(Task,
+                                on_delete=models.CASCADE,
+                                related_name='blocked_by')
+
+    class Meta:
+        verbose_name = "task dependency"
+        verbose_name_plural = "task dependencies"
+        unique_together = (('blocker', 'blocked'))
+
+    def __str__(self):
+        return f"{self.blocker_id} blocks {self.blocked_id}"
+
+
+class ProgressEvent(models.Model):
+    """
+    Append-only log of task progress changes, compacted into ProgressRollup
+    rows by tasks.progress.
+
+    Events keep plain ids so the history outlives the tasks. `delta` is the
+    change of progress in the project and `added` the change of its number
+    of tasks, so any range of events sums up to a burndown step.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    project_id = models.IntegerField()
+    task_id = models.IntegerField()
+    progress = models.IntegerField()
+    delta = models.IntegerField()
+    added = models.IntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "progress event"
+        verbose_name_plural = "progress events"
+
+    def __str__(self):
+        return f"Task #{self.task_id} at {self.progress}%"
+
+
+class ProgressRollup(models.Model):
+    """
+    Sums of the progress events of a project over a day or a week
+    """
+
+    project = models.ForeignKey(Project,
+                                on_delete=models.CASCADE,
+                                related_name='progress_rollups')
+
+    class Period(models.TextChoices):
+        DAY = 'day'
+        WEEK = 'week'
+
+    period = models.CharField(max_length=8, choices=Period.choices)
+    start = models.DateField()
+    delta = models.IntegerField(default=0)
+    added = models.IntegerField(default=0)
+    events = models.IntegerField(default=0)
+    # Last event summed up, where the next roll-up starts
+    last_event_id = models.BigIntegerField(default=0, db_index=True)
+
+    class Meta:
+        verbose_name = "progress rollup"
+        verbose_name_plural = "progress rollups"
+        unique_together = ('project', 'period', 'start')
+
+    def __str__(self):
+        return f"{self.project} {self.period} of {self.start}"
+
+
+class RevokedToken(models.Model):
+    """
+    API token revoked before its expiry. The deny-list lives in the
+    database so every worker process sees it.
+    """
+
+    jti = models.CharField(max_length=32, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "revoked token"
+        verbose_name_plural = "revoked tokens"
+
+    def __str__(self):
+        return self.jti
+
+
+class Job(models.Model):
+
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+    owner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued'
+        RUNNING = 'running'
+        DONE = 'done'
+        FAILED = 'failed'
+
+    status = models.CharField(max_length=16,
+                              choices=Status.choices,
+                              default=Status.QUEUED)
+    progress = models.IntegerField(
+        validators=[MinValueValidator(0),
+                    MaxValueValidator(100)], default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "job"
+        verbose_name_plural = "jobs"
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    def get_absolute_url(self):
+        return reverse("tasks:job", kwargs={"pk": self.pk})
+
+    def set_progress(self, progress: int):
+        """
+        Records the progress (0-100) of a running job
+        """
+        progress = max(0, min(100, int(progress)))
+        if progress != self.progress:
+            self.progress = progress
+            Job.objects.filter(pk=self.pk).update(progress=progress,
+                                                  updated_at=timezone.now())
@@ -0,0 +1,75 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.response import Response
+
+from tasks.counting import bounded_count
+
+
+class DueDateCursorPagination(CursorPagination):
+    """
+    Keyset pagination in (due_date, id) order.
+
+    Pages are read straight off the (owner, due_date, id) and
+    (project, due_date, id) indexes, without an OFFSET scan.
+    """
+    ordering = ('due_date', 'id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class PathCursorPagination(CursorPagination):
+    """
+    Keyset pagination of a subtree in depth-first order, read off the
+    (project, path) index
+    """
+    ordering = ('path', )
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class ApproximateCountPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination used only when the request gives a ?limit, so
+    unpaginated clients keep getting plain lists.
+
+    Counts are exact up to EXACT_COUNT_THRESHOLD rows, counted with a
+    bounded LIMIT subquery. Larger counts come from the view's
+    get_approximate_count() and are flagged with count_is_approximate.
+    """
+    default_limit = None
+    max_limit = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        # Pages need a stable order
+        if not queryset.ordered:
+            queryset = queryset.order_by('id')
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset) -> int:
+        threshold = settings.EXACT_COUNT_THRESHOLD
+        count = bounded_count(queryset, threshold)
+
+        self.count_is_approximate = count > threshold
+        if self.count_is_approximate:
+            count = max(count, self.view.get_approximate_count())
+        return count
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'count_is_approximate': self.count_is_approximate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_approximate'] = {
+            'type': 'boolean',
+            'example': False
+        }
+        return response_schema
@@ -1,8 +1,8 @@
-from django.db.models import Q
 from django.http.request import HttpRequest
 from rest_framework.exceptions import NotAuthenticated, PermissionDenied
 from rest_framework.permissions import SAFE_METHODS, BasePermission
 
+from tasks.membership import user_project_ids
 from tasks.models import Project, ProjectAccess, Task
 
 
@@ -36,17 +36,9 @@ class IsTaskPartOfUserProject(BasePermission):
             if request.user.is_anonymous:
                 raise NotAuthenticated('You need to login first')
             else:
-                # Get All User Projects
-                user_projects = request.user.project_set.all()
-
-                # For every project the user is part of,
-                # get all the project members and their access level
-                filters = Q()
-                for project in user_projects:
-                    filters |= Q(project=project)
-
-                # Try to get the task
-                Task.objects.filter(filters).get(pk=obj.pk)
+                # Try to get the task from the projects the user is part of
+                Task.objects.filter(
+                    project__in=user_project_ids(request.user)).get(pk=obj.pk)
 
                 # If got task means, user is part of it
                 return True
@@ -0,0 +1,241 @@
+import atexit
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from tasks.jobs import job_handler
+from tasks.models import (Job, Project, ProgressEvent, ProgressRollup, Task,
+                          subtree_lookup)
+
+# Events of the current thread waiting to be written
+_buffer = threading.local()
+
+
+def pending_events() -> list:
+    if not hasattr(_buffer, 'events'):
+        _buffer.events = []
+    return _buffer.events
+
+
+def buffer_events(events: list):
+    """
+    Buffers the events once the current transaction commits, they are
+    written by flush_events() at the end of the request
+    """
+    def append():
+        pending = pending_events()
+        pending.extend(events)
+        if len(pending) >= settings.PROGRESS_EVENT_BUFFER_SIZE:
+            flush_events()
+
+    if events:
+        transaction.on_commit(append)
+
+
+def flush_events():
+    """
+    Writes the buffered events of the current thread with one bulk_create
+    """
+    events = pending_events()
+    if events:
+        _buffer.events = []
+        # Stamped when written, the roll-up lag counts from here
+        now = timezone.now()
+        for event in events:
+            event.created_at = now
+        ProgressEvent.objects.bulk_create(
+            events, batch_size=settings.BULK_CREATE_BATCH_SIZE)
+
+
+# Commands write what is left when they exit, jobs when they end
+atexit.register(flush_events)
+
+
+def task_event(task, project_id: int, delta: int, added: int = 0):
+    return ProgressEvent(project_id=project_id,
+                         task_id=task.pk,
+                         progress=task.progress,
+                         delta=delta,
+                         added=added,
+                         created_at=timezone.now())
+
+
+def record_created(tasks):
+    """
+    Logs new tasks, such as the ones written by bulk_create
+    """
+    buffer_events([
+        task_event(task, task.project_id, task.progress, 1) for task in tasks
+    ])
+
+
+def record_deleted(tasks):
+    """
+    Logs deleted tasks, taking their progress out of the burndown
+    """
+    buffer_events([
+        task_event(task, task.project_id, -task.progress, -1)
+        for task in tasks
+    ])
+
+
+def record_saved(task: Task, created: bool):
+    """
+    Logs the progress change of a saved task. A task moved to another
+    project leaves the old one with its subtasks.
+    """
+    saved_project_id = getattr(task, '_saved_position', (None, None))[1]
+    saved_progress = getattr(task, '_saved_progress', None)
+
+    if created:
+        record_created([task])
+    elif saved_project_id is None or saved_progress is None:
+        # Not loaded from the database, nothing to compare to
+        return
+    elif saved_project_id != task.project_id:
+        # The subtree still has the old project and path until save() ends
+        subtasks = list(
+            Task.objects.filter(**subtree_lookup(
+                saved_project_id, task.path)).exclude(pk=task.pk).only(
+                    'pk', 'progress'))
+        events = [task_event(task, saved_project_id, -saved_progress, -1)]
+        for subtask in subtasks:
+            events.append(
+                task_event(subtask, saved_project_id, -subtask.progress, -1))
+            events.append(
+                task_event(subtask, task.project_id, subtask.progress, 1))
+        events.append(task_event(task, task.project_id, task.progress, 1))
+        buffer_events(events)
+    elif saved_progress != task.progress:
+        buffer_events([
+            task_event(task, task.project_id, task.progress - saved_progress)
+        ])
+
+
+def period_starts(day) -> tuple:
+    """
+    Returns the (period, start) pairs of the roll-ups covering the day
+    """
+    return ((ProgressRollup.Period.DAY, day),
+            (ProgressRollup.Period.WEEK, day - timedelta(days=day.weekday())))
+
+
+def rollup_progress(on_progress=None) -> int:
+    """
+    Sums up the events logged since the last roll-up into the daily and
+    weekly roll-ups of their project, returning the number of events.
+
+    The last event summed up is kept on the roll-ups it changed, so each
+    run reads only new events, PROGRESS_ROLLUP_BATCH_SIZE at a time.
+    Events written in the last PROGRESS_ROLLUP_LAG_SECONDS are left for the
+    next run, as an insert with a lower id may not be committed yet.
+    Events older than PROGRESS_EVENT_RETENTION_DAYS are then deleted.
+    Roll-ups must not run concurrently.
+    """
+    watermark = ProgressRollup.objects.aggregate(
+        last=Max('last_event_id'))['last'] or 0
+    settled = timezone.now() - timedelta(
+        seconds=settings.PROGRESS_ROLLUP_LAG_SECONDS)
+    rolled_up = 0
+
+    while True:
+        events = list(
+            ProgressEvent.objects.filter(pk__gt=watermark).order_by(
+                'pk').values_list('pk', 'project_id', 'delta', 'added',
+                                  'created_at')
+            [:settings.PROGRESS_ROLLUP_BATCH_SIZE])
+        # Stop at the first recent event, the ones after it must wait too
+        recent = next((i for i, event in enumerate(events)
+                       if event[4] >= settled), None)
+        if recent is not None:
+            events = events[:recent]
+        if not events:
+            break
+        watermark = events[-1][0]
+
+        sums = {}
+        for pk, project_id, delta, added, created_at in events:
+            for period, start in period_starts(timezone.localdate(created_at)):
+                total = sums.setdefault((project_id, period, start), [0, 0, 0])
+                total[0] += delta
+                total[1] += added
+                total[2] += 1
+
+        with transaction.atomic():
+            project_ids = set(
+                Project.objects.filter(pk__in={key[0] for key in sums})
+                .values_list('pk', flat=True))
+            rollups = {}
+            for rollup in ProgressRollup.objects.select_for_update().filter(
+                    project__in=project_ids,
+                    start__in={key[2] for key in sums}):
+                key = (rollup.project_id, rollup.period, rollup.start)
+                rollups[key] = rollup
+
+            created, updated = [], []
+            for key, (delta, added, count) in sums.items():
+                if key[0] not in project_ids:
+                    # Deleted since
+                    continue
+                rollup = rollups.get(key)
+                if rollup is None:
+                    rollup = ProgressRollup(project_id=key[0],
+                                            period=key[1],
+                                            start=key[2])
+                    created.append(rollup)
+                else:
+                    updated.append(rollup)
+                rollup.delta += delta
+                rollup.added += added
+                rollup.events += count
+                rollup.last_event_id = watermark
+
+            ProgressRollup.objects.bulk_create(created)
+            ProgressRollup.objects.bulk_update(
+                updated, ['delta', 'added', 'events', 'last_event_id'])
+
+        rolled_up += len(events)
+        if on_progress is not None:
+            on_progress(rolled_up)
+        if recent is not None:
+            break
+
+    ProgressEvent.objects.filter(
+        pk__lte=watermark,
+        created_at__lt=timezone.now() -
+        timedelta(days=settings.PROGRESS_EVENT_RETENTION_DAYS)).delete()
+
+    return rolled_up
+
+
+def burndown(project_id: int, period: str) -> list:
+    """
+    Returns the number of tasks, completed tasks (progress / 100) and
+    remaining tasks of the project at the end of each period, read from the
+    roll-ups only
+    """
+    series = []
+    tasks = progress = 0
+    for start, delta, added in ProgressRollup.objects.filter(
+            project=project_id,
+            period=period).order_by('start').values_list(
+                'start', 'delta', 'added'):
+        tasks += added
+        progress += delta
+        series.append({
+            'start': start.isoformat(),
+            'tasks': tasks,
+            'completed': progress / 100,
+            'remaining': tasks - progress / 100
+        })
+
+    return series
+
+
+@job_handler('rollup_progress')
+def rollup_progress_job(job: Job):
+    return {'events': rollup_progress()}
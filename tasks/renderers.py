@@ -0,0 +1,130 @@
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+from rest_framework.settings import api_settings
+
+from tasks.coalescing import pending_progress
+from tasks.models import Task
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional
+    msgpack = None
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    Renders column-oriented lists: the field names once, then one array of
+    values per field
+    """
+    media_type = 'application/vnd.spizy.columnar+json'
+    format = 'columnar'
+
+
+class ColumnarMessagePackRenderer(BaseRenderer):
+    """
+    Renders column-oriented lists as MessagePack, needs the msgpack package
+    """
+    media_type = 'application/vnd.spizy.columnar+msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=str)
+
+
+COLUMNAR_RENDERERS = [ColumnarJSONRenderer]
+if msgpack is not None:
+    COLUMNAR_RENDERERS.append(ColumnarMessagePackRenderer)
+
+
+def format_datetimes(values) -> list:
+    """
+    Formats a column of datetimes like DRF's DateTimeField does
+    """
+    formatted = []
+    for value in values:
+        if value is not None:
+            value = timezone.localtime(value).isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+        formatted.append(value)
+    return formatted
+
+
+class ColumnarListMixin:
+    """
+    List view mixin answering Accept requests for a columnar renderer.
+
+    The columns are read with values_list() and transposed, skipping model
+    instances, per-row dicts and the serializer. Expanded relations are not
+    supported in this format and fall back to their id. Paginated requests
+    read the page only, and the envelope carries the paginator's count and
+    links. Tasks show their pending progress updates, as in the other
+    formats.
+    """
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES,
+                        *COLUMNAR_RENDERERS]
+
+    def get_columns(self):
+        """
+        Returns the (name, ORM path) pairs of the columns to render
+        """
+        columns = []
+        for name, field in self.get_serializer().fields.items():
+            if isinstance(field, BaseSerializer):
+                columns.append((name, field.source))
+            else:
+                columns.append((name, field.source.replace('.', '__')))
+        return columns
+
+    def list(self, request, *args, **kwargs):
+        if not isinstance(request.accepted_renderer,
+                          tuple(COLUMNAR_RENDERERS)):
+            return super().list(request, *args, **kwargs)
+
+        columns = self.get_columns()
+        queryset = self.filter_queryset(self.get_queryset())
+        # The id goes last, so pages can be ordered by it
+        rows = queryset.values_list(*[path for name, path in columns], 'pk')
+        page = self.paginate_queryset(rows)
+        rows = list(rows if page is None else page)
+        names = [name for name, path in columns]
+        if 'progress' in names and queryset.model is Task:
+            # Show the progress updates not written yet, as lists do
+            pending = pending_progress(row[-1] for row in rows)
+            progress = names.index('progress')
+            rows = [(*row[:progress], pending[row[-1]], *row[progress + 1:])
+                    if row[-1] in pending else row for row in rows]
+        rows = [row[:-1] for row in rows]
+
+        # Transpose the rows into one list per column
+        values = [list(column) for column in zip(*rows)]
+        if not values:
+            values = [[] for _ in columns]
+
+        datetime_fields = {
+            field.name
+            for field in queryset.model._meta.fields
+            if field.get_internal_type() == 'DateTimeField'
+        }
+        for i, (name, path) in enumerate(columns):
+            if path in datetime_fields:
+                values[i] = format_datetimes(values[i])
+
+        data = {
+            'fields': names,
+            'columns': values,
+            'count': len(rows)
+        }
+        if page is not None:
+            # Count and links of the paginated envelope, without its rows
+            envelope = self.get_paginated_response([]).data
+            envelope.pop('results', None)
+            data.update(envelope)
+
+        return Response(data)
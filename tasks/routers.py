@@ -0,0 +1,27 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Whether the current request may read from a replica, set by
+# tasks.middleware.ReplicaRoutingMiddleware. Everything outside of a
+# request, such as jobs and management commands, uses the primary.
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+class ReplicaRouter:
+    """
+    Sends reads of safe-method requests to a random read replica and
+    everything else to the primary ('default') database
+    """
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and replica_reads.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
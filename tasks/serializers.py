@@ -1,11 +1,58 @@
+from django.conf import settings
 from django.contrib.auth.models import User
-from rest_framework.serializers import (CharField, EmailField, ModelSerializer,
-                                        ReadOnlyField, Serializer)
+from django.db.models import Max
+from rest_framework.serializers import (BooleanField, CharField, ChoiceField,
+                                        EmailField, FileField, IntegerField,
+                                        JSONField, ListSerializer,
+                                        ModelSerializer, ReadOnlyField,
+                                        Serializer, ValidationError)
 
-from tasks.models import Project, ProjectAccess, Task
+from tasks.coalescing import overlay_pending
+from tasks.models import Job, Project, ProjectAccess, Task, TaskDependency
 
 
-class ProjectSerializer(ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Serializer mixin restricting the output to ``context['fields']`` and
+    replacing the related fields named in ``context['expand']`` with the
+    nested serializers listed in ``expandable_fields``
+    """
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        # Nested serializers share the context but always render in full
+        root = self.root
+        if isinstance(root, ListSerializer):
+            root = root.child
+        if self is not root:
+            return fields
+
+        requested = self.context.get('fields')
+        if requested:
+            fields = {
+                name: field
+                for name, field in fields.items() if name in requested
+            }
+
+        for name in self.context.get('expand', ()):
+            if name in fields and name in self.expandable_fields:
+                fields[name] = self.expandable_fields[name](read_only=True)
+
+        return fields
+
+
+class UserSummarySerializer(ModelSerializer):
+    """
+    Serializer for the public details of a User
+    """
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name']
+
+
+class ProjectSerializer(SparseFieldsMixin, ModelSerializer):
     """
     Serializer for Project Model
     """
@@ -14,19 +61,120 @@ class ProjectSerializer(ModelSerializer):
         fields = ['id', 'title', 'description']
 
 
-class TaskSerializer(ModelSerializer):
+class ProjectCloneSerializer(Serializer):
+    """
+    Serializer for Project Clone requests
+    """
+    title = CharField(required=False)
+    include_access = BooleanField(default=False)
+    # About a century either way, shifted due dates stay within the range
+    # of datetime
+    shift_days = IntegerField(default=0, min_value=-36500, max_value=36500)
+    background = BooleanField(default=False)
+
+
+class TaskImportSerializer(Serializer):
+    """
+    Serializer for Task Import uploads
+    """
+    file = FileField()
+    format = ChoiceField(choices=['csv', 'ndjson'], required=False)
+    background = BooleanField(default=False)
+
+
+class TaskListSerializer(ListSerializer):
+    """
+    Serializer for lists of Tasks, showing pending progress updates
+    """
+    def to_representation(self, data):
+        return overlay_pending(super().to_representation(data))
+
+
+class TaskSerializer(SparseFieldsMixin, ModelSerializer):
     """
     Serializer for Task Model
     """
 
     owner = ReadOnlyField(source='owner.username')
 
+    expandable_fields = {
+        'project': ProjectSerializer,
+        'owner': UserSummarySerializer
+    }
+
     class Meta:
         model = Task
         fields = [
             'id', 'title', 'description', 'project', 'owner', 'progress',
-            'due_date'
+            'due_date', 'parent', 'depth'
         ]
+        list_serializer_class = TaskListSerializer
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Lists show pending progress updates all at once
+        if self.parent is None:
+            overlay_pending([data])
+        return data
+
+    def check_depth(self, parent: Task):
+        """
+        Checks that the task and its subtasks stay within TASK_MAX_DEPTH
+        under the new parent
+        """
+        depth = parent.depth + 1
+        if self.instance is not None:
+            # A moved task takes the deepest task of its subtree along
+            depth += self.instance.get_subtree().aggregate(
+                deepest=Max('depth'))['deepest'] - self.instance.depth
+        if depth > settings.TASK_MAX_DEPTH:
+            raise ValidationError({
+                'parent':
+                "Subtasks can't be nested deeper than "
+                f"{settings.TASK_MAX_DEPTH} levels"
+            })
+
+    def validate(self, attrs):
+        project = attrs.get('project', getattr(self.instance, 'project',
+                                               None))
+        parent = attrs.get('parent', getattr(self.instance, 'parent', None))
+
+        if parent is not None:
+            if parent.project_id != project.pk:
+                raise ValidationError(
+                    {'parent': "Subtasks must be in their parent's project"})
+            if (self.instance is not None
+                    and parent.path.startswith(self.instance.path)):
+                raise ValidationError(
+                    {'parent': "A task can't be moved under itself"})
+
+            if (self.instance is None
+                    or parent.pk != self.instance.parent_id):
+                self.check_depth(parent)
+
+        return attrs
+
+
+class TaskProgressSerializer(Serializer):
+    """
+    Serializer for coalesced Task progress updates
+    """
+    progress = IntegerField(min_value=0, max_value=100)
+
+
+class TaskDependencySerializer(ModelSerializer):
+    """
+    Serializer for Task Dependency Model
+    """
+    class Meta:
+        model = TaskDependency
+        fields = ['id', 'blocker', 'blocked']
+
+    def validate(self, attrs):
+        if attrs['blocker'].project_id != attrs['blocked'].project_id:
+            raise ValidationError(
+                "Dependencies must be between tasks of one project")
+        return attrs
 
 
 class ProjectAccessSerializer(ModelSerializer):
@@ -40,6 +188,58 @@ class ProjectAccessSerializer(ModelSerializer):
         fields = ['id', 'project', 'user', 'membership_level']
 
 
+class BulkMemberSerializer(Serializer):
+    """
+    Serializer for one member of a Bulk Project Access request
+    """
+    user = EmailField()
+    membership_level = ChoiceField(
+        choices=ProjectAccess.MembershipLevel.choices)
+
+
+class BulkProjectAccessSerializer(Serializer):
+    """
+    Serializer for Bulk Project Access requests
+    """
+    project = IntegerField()
+    members = BulkMemberSerializer(many=True, allow_empty=False)
+
+
+class BatchSubRequestSerializer(Serializer):
+    """
+    Serializer for one sub-request of a Batch request
+    """
+    method = ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
+    path = CharField()
+    body = JSONField(required=False, allow_null=True)
+
+
+class BatchSerializer(Serializer):
+    """
+    Serializer for Batch requests
+    """
+    requests = BatchSubRequestSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise ValidationError(
+                f'At most {settings.BATCH_MAX_REQUESTS} requests per batch')
+        return value
+
+
+class JobSerializer(ModelSerializer):
+    """
+    Serializer for Job Model
+    """
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'status', 'progress', 'result', 'error', 'attempts',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
 class UserSerializer(ModelSerializer):
     """
     Serializer for User Model
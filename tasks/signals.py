@@ -0,0 +1,112 @@
+from django.contrib.auth.models import User
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from tasks.backends import invalidate_cached_user
+from tasks.caching import bump_versions
+from tasks.coalescing import (discard_pending, flush_pending,
+                              forget_task_projects)
+from tasks.dependencies import invalidate_critical_paths
+from tasks.jobs import job_finished
+from tasks.models import Project, ProjectAccess, Task, subtree_lookup
+from tasks.progress import flush_events, record_saved
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance: User, created=False, **kwargs):
+    """
+    Drops the cached user whenever its password or profile changes
+    """
+    invalidate_cached_user(instance.pk)
+
+    # A new user must not pick up responses cached for a reused id
+    if created:
+        bump_versions([instance.pk])
+
+
+@receiver(post_save, sender=Project)
+def invalidate_project_responses(sender, instance: Project, **kwargs):
+    """
+    Invalidates the cached project responses of every project member
+    """
+    bump_versions(
+        ProjectAccess.objects.filter(project=instance).values_list(
+            'user_id', flat=True))
+
+
+@receiver(post_save, sender=ProjectAccess)
+@receiver(post_delete, sender=ProjectAccess)
+def invalidate_access_responses(sender, instance: ProjectAccess, **kwargs):
+    """
+    Invalidates the cached project responses of the affected user
+    """
+    bump_versions([instance.user_id])
+
+
+@receiver(post_save, sender=Task)
+def invalidate_task_critical_path(sender,
+                                  instance: Task,
+                                  created=False,
+                                  **kwargs):
+    """
+    Invalidates the cached critical path when a task is added, or its due
+    date or project changes
+    """
+    saved_project_id = getattr(instance, '_saved_position', (None, None))[1]
+    saved_due_date = getattr(instance, '_saved_due_date', None)
+
+    if (created or saved_project_id != instance.project_id
+            or saved_due_date != instance.due_date):
+        invalidate_critical_paths({saved_project_id, instance.project_id} -
+                                  {None})
+
+
+@receiver(post_save, sender=Task)
+def log_task_progress(sender, instance: Task, created=False, **kwargs):
+    """
+    Buffers a progress event when a task is added, moved or progresses
+    """
+    record_saved(instance, created)
+
+
+@receiver(post_save, sender=Task)
+def discard_pending_progress(sender, instance: Task, **kwargs):
+    """
+    A saved task overrides its pending progress update, and a task moved to
+    another project takes its subtasks along
+    """
+    discard_pending([instance.pk])
+
+    saved_project_id = getattr(instance, '_saved_position', (None, None))[1]
+    if saved_project_id not in (None, instance.project_id):
+        # The subtree still has the old project until save() ends
+        forget_task_projects(
+            Task.objects.filter(**subtree_lookup(
+                saved_project_id, instance.path)).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Task)
+def forget_deleted_task(sender, instance: Task, **kwargs):
+    discard_pending([instance.pk])
+    forget_task_projects([instance.pk])
+
+
+@receiver(request_finished)
+def write_progress_events(sender, **kwargs):
+    """
+    Writes the coalesced progress updates once due, and the progress events
+    buffered while serving the request
+    """
+    flush_pending()
+    flush_events()
+
+
+@receiver(job_finished)
+def write_job_progress_events(sender, **kwargs):
+    """
+    Writes the progress events buffered while running the job. Workers are
+    stopped with SIGTERM, which skips atexit.
+    """
+    flush_events()
@@ -0,0 +1,344 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse_lazy
+
+from tasks.checks import check_shared_cache
+from tasks.hashers import HASHING_SLOTS_KEY
+
+
+@override_settings(CACHE_IS_SHARED=True,
+                   SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+class CachedAuthTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="jane_doe@email.com",
+                                        email="jane_doe@email.com",
+                                        first_name="Jane",
+                                        password="secret")
+        self.client = Client()
+
+    def test_warm_session_check_login_no_queries(self):
+        """
+        A warm session authenticates without touching the database
+        """
+        self.client.force_login(self.user)
+        # Warm up the session and the user cache
+        self.client.get(reverse_lazy('tasks:checklogin'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse_lazy('tasks:checklogin'))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile_change_invalidates_cache(self):
+        """
+        Profile changes are visible on the next request
+        """
+        self.client.force_login(self.user)
+        self.client.get(reverse_lazy('tasks:checklogin'))
+
+        # Update the profile
+        self.user.first_name = "Janet"
+        self.user.save()
+
+        response = self.client.get(reverse_lazy('tasks:checklogin'))
+        self.assertEqual(response.json()['first_name'], "Janet")
+
+    def test_password_change_ends_session(self):
+        """
+        Changing the password logs out sessions using the cached user
+        """
+        self.client.force_login(self.user)
+        self.client.get(reverse_lazy('tasks:checklogin'))
+
+        # Change the password
+        self.user.set_password("another secret")
+        self.user.save()
+
+        response = self.client.get(reverse_lazy('tasks:checklogin'))
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_process_local_cache_bypassed(self):
+        """
+        Users are not cached where other processes could not invalidate them
+        """
+        self.client.force_login(self.user)
+        self.client.get(reverse_lazy('tasks:checklogin'))
+
+        # Change the user without any receiver, like another process would
+        User.objects.filter(pk=self.user.pk).update(first_name="Janet")
+
+        response = self.client.get(reverse_lazy('tasks:checklogin'))
+        self.assertEqual(response.json()['first_name'], "Janet")
+
+
+class TokenAuthTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="jane_doe@email.com",
+                                        email="jane_doe@email.com")
+        self.user.set_password("secret")
+        self.user.save()
+        self.client = Client(enforce_csrf_checks=True)
+
+    def obtain_token(self) -> str:
+        """
+        Utility function to exchange credentials for a token
+        """
+        response = self.client.post(reverse_lazy('tasks:token'), {
+            'username': self.user.username,
+            'password': 'secret'
+        },
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['token']
+
+    def test_token_obtain_bad_password(self):
+        """
+        Wrong credentials do not yield a token
+        """
+        response = self.client.post(reverse_lazy('tasks:token'), {
+            'username': self.user.username,
+            'password': 'wrong'
+        },
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_token_creates_without_csrf(self):
+        """
+        Token clients can write without a session or CSRF token
+        """
+        token = self.obtain_token()
+        response = self.client.post(reverse_lazy('tasks:projects'), {
+            'title': 'Test Title',
+            'description': 'Test Description'
+        },
+                                    content_type='application/json',
+                                    HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 201)
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_warm_token_no_queries(self):
+        """
+        With a shared cache, a warm token authenticates without touching the
+        database
+        """
+        token = self.obtain_token()
+        self.client.get(reverse_lazy('tasks:checklogin'),
+                        HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse_lazy('tasks:checklogin'),
+                                       HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 200)
+
+    def test_revoked_token(self):
+        """
+        Revoked tokens are rejected
+        """
+        token = self.obtain_token()
+        response = self.client.post(reverse_lazy('tasks:tokenrevoke'),
+                                    HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(reverse_lazy('tasks:checklogin'),
+                                   HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 403)
+
+        # The deny-list is in the database, not in one process' cache
+        cache.clear()
+        response = self.client.get(reverse_lazy('tasks:checklogin'),
+                                   HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_revoked_cached_token(self):
+        """
+        Revoking overwrites the cached lookup of a token in use
+        """
+        token = self.obtain_token()
+        response = self.client.get(reverse_lazy('tasks:checklogin'),
+                                   HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 200)
+
+        self.client.post(reverse_lazy('tasks:tokenrevoke'),
+                         HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get(reverse_lazy('tasks:checklogin'),
+                                   HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 403)
+
+    def test_tampered_token(self):
+        """
+        Tokens with a broken signature are rejected
+        """
+        token = self.obtain_token()
+        response = self.client.get(reverse_lazy('tasks:checklogin'),
+                                   HTTP_AUTHORIZATION=f'Bearer {token}x')
+        self.assertEqual(response.status_code, 403)
+
+
+class LoginHashingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="jane_doe@email.com",
+                                        email="jane_doe@email.com")
+        self.user.set_password("secret")
+        self.user.save()
+        self.client = Client()
+
+    def login(self) -> HttpResponse:
+        """
+        Utility function to log in through the JSON login view
+        """
+        return self.client.post(reverse_lazy('tasks:login'), {
+            'username': self.user.username,
+            'password': 'secret'
+        },
+                                content_type='application/json')
+
+    def test_login(self):
+        """
+        A user can log in with their password
+        """
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(
+        PASSWORD_HASHERS=['tasks.hashers.TunedPBKDF2PasswordHasher'],
+        PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_login_rehashes_password(self):
+        """
+        Logging in upgrades the hash to the configured hasher
+        """
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+    @override_settings(PASSWORD_HASHING_CONCURRENCY=1)
+    def test_login_hashing_busy(self):
+        """
+        Logins are turned away while all hashing slots are taken
+        """
+        cache.set(HASHING_SLOTS_KEY, 1)
+
+        response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_login_hashing_counter_not_negative(self):
+        """
+        A slot taken before the counter expired never frees a slot it does
+        not own
+        """
+        cache.set(HASHING_SLOTS_KEY, -1)
+
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(cache.get(HASHING_SLOTS_KEY), 0)
+
+
+class LoginThrottleTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="jane_doe@email.com",
+                                        email="jane_doe@email.com")
+        self.client = Client()
+
+    def login(self, username="jane_doe@email.com") -> HttpResponse:
+        """
+        Utility function to attempt a login with a wrong password
+        """
+        return self.client.post(reverse_lazy('tasks:login'), {
+            'username': username,
+            'password': 'wrong'
+        },
+                                content_type='application/json')
+
+    @override_settings(REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'login_username': '2/min'
+        }
+    })
+    def test_login_username_throttled(self):
+        """
+        Attempts over the username rate are rejected without any query
+        """
+        self.assertEqual(self.login().status_code, 401)
+        self.assertEqual(self.login().status_code, 401)
+
+        with self.assertNumQueries(0):
+            response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+        # Other accounts are not affected
+        response = self.login(username="bob_doe@email.com")
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'login': '1/min'
+        }
+    })
+    def test_login_ip_throttled(self):
+        """
+        Attempts over the IP rate are rejected
+        """
+        self.assertEqual(self.login().status_code, 401)
+        self.assertEqual(
+            self.login(username="bob_doe@email.com").status_code, 429)
+
+    @override_settings(REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'login': '2/min'
+        },
+        'NUM_PROXIES': 0
+    })
+    def test_login_ip_throttled_despite_forwarded_for(self):
+        """
+        Clients can't escape the IP rate by rotating X-Forwarded-For
+        """
+        statuses = [
+            self.client.post(reverse_lazy('tasks:login'), {
+                'username': "jane_doe@email.com",
+                'password': 'wrong'
+            },
+                             content_type='application/json',
+                             HTTP_X_FORWARDED_FOR=f'10.0.0.{i}').status_code
+            for i in range(4)
+        ]
+        self.assertEqual(statuses, [401, 401, 429, 429])
+
+    @override_settings(REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'token_username': '1/min'
+        }
+    })
+    def test_token_username_throttled(self):
+        """
+        The token endpoint is limited per username through DRF throttles
+        """
+        data = {'username': self.user.username, 'password': 'wrong'}
+        response = self.client.post(reverse_lazy('tasks:token'),
+                                    data,
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.post(reverse_lazy('tasks:token'),
+                                    data,
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+
+    def test_shared_cache_check(self):
+        """
+        Deployments are warned when the buckets are local to each process
+        """
+        with override_settings(CACHE_IS_SHARED=False):
+            warnings = check_shared_cache(None)
+        self.assertEqual([warning.id for warning in warnings], ['tasks.W001'])
+        with override_settings(CACHE_IS_SHARED=True):
+            self.assertEqual(check_shared_cache(None), [])
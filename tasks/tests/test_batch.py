@@ -0,0 +1,120 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse_lazy
+
+
+class BatchTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="jane_doe@email.com",
+                                        email="jane_doe@email.com",
+                                        password="secret")
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def batch(self, *requests):
+        """
+        Utility function to send a batch and return the sub-responses
+        """
+        response = self.client.post(
+            reverse_lazy('tasks:batch'),
+            {'requests': [{
+                'method': method,
+                'path': path,
+                'body': body
+            } for method, path, body in requests]},
+            content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content.decode())['responses']
+
+    def test_batch_page_load(self):
+        """
+        Several reads return together, each with its own status
+        """
+        self.client.post(reverse_lazy('tasks:projects'), {
+            'title': 'Test Title',
+            'description': 'Test Description'
+        },
+                         content_type="application/json")
+
+        responses = self.batch(('GET', '/api/check-login', None),
+                               ('GET', '/api/projects', None),
+                               ('GET', '/api/tasks', None),
+                               ('GET', '/api/project-access', None))
+
+        self.assertEqual([r['status'] for r in responses], [200] * 4)
+        self.assertEqual(responses[0]['body']['username'],
+                         self.user.username)
+        self.assertEqual(len(responses[1]['body']), 1)
+        self.assertEqual(responses[2]['body'], [])
+        self.assertEqual(len(responses[3]['body']), 1)
+
+    def test_batch_sees_earlier_writes(self):
+        """
+        Sub-requests run in order and see the writes before them
+        """
+        responses = self.batch(
+            ('POST', '/api/projects', {
+                'title': 'Test Title',
+                'description': 'Test Description'
+            }), ('GET', '/api/project-access', None))
+        self.assertEqual(responses[0]['status'], 201)
+        self.assertEqual(len(responses[1]['body']), 1)
+
+        project_id = responses[0]['body']['id']
+        responses = self.batch(
+            ('POST', '/api/tasks', {
+                'title': 'Test Task',
+                'description': 'Test Description',
+                'project': project_id
+            }), ('GET', '/api/tasks?fields=title', None),
+            ('GET', '/api/task/999', None))
+        self.assertEqual(responses[0]['status'], 201)
+        self.assertEqual(responses[1]['body'], [{'title': 'Test Task'}])
+        self.assertEqual(responses[2]['status'], 404)
+
+    def test_batch_rejected_routes(self):
+        """
+        Credential, unknown and foreign routes are not run
+        """
+        responses = self.batch(('POST', '/api/logout', None),
+                               ('POST', '/api/batch', {'requests': []}),
+                               ('GET', '/admin/', None),
+                               ('GET', '/api/nothing', None))
+        self.assertEqual([r['status'] for r in responses],
+                         [400, 400, 400, 404])
+
+        # Still logged in
+        response = self.client.get(reverse_lazy('tasks:checklogin'))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_batch_too_many_requests(self):
+        """
+        Batches are limited in size
+        """
+        response = self.client.post(
+            reverse_lazy('tasks:batch'),
+            {'requests': [{
+                'method': 'GET',
+                'path': '/api/tasks'
+            }] * 3},
+            content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_anonymous_batch(self):
+        """
+        Anonymous users can not send batches
+        """
+        self.client.logout()
+        response = self.client.post(
+            reverse_lazy('tasks:batch'),
+            {'requests': [{
+                'method': 'GET',
+                'path': '/api/tasks'
+            }]},
+            content_type="application/json")
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,169 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse_lazy
+from django.utils import timezone
+from tasks.dependencies import (DependencyCycle, add_dependency,
+                                critical_path)
+from tasks.models import Project, ProjectAccess, Task, TaskDependency
+
+
+class DependencyTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="jane_doe@email.com",
+                                        email="jane_doe@email.com",
+                                        password="secret")
+        self.project = Project.objects.create(title="Test Title",
+                                              description="Test Description")
+        ProjectAccess.objects.create(
+            project=self.project,
+            user=self.user,
+            membership_level=ProjectAccess.MembershipLevel.OWNER)
+        self.now = timezone.now()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create_task(self, days=0, **fields) -> Task:
+        return Task.objects.create(
+            **{
+                'title': "Test Task Title",
+                'description': "Test Task Description",
+                'project': self.project,
+                'due_date': self.now + timedelta(days=days),
+                **fields
+            })
+
+    def assertRanksInOrder(self):
+        for blocker_rank, blocked_rank in TaskDependency.objects.values_list(
+                'blocker__topo_rank', 'blocked__topo_rank'):
+            self.assertLess(blocker_rank, blocked_rank)
+
+    def test_random_graph(self):
+        """
+        Ranks stay topologically ordered and every cycle is rejected
+        """
+        rng = random.Random(42)
+        tasks = [self.create_task() for _ in range(12)]
+        edges = set()
+
+        def reaches(start, end):
+            seen, stack = set(), [start]
+            while stack:
+                node = stack.pop()
+                if node == end:
+                    return True
+                if node not in seen:
+                    seen.add(node)
+                    stack.extend(b for a, b in edges if a == node)
+            return False
+
+        for _ in range(60):
+            blocker, blocked = rng.sample(tasks, 2)
+            if (blocker.pk, blocked.pk) in edges:
+                continue
+            if reaches(blocked.pk, blocker.pk):
+                with self.assertRaises(DependencyCycle):
+                    add_dependency(blocker, blocked)
+            else:
+                add_dependency(blocker, blocked)
+                edges.add((blocker.pk, blocked.pk))
+            self.assertRanksInOrder()
+
+    def test_user_create_dependency(self):
+        """
+        Dependencies are created unless they close a cycle
+        """
+        first, second, third = (self.create_task() for _ in range(3))
+        url = reverse_lazy('tasks:taskdependencies')
+
+        for blocker, blocked in ((second, third), (third, first)):
+            response = self.client.post(url, {
+                'blocker': blocker.pk,
+                'blocked': blocked.pk
+            },
+                                        content_type="application/json")
+            self.assertEqual(response.status_code, 201)
+        self.assertRanksInOrder()
+
+        response = self.client.post(url, {
+            'blocker': first.pk,
+            'blocked': second.pk
+        },
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(self.client.get(url).json()), 2)
+
+    def test_outsider_create_dependency(self):
+        """
+        Users can't link tasks of projects they are not part of
+        """
+        first, second = self.create_task(), self.create_task()
+        other = User.objects.create(username="bob_doe@email.com",
+                                    email="bob_doe@email.com",
+                                    password="secret")
+        self.client.force_login(other)
+
+        response = self.client.post(reverse_lazy('tasks:taskdependencies'),
+                                    {
+                                        'blocker': first.pk,
+                                        'blocked': second.pk
+                                    },
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+    def test_user_get_blocked_tasks(self):
+        """
+        Tasks waiting on an unfinished blocker are blocked
+        """
+        done = self.create_task(title="Done", progress=100)
+        doing = self.create_task(title="Doing", progress=50)
+        waiting = self.create_task(title="Waiting")
+        ready = self.create_task(title="Ready")
+        add_dependency(done, ready)
+        add_dependency(doing, waiting)
+        add_dependency(done, waiting)
+
+        response = self.client.get(reverse_lazy('tasks:blockedtasks'))
+        self.assertEqual([task['title'] for task in response.json()],
+                         ["Waiting"])
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_user_get_critical_path(self):
+        """
+        The critical path follows the blockers finishing last
+        """
+        design = self.create_task(days=5)
+        build = self.create_task(days=3)
+        docs = self.create_task(days=1)
+        release = self.create_task(days=4)
+        add_dependency(design, build)
+        add_dependency(build, release)
+        add_dependency(docs, release)
+
+        response = self.client.get(
+            reverse_lazy('tasks:projectcriticalpath',
+                         kwargs={'pk': self.project.pk}))
+        self.assertEqual(response.status_code, 200)
+        path = response.json()['path']
+        self.assertEqual([step['id'] for step in path],
+                         [design.pk, build.pk, release.pk])
+        self.assertEqual([step['late'] for step in path],
+                         [False, True, True])
+
+        # Cached until a due date changes
+        with self.assertNumQueries(0):
+            critical_path(self.project.pk)
+        docs.due_date = self.now + timedelta(days=9)
+        docs.save()
+        self.assertEqual(
+            [step['id'] for step in critical_path(self.project.pk)['path']],
+            [docs.pk, release.pk])
+
+        # Always computed with a process-local cache
+        with override_settings(CACHE_IS_SHARED=False):
+            with self.assertNumQueries(2):
+                critical_path(self.project.pk)
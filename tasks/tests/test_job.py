@@ -0,0 +1,123 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import DatabaseError
+from django.db.models import F
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse_lazy
+from django.utils import timezone
+from tasks.jobs import (enqueue, heartbeat, job_handler, requeue_stale_jobs,
+                        run_pending_jobs)
+from tasks.models import Job
+
+
+@job_handler('test_flaky')
+def flaky_job(job: Job):
+    if job.attempts < job.payload['succeed_on']:
+        raise RuntimeError("Try again")
+    return {'attempts': job.attempts}
+
+
+class JobTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="jane_doe@email.com",
+                                        email="jane_doe@email.com",
+                                        password="secret")
+        self.other = User.objects.create(username="bob_doe@email.com",
+                                         email="bob_doe@email.com",
+                                         password="secret")
+        self.client = Client()
+
+    def test_job_retried_with_backoff(self):
+        """
+        Failed jobs are queued again for later until they succeed
+        """
+        job = enqueue('test_flaky', {'succeed_on': 2}, owner=self.user)
+
+        self.assertEqual(run_pending_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertGreater(job.run_after, timezone.now())
+
+        # Make the retry due
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.DONE)
+        self.assertEqual(job.result, {'attempts': 2})
+
+    def test_job_fails_after_max_attempts(self):
+        """
+        Jobs that keep failing are eventually marked as failed
+        """
+        job = enqueue('test_flaky', {'succeed_on': 99}, owner=self.user)
+
+        for _ in range(job.max_attempts):
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            run_pending_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIn("Try again", job.error)
+
+    def test_stale_jobs_requeued(self):
+        """
+        Jobs of dead workers are queued again while they have attempts left
+        """
+        retried = enqueue('test_flaky', {'succeed_on': 1}, owner=self.user)
+        exhausted = enqueue('test_flaky', {'succeed_on': 1}, owner=self.user)
+        Job.objects.update(status=Job.Status.RUNNING,
+                           updated_at=timezone.now() - timedelta(days=1))
+        Job.objects.filter(pk=retried.pk).update(attempts=1)
+        Job.objects.filter(pk=exhausted.pk).update(attempts=F('max_attempts'))
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        retried.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual(retried.status, Job.Status.QUEUED)
+        self.assertEqual(exhausted.status, Job.Status.FAILED)
+
+    @override_settings(JOB_HEARTBEAT_INTERVAL=0.01)
+    def test_heartbeat_survives_database_errors(self):
+        """
+        The heartbeat keeps beating after a failed update
+        """
+        job = enqueue('test_flaky', {'succeed_on': 1}, owner=self.user)
+        beats = []
+
+        def update(**kwargs):
+            beats.append(kwargs)
+            if len(beats) == 1:
+                raise DatabaseError("Connection lost")
+            return 1
+
+        with mock.patch.object(Job.objects, 'filter') as filter_jobs:
+            filter_jobs.return_value.update.side_effect = update
+            with self.assertLogs('tasks.jobs', 'WARNING'):
+                with heartbeat(job):
+                    deadline = time.monotonic() + 5
+                    while len(beats) < 2 and time.monotonic() < deadline:
+                        time.sleep(0.01)
+
+        self.assertGreaterEqual(len(beats), 2)
+
+    def test_user_get_job(self):
+        """
+        Users can follow their own jobs only
+        """
+        job = enqueue('test_flaky', {'succeed_on': 1}, owner=self.user)
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse_lazy('tasks:job',
+                                                kwargs={'pk': job.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'queued')
+        response = self.client.get(reverse_lazy('tasks:jobs'))
+        self.assertEqual(len(response.json()), 1)
+
+        self.client.force_login(self.other)
+        response = self.client.get(reverse_lazy('tasks:job',
+                                                kwargs={'pk': job.pk}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,197 @@
+import gzip
+import json
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from tasks.middleware import (CompressionMiddleware, GzipCompressor,
+                              ReplicaRoutingMiddleware, choose_encoding,
+                              has_credentials)
+from tasks.models import Task
+from tasks.routers import ReplicaRouter
+
+
+class CompressionTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.content = b'[' + b','.join([b'{"title": "Test Task Title"}'] *
+                                        100) + b']'
+
+    def process(self, response, accept_encoding='gzip, deflate'):
+        """
+        Utility function to run a response through the middleware
+        """
+        request = self.factory.get('/api/tasks',
+                                   HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_large_json_compressed(self):
+        """
+        Large JSON responses are compressed when the client accepts it
+        """
+        response = self.process(
+            HttpResponse(self.content, content_type='application/json'))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.content)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    @override_settings(COMPRESSION_MIN_SIZE=10000)
+    def test_small_json_not_compressed(self):
+        """
+        Responses below the threshold are sent as is
+        """
+        response = self.process(
+            HttpResponse(self.content, content_type='application/json'))
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.content)
+
+    def test_not_accepted_not_compressed(self):
+        """
+        Clients that refuse gzip get uncompressed responses
+        """
+        response = self.process(HttpResponse(self.content,
+                                             content_type='application/json'),
+                                accept_encoding='gzip;q=0, identity')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_binary_not_compressed(self):
+        """
+        Binary content types are left alone
+        """
+        response = self.process(
+            HttpResponse(self.content, content_type='image/png'))
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_compressed(self):
+        """
+        Streaming responses are compressed chunk by chunk
+        """
+        response = self.process(
+            StreamingHttpResponse(iter([self.content] * 3),
+                                  content_type='application/json'))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)),
+                         self.content * 3)
+
+    def test_gzip_length_randomized(self):
+        """
+        Gzip keeps Django's BREACH mitigation, the same content compresses
+        to varying lengths
+        """
+        lengths = {
+            len(
+                self.process(
+                    HttpResponse(self.content,
+                                 content_type='application/json')).content)
+            for _ in range(10)
+        }
+        self.assertGreater(len(lengths), 1)
+
+    def test_gzip_level(self):
+        """
+        Gzip compresses at the configured level
+        """
+        content = json.dumps([{
+            'id': pk,
+            'title': f"Task {pk}",
+            'progress': pk * 7 % 101
+        } for pk in range(2000)]).encode()
+        sizes = []
+        for level in (1, 9):
+            with override_settings(COMPRESSION_GZIP_LEVEL=level):
+                # Without the random file name
+                compressor = GzipCompressor(max_random_bytes=1)
+                compressed = compressor.compress(content) + compressor.finish()
+            self.assertEqual(gzip.decompress(compressed), content)
+            sizes.append(len(compressed))
+        self.assertLess(sizes[1], sizes[0])
+
+    def test_credentials_not_brotli(self):
+        """
+        Responses to requests with credentials may hold secrets, so they are
+        only compressed with the randomized gzip
+        """
+        request = self.factory.get('/api/tasks')
+        self.assertFalse(has_credentials(request))
+        request = self.factory.get('/api/tasks',
+                                   HTTP_AUTHORIZATION='Bearer token')
+        self.assertTrue(has_credentials(request))
+        request = self.factory.get('/api/tasks')
+        request.COOKIES['sessionid'] = 'session'
+        self.assertTrue(has_credentials(request))
+
+        self.assertEqual(choose_encoding('br, gzip', ['gzip']), 'gzip')
+        self.assertIsNone(choose_encoding('br', ['gzip']))
+
+    def test_choose_encoding(self):
+        """
+        Accept-Encoding quality values are honoured
+        """
+        self.assertEqual(choose_encoding('gzip'), 'gzip')
+        self.assertIn(choose_encoding('*'), ('gzip', 'br'))
+        self.assertIsNone(choose_encoding('identity'))
+        self.assertIsNone(choose_encoding('gzip;q=0'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRoutingTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+
+    def process(self, request):
+        """
+        Utility function to return the databases used while handling the
+        request, and the response
+        """
+        used = {}
+
+        def get_response(request):
+            used['read'] = self.router.db_for_read(Task)
+            used['write'] = self.router.db_for_write(Task)
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(get_response)(request)
+        return used, response
+
+    def test_safe_request_reads_replica(self):
+        """
+        Safe-method requests read from a replica and write to the primary
+        """
+        used, response = self.process(self.factory.get('/api/tasks'))
+        self.assertEqual(used, {'read': 'replica_1', 'write': 'default'})
+        self.assertNotIn('primary_pin', response.cookies)
+
+    def test_write_request_pins_primary(self):
+        """
+        Writing requests use the primary and pin the client to it
+        """
+        used, response = self.process(self.factory.post('/api/tasks'))
+        self.assertEqual(used, {'read': 'default', 'write': 'default'})
+        self.assertEqual(response.cookies['primary_pin']['max-age'], 5)
+
+        # The next read sees the write
+        request = self.factory.get('/api/tasks')
+        request.COOKIES['primary_pin'] = '1'
+        used, response = self.process(request)
+        self.assertEqual(used['read'], 'default')
+
+    def test_outside_request_reads_primary(self):
+        """
+        Jobs and commands outside of a request use the primary
+        """
+        self.assertEqual(self.router.db_for_read(Task), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        """
+        Without replicas everything goes to the primary
+        """
+        used, response = self.process(self.factory.get('/api/tasks'))
+        self.assertEqual(used['read'], 'default')
+        response = self.process(self.factory.post('/api/tasks'))[1]
+        self.assertNotIn('primary_pin', response.cookies)
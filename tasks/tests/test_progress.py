@@ -0,0 +1,140 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse_lazy
+from django.utils import timezone
+from tasks.models import ProgressEvent, ProgressRollup, Project, ProjectAccess
+from tasks.progress import pending_events, rollup_progress
+
+
+@override_settings(PROGRESS_ROLLUP_LAG_SECONDS=0)
+class ProgressTestCase(TransactionTestCase):
+    # Events are buffered on commit, so the requests must really commit
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="jane_doe@email.com",
+                                        email="jane_doe@email.com",
+                                        password="secret")
+        self.project = Project.objects.create(title="Test Title",
+                                              description="Test Description")
+        ProjectAccess.objects.create(
+            project=self.project,
+            user=self.user,
+            membership_level=ProjectAccess.MembershipLevel.OWNER)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create_task(self) -> dict:
+        response = self.client.post(reverse_lazy('tasks:tasks'), {
+            'title': "Test Task Title",
+            'description': "Test Task Description",
+            'project': self.project.pk
+        },
+                                    content_type="application/json")
+        return response.json()
+
+    def set_progress(self, task: dict, progress: int):
+        self.client.patch(
+            reverse_lazy('tasks:task', kwargs={'pk': task['id']}),
+            {'progress': progress},
+            content_type="application/json")
+
+    def test_events_written_after_request(self):
+        """
+        Saves are logged with one insert once the request is finished
+        """
+        task = self.create_task()
+        self.set_progress(task, 40)
+        self.set_progress(task, 40)
+        self.set_progress(task, 100)
+
+        self.assertEqual(pending_events(), [])
+        self.assertEqual(
+            list(
+                ProgressEvent.objects.order_by('pk').values_list(
+                    'task_id', 'progress', 'delta', 'added')),
+            [(task['id'], 0, 0, 1), (task['id'], 40, 40, 0),
+             (task['id'], 100, 60, 0)])
+
+    def test_burndown(self):
+        """
+        The burndown sums up the roll-ups, events are rolled up once
+        """
+        first, second = self.create_task(), self.create_task()
+        self.set_progress(first, 100)
+        self.set_progress(second, 50)
+        ProgressEvent.objects.filter(task_id=first['id']).update(
+            created_at=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(rollup_progress(), 4)
+        self.assertEqual(rollup_progress(), 0)
+        self.assertEqual(
+            ProgressRollup.objects.filter(
+                period=ProgressRollup.Period.DAY).count(), 2)
+
+        url = reverse_lazy('tasks:projectburndown',
+                           kwargs={'pk': self.project.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(entry['tasks'], entry['completed'],
+                           entry['remaining'])
+                          for entry in response.json()['series']],
+                         [(1, 1.0, 0.0), (2, 1.5, 0.5)])
+
+        # Later events add up with the rolled up ones
+        self.set_progress(first, 80)
+        self.assertEqual(rollup_progress(), 1)
+        response = self.client.get(url, {'period': 'week'})
+        self.assertEqual(response.json()['series'][-1]['completed'], 1.3)
+
+        response = self.client.get(url, {'period': 'year'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_burndown_after_delete(self):
+        """
+        Deleted tasks leave the burndown
+        """
+        first, second = self.create_task(), self.create_task()
+        self.set_progress(first, 100)
+        self.client.delete(
+            reverse_lazy('tasks:task', kwargs={'pk': second['id']}))
+        rollup_progress()
+
+        url = reverse_lazy('tasks:projectburndown',
+                           kwargs={'pk': self.project.pk})
+        entry = self.client.get(url).json()['series'][-1]
+        self.assertEqual((entry['tasks'], entry['remaining']), (1, 0.0))
+
+        self.client.delete(
+            reverse_lazy('tasks:task', kwargs={'pk': first['id']}))
+        rollup_progress()
+        entry = self.client.get(url).json()['series'][-1]
+        self.assertEqual((entry['tasks'], entry['completed'],
+                          entry['remaining']), (0, 0.0, 0.0))
+
+    @override_settings(PROGRESS_ROLLUP_LAG_SECONDS=60)
+    def test_recent_events_wait(self):
+        """
+        Events are rolled up once older than the lag, later ones wait with
+        them
+        """
+        first = self.create_task()
+        self.create_task()
+        ProgressEvent.objects.filter(task_id=first['id']).update(
+            created_at=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(rollup_progress(), 1)
+
+        # An older event after a recent one waits for it
+        ProgressEvent.objects.create(project_id=self.project.pk,
+                                     task_id=first['id'],
+                                     progress=10,
+                                     delta=10,
+                                     created_at=timezone.now() -
+                                     timedelta(minutes=2))
+        self.assertEqual(rollup_progress(), 0)
+
+        ProgressEvent.objects.update(created_at=timezone.now() -
+                                     timedelta(minutes=2))
+        self.assertEqual(rollup_progress(), 2)
@@ -1,13 +1,21 @@
 import json
+from datetime import timedelta
+from unittest import mock
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.http import HttpResponse
-from django.test import Client, RequestFactory, TestCase
+from django.test import Client, RequestFactory, TestCase, override_settings
 from django.urls import reverse_lazy
+from django.utils import timezone
+from tasks.dependencies import add_dependency
+from tasks.jobs import run_pending_jobs
+from tasks.models import Job, Project, ProjectAccess, Task, TaskDependency
 
 
 class ProjectTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         self.factory = RequestFactory()
         self.user = User.objects.create(username="jane_doe@email.com",
                                         email="jane_doe@email.com",
@@ -155,3 +163,267 @@ class ProjectTestCase(TestCase):
 
         # Check Status Code
         self.assertEqual(update_response.status_code, 403)
+
+    @override_settings(
+        CACHE_IS_SHARED=True,
+        SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_cached_project_list(self):
+        """
+        Repeated project list requests are served from the cache
+        """
+        self.client.force_login(self.user)
+        self.create_project(self.user)
+        first_response = self.client.get(reverse_lazy('tasks:projects'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse_lazy('tasks:projects'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, first_response.content)
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_project_list_not_cached_in_process(self):
+        """
+        Project lists aren't cached when the cache isn't shared
+        """
+        self.client.force_login(self.user)
+        self.create_project(self.user)
+        self.client.get(reverse_lazy('tasks:projects'))
+
+        # Updated behind the back of the signal receivers
+        Project.objects.update(title="Updated Title")
+        response = self.client.get(reverse_lazy('tasks:projects'))
+        self.assertEqual(response.json()[0]['title'], "Updated Title")
+
+    def test_cached_project_invalidated_on_update(self):
+        """
+        Updating a project invalidates the cached responses of its members
+        """
+        self.client.force_login(self.user)
+        create_response = self.create_project(self.user)
+        project_detail = json.loads(create_response.content.decode())
+        project_url = reverse_lazy('tasks:project',
+                                   kwargs={'pk': project_detail['id']})
+        self.client.get(project_url)
+        self.client.get(reverse_lazy('tasks:projects'))
+
+        # Update Project
+        self.client.put(
+            project_url,
+            {
+                "title": "Updated Title",
+                "description": "Updated Title"
+            },
+            content_type="application/json",
+        )
+
+        response = self.client.get(project_url)
+        self.assertEqual(response.json()['title'], "Updated Title")
+        response = self.client.get(reverse_lazy('tasks:projects'))
+        self.assertEqual(response.json()[0]['title'], "Updated Title")
+
+    def test_cached_project_invalidated_on_access(self):
+        """
+        Gaining or losing access invalidates the member's cached list
+        """
+        create_response = self.create_project(self.user)
+        project_detail = json.loads(create_response.content.decode())
+
+        # Cache the member's empty list
+        self.client.force_login(self.member)
+        response = self.client.get(reverse_lazy('tasks:projects'))
+        self.assertEqual(response.json(), [])
+
+        # Give the member access
+        access = ProjectAccess.objects.create(
+            project_id=project_detail['id'],
+            user=self.member,
+            membership_level=ProjectAccess.MembershipLevel.MEMBER)
+        response = self.client.get(reverse_lazy('tasks:projects'))
+        self.assertEqual(len(response.json()), 1)
+
+        # Remove the access again
+        access.delete()
+        response = self.client.get(reverse_lazy('tasks:projects'))
+        self.assertEqual(response.json(), [])
+
+    def test_user_clone_project(self):
+        """
+        Cloning copies the tasks and shifts their due dates
+        """
+        # Login and Create Project with a few tasks
+        self.client.force_login(self.user)
+        create_response = self.create_project(self.user)
+        project_detail = json.loads(create_response.content.decode())
+        project = Project.objects.get(pk=project_detail['id'])
+        due_date = timezone.now()
+        Task.objects.bulk_create([
+            Task(title=f"Task {i}",
+                 description="Test Task Description",
+                 project=project,
+                 owner=self.user,
+                 due_date=due_date) for i in range(3)
+        ])
+        ProjectAccess.objects.create(
+            project=project,
+            user=self.member,
+            membership_level=ProjectAccess.MembershipLevel.MEMBER)
+
+        # Clone Project
+        clone_response = self.client.post(
+            reverse_lazy('tasks:projectclone',
+                         kwargs={'pk': project_detail['id']}),
+            {
+                "title": "Cloned Title",
+                "include_access": True,
+                "shift_days": 7
+            },
+            content_type="application/json",
+        )
+
+        self.assertEqual(clone_response.status_code, 201)
+        clone = Project.objects.get(pk=clone_response.json()['id'])
+        self.assertEqual(clone.title, "Cloned Title")
+        self.assertEqual(clone.task_set.count(), 3)
+        self.assertEqual(clone.task_set.first().due_date,
+                         due_date + timedelta(days=7))
+        self.assertEqual(
+            ProjectAccess.objects.get(project=clone,
+                                      user=self.user).membership_level,
+            ProjectAccess.MembershipLevel.OWNER)
+        self.assertTrue(
+            ProjectAccess.objects.filter(project=clone,
+                                         user=self.member).exists())
+
+        # Shifts overflowing the dates are rejected
+        clone_response = self.client.post(
+            reverse_lazy('tasks:projectclone',
+                         kwargs={'pk': project_detail['id']}),
+            {"shift_days": 10**9},
+            content_type="application/json",
+        )
+        self.assertEqual(clone_response.status_code, 400)
+
+    @override_settings(BULK_CREATE_BATCH_SIZE=2)
+    def test_user_clone_project_with_subtasks(self):
+        """
+        Cloning keeps the subtasks under the copies of their parents
+        """
+        self.client.force_login(self.user)
+        create_response = self.create_project(self.user)
+        project = Project.objects.get(pk=create_response.json()['id'])
+        epic = Task.objects.create(title="Epic", project=project)
+        story = Task.objects.create(title="Story",
+                                    project=project,
+                                    parent=epic)
+        Task.objects.create(title="Subtask", project=project, parent=story)
+        Task.objects.create(title="Other story", project=project, parent=epic)
+
+        clone_response = self.client.post(
+            reverse_lazy('tasks:projectclone', kwargs={'pk': project.pk}),
+            {},
+            content_type="application/json",
+        )
+
+        clone = Project.objects.get(pk=clone_response.json()['id'])
+        subtask = clone.task_set.get(title="Subtask")
+        self.assertEqual(subtask.parent.title, "Story")
+        self.assertEqual(subtask.parent.parent.title, "Epic")
+        self.assertEqual(subtask.depth, 2)
+        subtree = subtask.parent.parent.get_subtree().order_by('path')
+        self.assertEqual([task.title for task in subtree],
+                         ["Epic", "Story", "Subtask", "Other story"])
+
+    def test_outsider_clone_project(self):
+        """
+        Users cannot clone projects they are not part of
+        """
+        create_response = self.create_project(self.user)
+        project_detail = json.loads(create_response.content.decode())
+
+        # Login as a user without access and try cloning
+        self.client.force_login(self.member)
+        clone_response = self.client.post(
+            reverse_lazy('tasks:projectclone',
+                         kwargs={'pk': project_detail['id']}),
+            {},
+            content_type="application/json",
+        )
+
+        self.assertEqual(clone_response.status_code, 404)
+
+    @override_settings(DELETE_BATCH_SIZE=2)
+    def test_user_delete_project_with_tasks(self):
+        """
+        Deleting a project removes all its tasks chunk by chunk
+        """
+        self.client.force_login(self.user)
+        create_response = self.create_project(self.user)
+        project_detail = json.loads(create_response.content.decode())
+        Task.objects.bulk_create([
+            Task(title=f"Task {i}", project_id=project_detail['id'])
+            for i in range(5)
+        ])
+        parent = Task.objects.create(title="Parent",
+                                     project_id=project_detail['id'])
+        child = Task.objects.create(title="Child",
+                                    project_id=project_detail['id'],
+                                    parent=parent)
+        add_dependency(parent, Task.objects.exclude(pk=parent.pk).first())
+        add_dependency(child, Task.objects.exclude(pk=child.pk).first())
+
+        delete_response = self.client.delete(
+            reverse_lazy('tasks:project', kwargs={'pk': project_detail['id']}))
+
+        self.assertEqual(delete_response.status_code, 204)
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(TaskDependency.objects.exists())
+        self.assertFalse(Project.objects.exists())
+
+    def test_user_delete_project_in_background(self):
+        """
+        Background deletion hides the project at once and queues a job
+        """
+        self.client.force_login(self.user)
+        create_response = self.create_project(self.user)
+        project_detail = json.loads(create_response.content.decode())
+        Task.objects.create(title="Task", project_id=project_detail['id'])
+
+        delete_response = self.client.delete(
+            reverse_lazy('tasks:project', kwargs={'pk': project_detail['id']})
+            + '?background=true')
+
+        self.assertEqual(delete_response.status_code, 202)
+        self.assertEqual(delete_response.json()['status'], 'queued')
+
+        # The project is gone for its members
+        response = self.client.get(reverse_lazy('tasks:projects'))
+        self.assertEqual(response.json(), [])
+
+        # Run the job and follow its progress
+        run_pending_jobs()
+        response = self.client.get(delete_response['Location'])
+        self.assertEqual(response.json()['status'], 'done')
+        self.assertEqual(response.json()['result'], {'deleted': 1})
+        self.assertFalse(Project.objects.exists())
+
+    @override_settings(JOB_MAX_ATTEMPTS=1)
+    def test_failed_background_deletion(self):
+        """
+        The members get the project back when its deletion fails for good
+        """
+        self.client.force_login(self.user)
+        create_response = self.create_project(self.user)
+        project_detail = json.loads(create_response.content.decode())
+
+        self.client.delete(
+            reverse_lazy('tasks:project', kwargs={'pk': project_detail['id']})
+            + '?background=true')
+        with mock.patch('tasks.deletion.delete_project',
+                        side_effect=RuntimeError):
+            run_pending_jobs()
+
+        self.assertEqual(Job.objects.get().status, Job.Status.FAILED)
+        response = self.client.get(reverse_lazy('tasks:projects'))
+        self.assertEqual([project['id'] for project in response.json()],
+                         [project_detail['id']])
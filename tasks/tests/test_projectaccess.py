@@ -1,9 +1,11 @@
 import json
 
 from django.contrib.auth.models import User
+from django.db import connection
 from django.http import HttpResponse
-from django.test import Client, RequestFactory, TestCase
-from django.urls import reverse_lazy
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse, reverse_lazy
 from tasks.models import ProjectAccess
 
 
@@ -214,3 +216,115 @@ class ProjectAccessTestCase(TestCase):
             },
             content_type='application/json')
         self.assertEqual(patch_response.status_code, 403)
+
+    def test_owner_bulk_access(self):
+        """
+        Owner of the project can add and update many members at once
+        """
+        # Create project and an existing member
+        project_response = self.create_project(self.user_jane)
+        project = json.loads(project_response.content.decode())
+        ProjectAccess.objects.create(
+            project_id=project['id'],
+            user=self.user_bob,
+            membership_level=ProjectAccess.MembershipLevel.MEMBER)
+
+        # Add Steve, promote Bob and try adding an unknown user
+        bulk_response = self.client.post(
+            reverse_lazy('tasks:projectaccessbulk'), {
+                'project':
+                project['id'],
+                'members': [{
+                    'user': self.user_bob.username,
+                    'membership_level': ProjectAccess.MembershipLevel.OWNER
+                }, {
+                    'user': self.user_steve.username,
+                    'membership_level': ProjectAccess.MembershipLevel.MEMBER
+                }, {
+                    'user': 'nobody@email.com',
+                    'membership_level': ProjectAccess.MembershipLevel.MEMBER
+                }]
+            },
+            content_type='application/json')
+
+        self.assertEqual(bulk_response.status_code, 200)
+        self.assertEqual(bulk_response.json()['missing'],
+                         ['nobody@email.com'])
+        self.assertEqual(
+            ProjectAccess.objects.get(project_id=project['id'],
+                                      user=self.user_bob).membership_level,
+            ProjectAccess.MembershipLevel.OWNER)
+        self.assertTrue(
+            ProjectAccess.objects.filter(project_id=project['id'],
+                                         user=self.user_steve).exists())
+
+    def test_member_bulk_access(self):
+        """
+        A member of the project cannot add members in bulk
+        """
+        # Create project and add Bob as a member
+        project_response = self.create_project(self.user_jane)
+        project = json.loads(project_response.content.decode())
+        ProjectAccess.objects.create(
+            project_id=project['id'],
+            user=self.user_bob,
+            membership_level=ProjectAccess.MembershipLevel.MEMBER)
+
+        # Logout and login as the member
+        self.client.logout()
+        self.client.force_login(self.user_bob)
+
+        bulk_response = self.client.post(
+            reverse_lazy('tasks:projectaccessbulk'), {
+                'project':
+                project['id'],
+                'members': [{
+                    'user': self.user_steve.username,
+                    'membership_level': ProjectAccess.MembershipLevel.MEMBER
+                }]
+            },
+            content_type='application/json')
+
+        self.assertEqual(bulk_response.status_code, 403)
+        self.assertFalse(
+            ProjectAccess.objects.filter(project_id=project['id'],
+                                         user=self.user_steve).exists())
+
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=2)
+    def test_admin_access_changelist(self):
+        """
+        The changelist joins projects and users instead of a query per row,
+        and counts a bounded number of rows
+        """
+        for title in ("First", "Second", "Third"):
+            project = self.create_project(user=self.user_jane, title=title)
+            self.client.post(reverse_lazy('tasks:projectaccesslist'), {
+                'project': project.json()['id'],
+                'user': self.user_bob.username,
+                'membership_level': ProjectAccess.MembershipLevel.MEMBER
+            },
+                             content_type='application/json')
+        self.assertEqual(ProjectAccess.objects.count(), 6)
+
+        self.client.force_login(
+            User.objects.create_superuser(username="admin",
+                                          email="admin@email.com",
+                                          password="secret"))
+        url = reverse('admin:tasks_projectaccess_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Third - bob_doe@email.com")
+
+        sql = [query['sql'] for query in queries.captured_queries]
+        self.assertFalse(
+            any(query.startswith('SELECT "tasks_project"."id"')
+                for query in sql))
+        self.assertTrue(
+            all('LIMIT' in query for query in sql if 'COUNT(*)' in query))
+
+        # Unfiltered the table size is estimated, here from the highest id
+        self.assertContains(response, "6 projectaccess")
+
+        response = self.client.get(url, {'membership_level__exact': 2})
+        self.assertContains(response, "3 results")
@@ -1,13 +1,25 @@
+import io
 import json
+import tempfile
+from datetime import timedelta
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.http import HttpResponse
-from django.test import Client, RequestFactory, TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse_lazy
+from django.utils import timezone
+from tasks.jobs import run_pending_jobs
+from tasks.models import ArchivedTask, Project, ProjectAccess, Task
 
 
 class TaskTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         self.factory = RequestFactory()
         self.user = User.objects.create(username="jane_doe@email.com",
                                         email="jane_doe@email.com",
@@ -70,6 +82,21 @@ class TaskTestCase(TestCase):
         response = self.client.get(reverse_lazy('tasks:tasks'))
         self.assertEqual(response.status_code, 200)
 
+    def test_user_without_projects_get_tasks(self):
+        """
+        Users that are not part of any project should not see any task
+        """
+        project = json.loads(
+            self.create_project(user=self.user).content.decode())
+        self.create_task(user=self.user, project_id=project['id'])
+
+        other = User.objects.create(username="bob_doe@email.com",
+                                    email="bob_doe@email.com",
+                                    password="secret")
+        self.client.force_login(other)
+        response = self.client.get(reverse_lazy('tasks:tasks'))
+        self.assertEqual(json.loads(response.content.decode()), [])
+
     def test_anonymous_get_tasks(self):
         """
         Anonymous users should not have tasks
@@ -239,3 +266,664 @@ class TaskTestCase(TestCase):
             reverse_lazy('tasks:task', kwargs={'pk': task['id']}))
 
         self.assertEqual(task_delete_response.status_code, 403)
+
+    def import_tasks(self, name, content, **data) -> HttpResponse:
+        """
+        Utility function to upload a task import file
+        """
+        return self.client.post(reverse_lazy('tasks:taskimport'),
+                                {
+                                    'file':
+                                    SimpleUploadedFile(name, content.encode()),
+                                    **data
+                                })
+
+    @override_settings(BULK_CREATE_BATCH_SIZE=2)
+    def test_user_import_csv(self):
+        """
+        Valid CSV rows are imported and bad rows are reported
+        """
+        project_response = self.create_project(user=self.user)
+        project = json.loads(project_response.content.decode())
+        other_project = Project.objects.create(title="Other",
+                                               description="Other")
+
+        content = (
+            "title,description,project,progress,due_date\n"
+            f"One,First,{project['id']},10,2030-01-01T00:00:00Z\n"
+            f"Two,Second,{project['id']},,\n"
+            f"Three,Third,{project['id']},100,\n"
+            f"Bad progress,Desc,{project['id']},150,\n"
+            f"Bad date,Desc,{project['id']},0,someday\n"
+            f"No access,Desc,{other_project.pk},0,\n"
+            f",No title,{project['id']},0,\n")
+        response = self.import_tasks('tasks.csv', content)
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual(report['created'], 3)
+        self.assertEqual(report['error_count'], 4)
+        self.assertEqual([error['line'] for error in report['errors']],
+                         [5, 6, 7, 8])
+        self.assertIn('progress', report['errors'][0]['errors'])
+        self.assertIn('due_date', report['errors'][1]['errors'])
+        self.assertIn('project', report['errors'][2]['errors'])
+        self.assertIn('title', report['errors'][3]['errors'])
+        self.assertEqual(
+            Task.objects.filter(project_id=project['id'],
+                                owner=self.user).count(), 3)
+
+    def test_user_import_ndjson_in_background(self):
+        """
+        NDJSON files can be imported by a background job
+        """
+        project_response = self.create_project(user=self.user)
+        project = json.loads(project_response.content.decode())
+
+        content = (json.dumps({
+            'title': 'One',
+            'description': 'First',
+            'project': project['id']
+        }) + "\n" + "not json\n")
+        with tempfile.TemporaryDirectory() as import_dir:
+            with override_settings(TASK_IMPORT_DIR=import_dir):
+                response = self.import_tasks('tasks.ndjson',
+                                             content,
+                                             background=True)
+                self.assertEqual(response.status_code, 202)
+                run_pending_jobs()
+
+        response = self.client.get(response['Location'])
+        self.assertEqual(response.json()['result']['created'], 1)
+        self.assertEqual(response.json()['result']['errors'][0]['line'], 2)
+
+    def test_anonymous_import(self):
+        """
+        Anonymous users cannot import tasks
+        """
+        response = self.import_tasks('tasks.csv', "title\n")
+        self.assertEqual(response.status_code, 403)
+
+    def test_user_get_sparse_tasks(self):
+        """
+        ?fields= restricts both the payload and the columns fetched
+        """
+        project_response = self.create_project(user=self.user)
+        project = json.loads(project_response.content.decode())
+        self.create_task(project_id=project['id'])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse_lazy('tasks:tasks') + '?fields=id,title,progress')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()[0]), {'id', 'title', 'progress'})
+        self.assertNotIn('"description"', queries[-1]['sql'])
+
+    def test_user_get_expanded_tasks(self):
+        """
+        ?expand= inlines related objects without a query per task
+        """
+        project_response = self.create_project(user=self.user)
+        project = json.loads(project_response.content.decode())
+        self.create_task(project_id=project['id'])
+
+        url = reverse_lazy('tasks:tasks') + '?expand=project,owner'
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(url)
+
+        for _ in range(3):
+            self.create_task(project_id=project['id'])
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+
+        self.assertEqual(len(single), len(many))
+        task = response.json()[0]
+        self.assertEqual(task['project']['title'], "Test Title")
+        self.assertEqual(task['owner']['username'], self.user.username)
+
+    def test_user_get_columnar_tasks(self):
+        """
+        Tasks can be listed column by column through the Accept header
+        """
+        project_response = self.create_project(user=self.user)
+        project = json.loads(project_response.content.decode())
+        self.create_task(title="First", project_id=project['id'])
+        self.create_task(title="Second", project_id=project['id'])
+        rows = self.client.get(reverse_lazy('tasks:tasks')).json()
+
+        response = self.client.get(
+            reverse_lazy('tasks:tasks') + '?fields=id,title,owner,due_date',
+            HTTP_ACCEPT='application/vnd.spizy.columnar+json')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['fields'], ['id', 'title', 'owner', 'due_date'])
+        self.assertEqual(data['count'], 2)
+        for i, field in enumerate(data['fields']):
+            self.assertEqual(data['columns'][i],
+                             [row[field] for row in rows])
+
+        # Paginated requests read one page
+        response = self.client.get(
+            reverse_lazy('tasks:tasks') + '?fields=title&limit=1&offset=1',
+            HTTP_ACCEPT='application/vnd.spizy.columnar+json')
+        data = response.json()
+        self.assertEqual(data['columns'], [["Second"]])
+        self.assertEqual(data['count'], 2)
+        self.assertFalse(data['count_is_approximate'])
+        self.assertIsNone(data['next'])
+        self.assertIsNotNone(data['previous'])
+
+        response = self.client.get(
+            reverse_lazy('tasks:tasks') +
+            '?fields=title&limit=1&include_archived=true',
+            HTTP_ACCEPT='application/vnd.spizy.columnar+json')
+        self.assertEqual(response.json()['columns'], [["First"]])
+
+    def test_user_get_my_tasks(self):
+        """
+        Users can page through the tasks they own, soonest due first
+        """
+        project_response = self.create_project(user=self.user)
+        project = Project.objects.get(
+            pk=json.loads(project_response.content.decode())['id'])
+        other = User.objects.create(username="bob_doe@email.com",
+                                    email="bob_doe@email.com",
+                                    password="secret")
+        now = timezone.now()
+        for days in (3, 1, 2):
+            Task.objects.create(title=f"In {days} days",
+                                description="Description",
+                                project=project,
+                                owner=self.user,
+                                due_date=now + timedelta(days=days))
+        Task.objects.create(title="Not mine",
+                            description="Description",
+                            project=project,
+                            owner=other)
+
+        response = self.client.get(
+            reverse_lazy('tasks:mytasks') + '?page_size=2')
+        self.assertEqual(response.status_code, 200)
+        page = response.json()
+        self.assertEqual([task['title'] for task in page['results']],
+                         ["In 1 days", "In 2 days"])
+
+        page = self.client.get(page['next']).json()
+        self.assertEqual([task['title'] for task in page['results']],
+                         ["In 3 days"])
+        self.assertIsNone(page['next'])
+
+    @override_settings(DUE_TASKS_CACHE_TIMEOUT=0)
+    def test_user_get_my_tasks_after_leaving(self):
+        """
+        Owned tasks of a project the user left are no longer listed
+        """
+        project_response = self.create_project(user=self.user)
+        project = json.loads(project_response.content.decode())
+        self.create_task(project_id=project['id'])
+        url = reverse_lazy('tasks:mytasks')
+        self.assertEqual(len(self.client.get(url).json()['results']), 1)
+
+        ProjectAccess.objects.filter(project=project['id'],
+                                     user=self.user).delete()
+        self.assertEqual(self.client.get(url).json()['results'], [])
+
+    def test_user_get_due_tasks(self):
+        """
+        Users get the tasks of their projects due within the window
+        """
+        project_response = self.create_project(user=self.user)
+        project = Project.objects.get(
+            pk=json.loads(project_response.content.decode())['id'])
+        now = timezone.now()
+        for days in (-1, 2, 10):
+            Task.objects.create(title=f"In {days} days",
+                                description="Description",
+                                project=project,
+                                due_date=now + timedelta(days=days))
+
+        response = self.client.get(reverse_lazy('tasks:duetasks'))
+        self.assertEqual(
+            [task['title'] for task in response.json()['results']],
+            ["In 2 days"])
+
+        response = self.client.get(
+            reverse_lazy('tasks:duetasks') + '?days=30')
+        self.assertEqual(
+            [task['title'] for task in response.json()['results']],
+            ["In 2 days", "In 10 days"])
+
+        response = self.client.get(
+            reverse_lazy('tasks:duetasks') + '?days=nope')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_user_get_cached_my_tasks(self):
+        """
+        My tasks are cached for a short while, unless disabled
+        """
+        project_response = self.create_project(user=self.user)
+        project = json.loads(project_response.content.decode())
+        url = reverse_lazy('tasks:mytasks')
+
+        self.assertEqual(self.client.get(url).json()['results'], [])
+        self.create_task(project_id=project['id'])
+        self.assertEqual(self.client.get(url).json()['results'], [])
+
+        with override_settings(DUE_TASKS_CACHE_TIMEOUT=0):
+            self.assertEqual(len(self.client.get(url).json()['results']), 1)
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_user_get_uncached_due_tasks(self):
+        """
+        My and due tasks aren't cached when the cache isn't shared
+        """
+        project_response = self.create_project(user=self.user)
+        project = json.loads(project_response.content.decode())
+        due = timezone.now() + timedelta(days=1)
+
+        for name in ('tasks:mytasks', 'tasks:duetasks'):
+            url = reverse_lazy(name)
+            before = len(self.client.get(url).json()['results'])
+            Task.objects.create(title="Title",
+                                description="Description",
+                                project_id=project['id'],
+                                owner=self.user,
+                                due_date=due)
+            self.assertEqual(len(self.client.get(url).json()['results']),
+                             before + 1)
+
+    def create_subtask(self, project_id, parent_id=None, **fields) -> dict:
+        """
+        Utility function to create a task under a parent and return its data
+        """
+        response = self.client.post(reverse_lazy('tasks:tasks'), {
+            'title': "Test Task Title",
+            'description': "Test Task Description",
+            'project': project_id,
+            'parent': parent_id,
+            **fields
+        },
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_user_get_subtree(self):
+        """
+        Subtasks are listed depth-first, optionally down to a depth
+        """
+        project = self.create_project(user=self.user).json()
+        epic = self.create_subtask(project['id'], title="Epic")
+        story = self.create_subtask(project['id'], epic['id'], title="Story")
+        self.create_subtask(project['id'], story['id'], title="Subtask")
+        self.create_subtask(project['id'], epic['id'], title="Other story")
+        self.create_subtask(project['id'], title="Other epic")
+        url = reverse_lazy('tasks:tasksubtree', kwargs={'pk': epic['id']})
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(task['title'], task['depth'])
+             for task in response.json()['results']],
+            [("Epic", 0), ("Story", 1), ("Subtask", 2), ("Other story", 1)])
+
+        response = self.client.get(url + '?depth=1&fields=title')
+        self.assertEqual(response.json()['results'], [{
+            'title': "Epic"
+        }, {
+            'title': "Story"
+        }, {
+            'title': "Other story"
+        }])
+
+    def test_user_move_subtree(self):
+        """
+        Moving a task moves its subtasks, and never under itself
+        """
+        project = self.create_project(user=self.user).json()
+        epic = self.create_subtask(project['id'], title="Epic")
+        story = self.create_subtask(project['id'], epic['id'], title="Story")
+        subtask = self.create_subtask(project['id'], story['id'])
+        other = self.create_subtask(project['id'], title="Other epic")
+
+        response = self.client.patch(
+            reverse_lazy('tasks:task', kwargs={'pk': story['id']}),
+            {'parent': other['id']},
+            content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+
+        moved = Task.objects.get(pk=subtask['id'])
+        self.assertEqual(moved.depth, 2)
+        self.assertTrue(
+            moved.path.startswith(Task.objects.get(pk=other['id']).path))
+        subtree = self.client.get(
+            reverse_lazy('tasks:tasksubtree', kwargs={'pk': epic['id']}))
+        self.assertEqual(len(subtree.json()['results']), 1)
+
+        # Into its own subtree
+        response = self.client.patch(
+            reverse_lazy('tasks:task', kwargs={'pk': story['id']}),
+            {'parent': subtask['id']},
+            content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_user_get_rollup(self):
+        """
+        Progress and overdue tasks are summed up over the subtree
+        """
+        project = self.create_project(user=self.user).json()
+        yesterday = (timezone.now() - timedelta(days=1)).isoformat()
+        tomorrow = (timezone.now() + timedelta(days=1)).isoformat()
+        epic = self.create_subtask(project['id'],
+                                   progress=100,
+                                   due_date=yesterday)
+        story = self.create_subtask(project['id'],
+                                    epic['id'],
+                                    progress=50,
+                                    due_date=tomorrow)
+        self.create_subtask(project['id'],
+                            story['id'],
+                            progress=0,
+                            due_date=yesterday)
+        other = self.create_subtask(project['id'],
+                                    epic['id'],
+                                    progress=30,
+                                    due_date=tomorrow)
+
+        response = self.client.get(
+            reverse_lazy('tasks:taskrollup', kwargs={'pk': epic['id']}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(), {
+                'tasks': 4,
+                'progress': 45.0,
+                'overdue': 1,
+                'subtasks': [{
+                    'id': story['id'],
+                    'tasks': 2,
+                    'progress': 25.0,
+                    'overdue': 1
+                }, {
+                    'id': other['id'],
+                    'tasks': 1,
+                    'progress': 30.0,
+                    'overdue': 0
+                }]
+            })
+
+    def assertSubtreeTotals(self):
+        """
+        Checks the subtree totals kept on the tasks against their subtrees
+        """
+        for task in Task.objects.all():
+            subtree = task.get_subtree()
+            self.assertEqual(
+                (task.subtree_tasks, task.subtree_progress),
+                (subtree.count(), sum(subtree.values_list('progress',
+                                                          flat=True))))
+
+    @override_settings(PROGRESS_COALESCE_SECONDS=60, CACHE_IS_SHARED=True)
+    def test_subtree_totals(self):
+        """
+        The subtree totals follow updates, moves, deletions, coalesced
+        progress and archiving
+        """
+        project = self.create_project(user=self.user).json()
+        last_month = (timezone.now() - timedelta(days=31)).isoformat()
+        epic = self.create_subtask(project['id'], progress=10)
+        story = self.create_subtask(project['id'], epic['id'], progress=20)
+        leaf = self.create_subtask(project['id'], story['id'], progress=30)
+        other = self.create_subtask(project['id'])
+        self.assertSubtreeTotals()
+
+        self.client.patch(reverse_lazy('tasks:task',
+                                       kwargs={'pk': leaf['id']}),
+                          {'progress': 100, 'due_date': last_month},
+                          content_type="application/json")
+        self.assertSubtreeTotals()
+
+        self.client.patch(reverse_lazy('tasks:task',
+                                       kwargs={'pk': story['id']}),
+                          {'parent': other['id'], 'progress': 40},
+                          content_type="application/json")
+        self.assertSubtreeTotals()
+        self.assertEqual(Task.objects.get(pk=other['id']).subtree_tasks, 3)
+
+        self.client.post(reverse_lazy('tasks:taskprogress',
+                                      kwargs={'pk': story['id']}),
+                         {'progress': 70},
+                         content_type="application/json")
+        call_command('flush_progress', stdout=io.StringIO())
+        self.assertSubtreeTotals()
+
+        call_command('archive_tasks', stdout=io.StringIO())
+        self.assertEqual(ArchivedTask.objects.get().pk, leaf['id'])
+        self.assertSubtreeTotals()
+
+        self.client.delete(
+            reverse_lazy('tasks:task', kwargs={'pk': story['id']}))
+        self.assertSubtreeTotals()
+        self.assertEqual(Task.objects.get(pk=other['id']).subtree_tasks, 1)
+
+    @override_settings(TASK_MAX_DEPTH=1)
+    def test_subtask_depth_limited(self):
+        """
+        Subtasks can't be created or moved deeper than TASK_MAX_DEPTH
+        """
+        project = self.create_project(user=self.user).json()
+        epic = self.create_subtask(project['id'])
+        story = self.create_subtask(project['id'], epic['id'])
+        other = self.create_subtask(project['id'])
+
+        response = self.client.post(reverse_lazy('tasks:tasks'), {
+            'title': "Too deep",
+            'description': "Description",
+            'project': project['id'],
+            'parent': story['id']
+        },
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.patch(
+            reverse_lazy('tasks:task', kwargs={'pk': epic['id']}),
+            {'parent': other['id']},
+            content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_user_delete_subtree(self):
+        """
+        Deleting a task deletes its subtasks
+        """
+        project = self.create_project(user=self.user).json()
+        epic = self.create_subtask(project['id'])
+        story = self.create_subtask(project['id'], epic['id'])
+        self.create_subtask(project['id'], story['id'])
+        self.create_subtask(project['id'])
+
+        response = self.client.delete(
+            reverse_lazy('tasks:task', kwargs={'pk': epic['id']}))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_archive_tasks(self):
+        """
+        Old completed tasks are archived leaves first and only listed on
+        request
+        """
+        project = self.create_project(user=self.user).json()
+        last_month = (timezone.now() - timedelta(days=31)).isoformat()
+        done = {'progress': 100, 'due_date': last_month}
+        epic = self.create_subtask(project['id'], **done)
+        story = self.create_subtask(project['id'], epic['id'], **done)
+        pending = self.create_subtask(project['id'], **{
+            **done, 'progress': 50
+        })
+        blocked = self.create_subtask(project['id'], **done)
+        self.create_subtask(project['id'], blocked['id'], progress=50)
+
+        call_command('archive_tasks', stdout=io.StringIO())
+
+        self.assertEqual(
+            set(ArchivedTask.objects.values_list('pk', flat=True)),
+            {epic['id'], story['id']})
+        self.assertEqual(Task.objects.count(), 3)
+        archived = ArchivedTask.objects.get(pk=story['id'])
+        self.assertEqual(archived.parent_id, epic['id'])
+
+        url = reverse_lazy('tasks:tasks')
+        response = self.client.get(url)
+        self.assertNotIn(epic['id'], [task['id'] for task in response.json()])
+        self.assertIn(pending['id'], [task['id'] for task in response.json()])
+
+        response = self.client.get(url, {'include_archived': 'true'})
+        self.assertEqual(len(response.json()), 5)
+        self.assertIn(story, response.json())
+
+        response = self.client.get(url, {
+            'include_archived': 'true',
+            'fields': 'id,title'
+        })
+        self.assertIn({
+            'id': epic['id'],
+            'title': epic['title']
+        }, response.json())
+
+        # Deleting the project deletes its archive
+        self.client.delete(
+            reverse_lazy('tasks:project', kwargs={'pk': project['id']}))
+        self.assertFalse(ArchivedTask.objects.exists())
+
+    @override_settings(PROGRESS_COALESCE_SECONDS=60, CACHE_IS_SHARED=True)
+    def test_coalesced_progress(self):
+        """
+        Progress updates are written once with the last value, reads show
+        them meanwhile
+        """
+        project = self.create_project(user=self.user).json()
+        task = self.create_subtask(project['id'])
+        url = reverse_lazy('tasks:taskprogress', kwargs={'pk': task['id']})
+
+        for progress in (10, 20, 30):
+            response = self.client.post(url, {'progress': progress},
+                                        content_type="application/json")
+            self.assertEqual(response.status_code, 202)
+
+        self.assertEqual(Task.objects.get(pk=task['id']).progress, 0)
+        detail_url = reverse_lazy('tasks:task', kwargs={'pk': task['id']})
+        self.assertEqual(self.client.get(detail_url).json()['progress'], 30)
+        self.assertEqual(
+            self.client.get(reverse_lazy('tasks:tasks')).json()[0]['progress'],
+            30)
+
+        call_command('flush_progress', stdout=io.StringIO())
+        self.assertEqual(Task.objects.get(pk=task['id']).progress, 30)
+
+        # A direct save overrides the pending update
+        self.client.post(url, {'progress': 40},
+                         content_type="application/json")
+        self.client.patch(detail_url, {'progress': 50},
+                          content_type="application/json")
+        self.assertEqual(self.client.get(detail_url).json()['progress'], 50)
+        call_command('flush_progress', stdout=io.StringIO())
+        self.assertEqual(Task.objects.get(pk=task['id']).progress, 50)
+
+        response = self.client.post(url, {'progress': 101},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+        # Outsiders can't update the task
+        self.client.force_login(
+            User.objects.create(username="john_doe@email.com",
+                                email="john_doe@email.com",
+                                password="secret"))
+        response = self.client.post(url, {'progress': 60},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(PROGRESS_COALESCE_SECONDS=60, CACHE_IS_SHARED=True)
+    def test_coalesced_progress_columnar(self):
+        """
+        Columnar lists show the pending progress updates too
+        """
+        project = self.create_project(user=self.user).json()
+        task = self.create_subtask(project['id'])
+        other = self.create_subtask(project['id'])
+        self.client.post(reverse_lazy('tasks:taskprogress',
+                                      kwargs={'pk': task['id']}),
+                         {'progress': 30},
+                         content_type="application/json")
+
+        response = self.client.get(
+            reverse_lazy('tasks:tasks') + '?fields=id,progress',
+            HTTP_ACCEPT='application/vnd.spizy.columnar+json')
+        progress = dict(zip(*response.json()['columns']))
+        self.assertEqual(progress, {task['id']: 30, other['id']: 0})
+
+    @override_settings(PROGRESS_COALESCE_SECONDS=60, CACHE_IS_SHARED=False)
+    def test_progress_without_shared_cache(self):
+        """
+        Progress updates are written right away when other processes could
+        not see them pending
+        """
+        project = self.create_project(user=self.user).json()
+        task = self.create_subtask(project['id'])
+        url = reverse_lazy('tasks:taskprogress', kwargs={'pk': task['id']})
+
+        response = self.client.post(url, {'progress': 10},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Task.objects.get(pk=task['id']).progress, 10)
+
+        self.client.force_login(
+            User.objects.create(username="john_doe@email.com",
+                                email="john_doe@email.com",
+                                password="secret"))
+        response = self.client.post(url, {'progress': 60},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(EXACT_COUNT_THRESHOLD=2)
+    def test_approximate_count(self):
+        """
+        ?limit pages the tasks, counting exactly up to the threshold and from
+        cached project counts above it
+        """
+        project = self.create_project(user=self.user).json()
+        self.create_subtask(project['id'])
+        self.create_subtask(project['id'])
+        url = reverse_lazy('tasks:tasks')
+
+        # Without a limit the list is not paginated
+        self.assertEqual(len(self.client.get(url).json()), 2)
+
+        data = self.client.get(url, {'limit': 1}).json()
+        self.assertEqual((data['count'], data['count_is_approximate']),
+                         (2, False))
+        self.assertEqual(len(data['results']), 1)
+        self.assertIsNotNone(data['next'])
+
+        self.create_subtask(project['id'])
+        self.create_subtask(project['id'])
+        data = self.client.get(url, {'limit': 3}).json()
+        self.assertEqual((data['count'], data['count_is_approximate']),
+                         (4, True))
+
+        # Cached counts lag behind, within APPROXIMATE_COUNT_TIMEOUT
+        self.create_subtask(project['id'])
+        data = self.client.get(url, {'limit': 3, 'offset': 3}).json()
+        self.assertEqual((data['count'], data['count_is_approximate']),
+                         (4, True))
+        self.assertEqual(len(data['results']), 2)
+
+        data = self.client.get(url, {
+            'limit': 10,
+            'include_archived': 'true'
+        }).json()
+        self.assertEqual(len(data['results']), 5)
+
+        data = self.client.get(reverse_lazy('tasks:projectaccesslist'),
+                               {'limit': 10}).json()
+        self.assertEqual((data['count'], data['count_is_approximate']),
+                         (1, False))
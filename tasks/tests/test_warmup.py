@@ -0,0 +1,23 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import get_resolver
+from tasks.warmup import connect, warm_up
+
+
+class WarmUpTestCase(TestCase):
+    def test_warm_up(self):
+        """
+        Warm-up compiles the URL patterns, and connects to the database only
+        in a post-fork hook
+        """
+        with mock.patch('tasks.warmup.connect') as connect_mock:
+            warm_up()
+
+        for pattern in get_resolver().url_patterns:
+            self.assertIn('regex', pattern.pattern.__dict__)
+        connect_mock.assert_not_called()
+
+        with mock.patch('tasks.warmup.postfork') as postfork_mock:
+            warm_up()
+        postfork_mock.assert_called_once_with(connect)
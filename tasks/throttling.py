@@ -0,0 +1,171 @@
+import hashlib
+import math
+import time
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+def parse_rate(rate: str):
+    """
+    Parses a DRF style rate such as '10/min' into a bucket capacity and a
+    refill rate in tokens per second
+    """
+    num, period = rate.split('/')
+    duration = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+    return int(num), int(num) / duration
+
+
+def get_rate(scope: str):
+    """
+    Returns the configured rate for the scope, None if it is not limited
+    """
+    return api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+
+
+class TokenBucket:
+    """
+    Token bucket whose state is kept in the cache.
+
+    The bucket holds up to ``capacity`` tokens and refills at ``rate``
+    tokens per second; every request takes one token. The tokens taken are
+    counted per window of ``capacity / rate`` seconds with the atomic
+    add() and incr(), no lock is taken. The level of the bucket is
+    estimated from the current window's count plus the previous one's, in
+    proportion to how much of it is still within the last window length.
+    Rejected requests only read the two counters.
+
+    The rate holds across worker processes only with a shared cache
+    (``CACHE_IS_SHARED``), with a process-local one each process has its
+    own buckets; ``manage.py check --deploy`` warns about it.
+    """
+    timer = time.time
+
+    def __init__(self, capacity: int, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+
+    @classmethod
+    def for_scope(cls, scope: str):
+        rate = get_rate(scope)
+        if rate is None:
+            return None
+        return cls(*parse_rate(rate))
+
+    def wait(self, previous: int, current: int, overlap: float) -> float:
+        """
+        Returns the seconds until a token is available, given the counts of
+        the previous and current windows and the share of the previous
+        window still counted
+        """
+        if current + 1 > self.capacity:
+            # Once in the next window, the current count fades out
+            windows = overlap + max(0, 1 - (self.capacity - 1) / current)
+        else:
+            windows = overlap - (self.capacity - current - 1) / previous
+        return max(windows * self.capacity / self.rate, 0.001)
+
+    def consume(self, key: str) -> float:
+        """
+        Takes a token from the bucket. Returns 0 if the request is allowed,
+        otherwise the seconds until a token is available.
+        """
+        window = self.capacity / self.rate
+        now = self.timer() / window
+        index = int(now)
+        overlap = 1 - (now - index)
+        previous_key, current_key = f'{key}:{index - 1}', f'{key}:{index}'
+
+        counts = cache.get_many([previous_key, current_key])
+        previous = counts.get(previous_key, 0)
+        current = counts.get(current_key, 0)
+        if previous * overlap + current + 1 > self.capacity:
+            return self.wait(previous, current, overlap)
+
+        # Counted until the next window is over
+        cache.add(current_key, 0, math.ceil(2 * window))
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # Expired in between, the window is over anyway
+            return 0
+
+        # Concurrent requests may have taken the last tokens meanwhile
+        if previous * overlap + current > self.capacity:
+            return self.wait(previous, current - 1, overlap)
+        return 0
+
+
+def normalize_username(username):
+    """
+    Returns the username used as a throttling identity, None if missing
+    """
+    if not isinstance(username, str):
+        return None
+    return username.strip().lower()
+
+
+def check_rate(scope: str, ident: str) -> float:
+    """
+    Standalone limiter for views outside of DRF. Returns 0 if the request
+    is allowed, otherwise the seconds to wait.
+    """
+    bucket = TokenBucket.for_scope(scope)
+    if bucket is None or not ident:
+        return 0
+
+    # Hash the identity, usernames are not safe to use in cache keys
+    digest = hashlib.sha1(ident.encode()).hexdigest()
+    return bucket.consume(f'throttle:bucket:{scope}:{digest}')
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Base DRF throttle backed by a ``TokenBucket``.
+
+    The scope is taken from the view's ``throttle_scope`` or else from the
+    URL name, and the rate from ``DEFAULT_THROTTLE_RATES[scope + suffix]``.
+    Scopes without a configured rate are not limited.
+    """
+    scope_suffix = ''
+
+    def get_ident_for(self, request, view):
+        raise NotImplementedError('.get_ident_for() must be overridden')
+
+    def get_scope(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if scope is None and request.resolver_match is not None:
+            scope = request.resolver_match.url_name
+        return f'{scope}{self.scope_suffix}'
+
+    def allow_request(self, request, view):
+        self.wait_time = check_rate(self.get_scope(request, view),
+                                    self.get_ident_for(request, view))
+        return self.wait_time == 0
+
+    def wait(self):
+        return self.wait_time
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Limits requests per client IP address
+    """
+    def get_ident_for(self, request, view):
+        return self.get_ident(request)
+
+
+class UsernameTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Limits requests per username given in the request body, so that
+    attempts against one account are limited whatever their origin
+    """
+    scope_suffix = '_username'
+
+    def get_ident_for(self, request, view):
+        try:
+            username = request.data.get('username')
+        except AttributeError:
+            return None
+        return normalize_username(username)
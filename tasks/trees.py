@@ -0,0 +1,44 @@
+from django.db.models import Count, Q
+from django.db.models.functions import Substr
+from django.utils import timezone
+
+from tasks.models import PATH_STEP, Task, path_segment
+
+
+def subtree_rollup(task: Task) -> dict:
+    """
+    Returns the task count, average progress and overdue count of the
+    task's subtree, and of the subtree of each of its subtasks.
+
+    Counts and progress come from the subtree totals kept on the task and
+    its subtasks, so only those rows are read. Being overdue depends on the
+    time, so overdue tasks are counted over the subtree's path range,
+    grouped by the path prefix they share.
+    """
+    totals = {
+        pk: {
+            'tasks': tasks,
+            'progress': progress / tasks
+        }
+        for pk, tasks, progress in Task.objects.filter(
+            Q(pk=task.pk) | Q(parent=task)).order_by('path').values_list(
+                'pk', 'subtree_tasks', 'subtree_progress')
+    }
+
+    overdue = dict(
+        task.get_subtree().filter(
+            due_date__lt=timezone.now(), progress__lt=100).values(
+                branch=Substr('path', 1,
+                              len(task.path) + PATH_STEP)).annotate(
+                                  overdue=Count('pk')).values_list(
+                                      'branch', 'overdue'))
+
+    rollup = totals.pop(task.pk)
+    rollup['overdue'] = sum(overdue.values())
+    rollup['subtasks'] = [{
+        'id': pk,
+        **branch, 'overdue':
+        overdue.get(task.path + path_segment(pk), 0)
+    } for pk, branch in totals.items()]
+
+    return rollup
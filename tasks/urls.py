@@ -11,15 +11,51 @@ urlpatterns = [
     path('login', views.UserLogin, name="login"),
     path('check-login', views.check_login, name="checklogin"),
     path('logout', views.UserLogout, name="logout"),
+    path('token', views.TokenObtain, name="token"),
+    path('token/revoke', views.TokenRevoke, name="tokenrevoke"),
     # API View
     path('projects', views.ProjectList.as_view(), name="projects"),
     path('project/<int:pk>', views.ProjectDetail.as_view(), name="project"),
+    path('project/<int:pk>/clone',
+         views.ProjectClone.as_view(),
+         name="projectclone"),
+    path('project/<int:pk>/critical-path',
+         views.ProjectCriticalPath.as_view(),
+         name="projectcriticalpath"),
+    path('project/<int:pk>/burndown',
+         views.ProjectBurndown.as_view(),
+         name="projectburndown"),
     path('tasks', views.TaskList.as_view(), name="tasks"),
+    path('tasks/import', views.TaskImport.as_view(), name="taskimport"),
+    path('tasks/mine', views.MyTaskList.as_view(), name="mytasks"),
+    path('tasks/due', views.DueTaskList.as_view(), name="duetasks"),
+    path('tasks/blocked', views.BlockedTaskList.as_view(),
+         name="blockedtasks"),
     path('task/<int:pk>', views.TaskDetail.as_view(), name="task"),
+    path('task/<int:pk>/progress',
+         views.TaskProgress.as_view(),
+         name="taskprogress"),
+    path('task/<int:pk>/subtree',
+         views.TaskSubtree.as_view(),
+         name="tasksubtree"),
+    path('task/<int:pk>/rollup', views.TaskRollup.as_view(),
+         name="taskrollup"),
+    path('task-dependencies',
+         views.TaskDependencyList.as_view(),
+         name="taskdependencies"),
+    path('task-dependency/<int:pk>',
+         views.TaskDependencyDetail.as_view(),
+         name="taskdependency"),
     path('project-access',
          views.ProjectAccessList.as_view(),
          name="projectaccesslist"),
+    path('project-access/bulk',
+         views.ProjectAccessBulk.as_view(),
+         name="projectaccessbulk"),
     path('project-access/<int:pk>',
          views.ProjectAccessDetail.as_view(),
          name="projectaccess"),
+    path('jobs', views.JobList.as_view(), name="jobs"),
+    path('job/<int:pk>', views.JobDetail.as_view(), name="job"),
+    path('batch', views.Batch.as_view(), name="batch"),
 ]
@@ -1,32 +1,73 @@
 import io
+import math
+from datetime import timedelta
+from functools import partial
 from json.decoder import JSONDecodeError
 
+from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.models import User
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Exists, OuterRef
 from django.http import HttpRequest, HttpResponseBadRequest, JsonResponse
 from django.middleware import csrf
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.decorators import (api_view, authentication_classes,
-                                       permission_classes)
-from rest_framework.exceptions import (ParseError, PermissionDenied)
-from rest_framework.generics import (ListCreateAPIView,
+                                       permission_classes, throttle_classes)
+from rest_framework.exceptions import (AuthenticationFailed, NotFound,
+                                       ParseError, PermissionDenied,
+                                       ValidationError)
+from rest_framework.generics import (GenericAPIView, ListAPIView,
+                                     ListCreateAPIView, RetrieveAPIView,
+                                     RetrieveDestroyAPIView,
                                      RetrieveUpdateDestroyAPIView)
-from rest_framework.parsers import JSONParser
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
-
+from rest_framework.throttling import BaseThrottle
+
+from tasks.authentication import (SignedTokenAuthentication, issue_token,
+                                  revoke_token)
+from tasks.batching import batch_response, run_subrequest
+from tasks.caching import CachedResponseMixin, bump_versions
+from tasks.cloning import clone_project
+from tasks.coalescing import cached_project_ids, set_pending, task_project_id
+from tasks.counting import project_counts
+from tasks.dependencies import (DependencyCycle, add_dependency,
+                                critical_path, invalidate_critical_paths,
+                                remove_dependency)
+from tasks.deletion import delete_project, start_background_deletion
+from tasks.fieldsets import SparseFieldsViewMixin
 from tasks.forms import SignUpForm
-from tasks.models import Project, ProjectAccess, Task
+from tasks.hashers import HashingBusy, hashing_slot
+from tasks.importing import (guess_format, import_tasks,
+                             start_background_import)
+from tasks.jobs import enqueue
+from tasks.membership import user_project_ids
+from tasks.models import (PATH_STEP, ArchivedTask, Job, ProgressRollup,
+                          Project, ProjectAccess, Task, TaskDependency,
+                          add_to_subtrees, subtree_lookup)
+from tasks.pagination import (ApproximateCountPagination,
+                              DueDateCursorPagination, PathCursorPagination)
 from tasks.permissions import (IsTaskPartOfUserProject, IsUserOwnerOfProject,
                                IsUserPartOfProject)
-from tasks.serializers import (ProjectAccessSerializer, ProjectSerializer,
-                               SignUpFormSerializer, TaskSerializer,
-                               UserSerializer)
+from tasks.progress import burndown, record_deleted
+from tasks.renderers import ColumnarListMixin
+from tasks.serializers import (BatchSerializer, BulkProjectAccessSerializer,
+                               JobSerializer, ProjectAccessSerializer,
+                               ProjectCloneSerializer, ProjectSerializer,
+                               SignUpFormSerializer, TaskDependencySerializer,
+                               TaskImportSerializer, TaskProgressSerializer,
+                               TaskSerializer, UserSerializer)
+from tasks.throttling import (IPTokenBucketThrottle,
+                              UsernameTokenBucketThrottle, check_rate,
+                              normalize_username)
+from tasks.trees import subtree_rollup
 
 
 def csrfview(request: HttpRequest):
@@ -36,15 +77,45 @@ def csrfview(request: HttpRequest):
     return JsonResponse({'token': csrf.get_token(request)})
 
 
+def throttled_response(wait: float) -> JsonResponse:
+    """
+    Returns the response for a request over its rate limit
+    """
+    return JsonResponse(data={"detail": "Too many attempts, slow down"},
+                        status=status.HTTP_429_TOO_MANY_REQUESTS,
+                        headers={'Retry-After': str(math.ceil(wait))})
+
+
+def job_accepted_response(job: Job) -> Response:
+    """
+    Returns the response for a request handed over to a background job
+    """
+    return Response(JobSerializer(job).data,
+                    status=status.HTTP_202_ACCEPTED,
+                    headers={'Location': job.get_absolute_url()})
+
+
 def UserLogin(request: HttpRequest):
     """
     Logs a user in via JSON request
     """
+    # Reject clients over their rate before doing any work
+    wait = check_rate('login', BaseThrottle().get_ident(request))
+    if wait:
+        return throttled_response(wait)
+
     try:
         # Try to parse the data as JSON
         stream = io.BytesIO(request.body)
         data = JSONParser().parse(stream)
 
+        # Limit attempts per account before touching the database
+        if isinstance(data, dict):
+            wait = check_rate('login_username',
+                              normalize_username(data.get('username')))
+            if wait:
+                return throttled_response(wait)
+
         # Serialize the user data
         serializer = UserSerializer(data=data)
 
@@ -60,10 +131,18 @@ def UserLogin(request: HttpRequest):
     except BaseException:
         return HttpResponseBadRequest()
 
-    if form.is_valid():
-        user: User = authenticate(request=request,
-                                  username=form.cleaned_data['username'],
-                                  password=form.cleaned_data['password'])
+    try:
+        # Authenticates the user, rehashing outdated password hashes
+        with hashing_slot():
+            is_valid = form.is_valid()
+    except HashingBusy as exc:
+        return JsonResponse(data={"detail": exc.detail},
+                            status=exc.status_code,
+                            headers={'Retry-After': str(exc.wait)})
+
+    if is_valid:
+        # The form already authenticated the user, don't hash again
+        user: User = form.get_user()
         login(request, user)
         return JsonResponse({
             'status': True,
@@ -77,7 +156,7 @@ def UserLogin(request: HttpRequest):
 
 
 @api_view(['POST'])
-@authentication_classes([SessionAuthentication])
+@authentication_classes([SessionAuthentication, SignedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def UserLogout(request: Request):
     logout(request)
@@ -85,7 +164,7 @@ def UserLogout(request: Request):
 
 
 @api_view(['GET'])
-@authentication_classes([SessionAuthentication])
+@authentication_classes([SessionAuthentication, SignedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def check_login(request: Request):
     """
@@ -102,8 +181,46 @@ def check_login(request: Request):
         raise PermissionDenied('Please log in')
 
 
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@throttle_classes([IPTokenBucketThrottle, UsernameTokenBucketThrottle])
+def TokenObtain(request: Request):
+    """
+    Exchanges a username and password for a signed API token
+    """
+    # Serialize the user data
+    serializer = UserSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    with hashing_slot():
+        user: User = authenticate(
+            request=request,
+            username=serializer.validated_data['username'],
+            password=serializer.validated_data['password'])
+    if user is None:
+        raise AuthenticationFailed('Incorrect username or password')
+
+    return Response({
+        'token': issue_token(user),
+        'expires_in': settings.API_TOKEN_TTL
+    })
+
+
+@api_view(['POST'])
+@authentication_classes([SignedTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def TokenRevoke(request: Request):
+    """
+    Revokes the token used to authenticate this request
+    """
+    revoke_token(request.auth)
+    return Response({'status': True})
+
+
 @api_view(["POST"])
 @authentication_classes([SessionAuthentication])
+@throttle_classes([IPTokenBucketThrottle])
 def UserSignUp(request: Request):
     """
     Signup User
@@ -118,7 +235,8 @@ def UserSignUp(request: Request):
     form = SignUpForm(data=serializer.validated_data)
 
     if form.is_valid():
-        user: User = form.save(commit=True)
+        with hashing_slot():
+            user: User = form.save(commit=True)
         return JsonResponse(
             data={
                 'username': user.username,
@@ -129,12 +247,18 @@ def UserSignUp(request: Request):
         raise ParseError(detail=form.errors)
 
 
-class ProjectList(ListCreateAPIView):
+class ProjectList(CachedResponseMixin, SparseFieldsViewMixin,
+                  ListCreateAPIView):
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated, IsUserPartOfProject]
+    cache_prefix = 'projects'
 
     def get_queryset(self):
-        return self.request.user.project_set.all()
+        return self.sparse_queryset(self.request.user.project_set.all())
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, partial(super().list, request, *args, **kwargs))
 
     def perform_create(self, serializer: ProjectSerializer):
         project: Project = serializer.save()
@@ -146,12 +270,29 @@ class ProjectList(ListCreateAPIView):
         return project
 
 
-class ProjectDetail(RetrieveUpdateDestroyAPIView):
+class ProjectDetail(CachedResponseMixin, SparseFieldsViewMixin,
+                    RetrieveUpdateDestroyAPIView):
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated, IsUserPartOfProject]
+    cache_prefix = 'project'
 
     def get_queryset(self):
-        return self.request.user.project_set.all()
+        return self.sparse_queryset(self.request.user.project_set.all())
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, partial(super().retrieve, request, *args, **kwargs))
+
+    def destroy(self, request, *args, **kwargs):
+        # Large projects can be deleted outside of the request
+        if request.query_params.get('background') in ('1', 'true'):
+            job = start_background_deletion(self.get_object(), request.user)
+            return job_accepted_response(job)
+
+        return super().destroy(request, *args, **kwargs)
+
+    def perform_destroy(self, instance: Project):
+        delete_project(instance)
 
     def get_object(self):
         # Query the object
@@ -171,21 +312,72 @@ class ProjectDetail(RetrieveUpdateDestroyAPIView):
         return obj
 
 
-class TaskList(ListCreateAPIView):
-    serializer_class = TaskSerializer
+class ProjectClone(GenericAPIView):
+    """
+    Project Clone API Endpoint
+    """
+    serializer_class = ProjectCloneSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        # Get All User Projects
-        user_projects = self.request.user.project_set.all()
+        return self.request.user.project_set.all()
+
+    def post(self, request: Request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Any member of the project may clone it
+        project: Project = self.get_object()
+
+        # Large projects can be cloned outside of the request
+        if serializer.validated_data.pop('background'):
+            job = enqueue('clone_project',
+                          dict(serializer.validated_data, project=project.pk),
+                          owner=request.user)
+            return job_accepted_response(job)
+
+        clone = clone_project(
+            project,
+            request.user,
+            title=serializer.validated_data.get('title'),
+            include_access=serializer.validated_data['include_access'],
+            shift=timedelta(days=serializer.validated_data['shift_days']))
+
+        return Response(ProjectSerializer(clone).data,
+                        status=status.HTTP_201_CREATED)
+
+
+class TaskList(ColumnarListMixin, SparseFieldsViewMixin, ListCreateAPIView):
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = ApproximateCountPagination
 
-        # For every project the user is part of,
-        # get all the project members and their access level
-        filters = Q()
-        for project in user_projects:
-            filters |= Q(project=project)
+    def include_archived(self) -> bool:
+        return (self.request.method == 'GET'
+                and self.request.query_params.get('include_archived')
+                in ('1', 'true'))
 
-        return Task.objects.filter(filters)
+    def get_queryset(self):
+        # Only tasks of projects the user is part of
+        project_ids = user_project_ids(self.request.user)
+        queryset = self.sparse_queryset(
+            Task.objects.filter(project__in=project_ids))
+
+        if self.include_archived():
+            # Restricted the same way, both tables select the same columns
+            archived = ArchivedTask.objects.filter(project__in=project_ids)
+            queryset = queryset.union(self.sparse_queryset(archived),
+                                      all=True)
+
+        return queryset
+
+    def get_approximate_count(self) -> int:
+        # Cached per-project counts, summed over the user's projects
+        project_ids = user_project_ids(self.request.user)
+        models = [Task, ArchivedTask] if self.include_archived() else [Task]
+        return sum(
+            sum(project_counts(model, project_ids).values())
+            for model in models)
 
     def perform_create(self, serializer: TaskSerializer):
         # Get the project
@@ -204,21 +396,106 @@ class TaskList(ListCreateAPIView):
         return task
 
 
-class TaskDetail(RetrieveUpdateDestroyAPIView):
+class TaskImport(GenericAPIView):
+    """
+    Task Import API Endpoint, accepts CSV or NDJSON uploads
+    """
+    serializer_class = TaskImportSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request: Request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        uploaded_file = serializer.validated_data['file']
+
+        # Fall back to the file extension
+        format = serializer.validated_data.get('format') or guess_format(
+            uploaded_file.name)
+        if format is None:
+            raise ParseError(detail='Could not guess the file format')
+
+        # Large files can be imported outside of the request
+        if serializer.validated_data['background']:
+            job = start_background_import(uploaded_file, format,
+                                          request.user)
+            return job_accepted_response(job)
+
+        report = import_tasks(uploaded_file.open('rb'), format, request.user)
+        return Response(report)
+
+
+class MyTaskList(CachedResponseMixin, SparseFieldsViewMixin, ListAPIView):
+    """
+    Tasks owned by the user in the projects they are still part of, soonest
+    due first, cached for a short while when the cache is shared
+    """
     serializer_class = TaskSerializer
-    permission_classes = [IsAuthenticated, IsTaskPartOfUserProject]
+    permission_classes = [IsAuthenticated]
+    pagination_class = DueDateCursorPagination
+    cache_prefix = 'mytasks'
+
+    def get_cache_timeout(self) -> int:
+        return settings.DUE_TASKS_CACHE_TIMEOUT
 
     def get_queryset(self):
-        # Get All User Projects
-        user_projects = self.request.user.project_set.all()
+        return self.sparse_queryset(
+            Task.objects.filter(
+                owner=self.request.user,
+                project__in=user_project_ids(self.request.user)))
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, partial(super().list, request, *args, **kwargs))
+
 
-        # For every project the user is part of,
-        # get all the project members and their access level
-        filters = Q()
-        for project in user_projects:
-            filters |= Q(project=project)
+class DueTaskList(CachedResponseMixin, SparseFieldsViewMixin, ListAPIView):
+    """
+    Tasks of the user's projects due in the next ?days=N days, cached for a
+    short while when the cache is shared
+    """
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = DueDateCursorPagination
+    cache_prefix = 'duetasks'
+
+    def get_cache_timeout(self) -> int:
+        return settings.DUE_TASKS_CACHE_TIMEOUT
 
-        return Task.objects.filter(filters)
+    def get_days(self) -> int:
+        try:
+            days = int(
+                self.request.query_params.get('days', settings.DUE_SOON_DAYS))
+        except ValueError:
+            raise ParseError(detail='days must be a number')
+
+        max_days = settings.DUE_SOON_MAX_DAYS
+        if not 0 < days <= max_days:
+            raise ParseError(detail=f'days must be between 1 and {max_days}')
+        return days
+
+    def get_queryset(self):
+        now = timezone.now()
+        return self.sparse_queryset(
+            Task.objects.filter(
+                project__in=user_project_ids(self.request.user),
+                due_date__gte=now,
+                due_date__lt=now + timedelta(days=self.get_days())))
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, partial(super().list, request, *args, **kwargs))
+
+
+class TaskDetail(SparseFieldsViewMixin, RetrieveUpdateDestroyAPIView):
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated, IsTaskPartOfUserProject]
+
+    def get_queryset(self):
+        # Only tasks of projects the user is part of
+        return self.sparse_queryset(
+            Task.objects.filter(
+                project__in=user_project_ids(self.request.user)))
 
     def get_object(self):
         # Query the object
@@ -234,6 +511,188 @@ class TaskDetail(RetrieveUpdateDestroyAPIView):
         self.check_object_permissions(self.request, obj)
         return obj
 
+    def perform_destroy(self, instance: Task):
+        subtree = instance.get_subtree()
+        archived = ArchivedTask.objects.filter(
+            **subtree_lookup(instance.project_id, instance.path))
+        with transaction.atomic():
+            # Take the deleted tasks out of the burndown
+            record_deleted(subtree.only('pk', 'project', 'progress'))
+            record_deleted(archived.only('pk', 'project', 'progress'))
+            # Delete the subtasks with the task, whatever the depth of the
+            # tree
+            tasks, progress = subtree.filter(pk=instance.pk).values_list(
+                'subtree_tasks', 'subtree_progress').get()
+            add_to_subtrees([(instance.project_id,
+                              instance.path[:-PATH_STEP], -tasks, -progress)
+                             ])
+            subtree.delete()
+            archived.delete()
+        invalidate_critical_paths([instance.project_id])
+
+
+class TaskProgress(GenericAPIView):
+    """
+    Task Progress API Endpoint, for frequent progress updates such as a
+    slider. Membership is checked against cached data and the updates a
+    task gets within PROGRESS_COALESCE_SECONDS are written once, keeping
+    the last one. Reads show the pending progress meanwhile.
+
+    Pending updates must be seen by every process, without a shared cache
+    (CACHE_IS_SHARED) they are written right away.
+    """
+    serializer_class = TaskProgressSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request: Request, pk: int):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        progress = serializer.validated_data['progress']
+
+        if settings.CACHE_IS_SHARED:
+            project_id = task_project_id(pk)
+            if (project_id is None
+                    or project_id not in cached_project_ids(request.user)):
+                raise NotFound()
+            set_pending(pk, progress)
+        else:
+            task = get_object_or_404(
+                Task, pk=pk, project__in=user_project_ids(request.user))
+            task.progress = progress
+            task.save(update_fields=['progress'])
+
+        return Response({'id': pk, 'progress': progress},
+                        status=status.HTTP_202_ACCEPTED)
+
+
+class TaskSubtree(SparseFieldsViewMixin, ListAPIView):
+    """
+    Task Subtree API Endpoint, lists a task and its subtasks depth-first,
+    down to ?depth=N levels below the task
+    """
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = PathCursorPagination
+
+    def get_task(self) -> Task:
+        return get_object_or_404(
+            Task.objects.filter(
+                project__in=user_project_ids(self.request.user)),
+            pk=self.kwargs['pk'])
+
+    def get_queryset(self):
+        task = self.get_task()
+        queryset = task.get_subtree()
+
+        depth = self.request.query_params.get('depth')
+        if depth is not None:
+            try:
+                queryset = queryset.filter(depth__lte=task.depth + int(depth))
+            except ValueError:
+                raise ParseError(detail='depth must be a number')
+
+        return self.sparse_queryset(queryset)
+
+
+class TaskRollup(TaskSubtree):
+    """
+    Task Rollup API Endpoint, sums up the progress of a task's subtree
+    """
+    def get(self, request: Request, *args, **kwargs):
+        return Response(subtree_rollup(self.get_task()))
+
+
+class TaskDependencyList(ListCreateAPIView):
+    """
+    Task Dependency List & Create API Endpoint, rejects dependency cycles
+    """
+    serializer_class = TaskDependencySerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return TaskDependency.objects.filter(
+            project__in=user_project_ids(self.request.user))
+
+    def perform_create(self, serializer: TaskDependencySerializer):
+        blocker: Task = serializer.validated_data['blocker']
+        if blocker.project_id not in user_project_ids(self.request.user):
+            raise PermissionDenied(
+                "Could not find that task or you don't have permission")
+
+        try:
+            serializer.instance = add_dependency(
+                blocker, serializer.validated_data['blocked'])
+        except DependencyCycle as exc:
+            raise ValidationError({'blocked': [str(exc)]})
+
+
+class TaskDependencyDetail(RetrieveDestroyAPIView):
+    """
+    Task Dependency Retrieve & Destroy API Endpoint
+    """
+    serializer_class = TaskDependencySerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return TaskDependency.objects.filter(
+            project__in=user_project_ids(self.request.user))
+
+    def perform_destroy(self, instance: TaskDependency):
+        remove_dependency(instance)
+
+
+class BlockedTaskList(SparseFieldsViewMixin, ListAPIView):
+    """
+    Tasks of the user's projects waiting on an unfinished blocker
+    """
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        unfinished_blockers = TaskDependency.objects.filter(
+            blocked=OuterRef('pk'), blocker__progress__lt=100)
+        return self.sparse_queryset(
+            Task.objects.filter(
+                Exists(unfinished_blockers),
+                project__in=user_project_ids(self.request.user)))
+
+
+class ProjectCriticalPath(GenericAPIView):
+    """
+    Project Critical Path API Endpoint
+    """
+    permission_classes = [IsAuthenticated, IsUserPartOfProject]
+
+    def get_queryset(self):
+        return self.request.user.project_set.all()
+
+    def get(self, request: Request, *args, **kwargs):
+        return Response(critical_path(self.get_object().pk))
+
+
+class ProjectBurndown(GenericAPIView):
+    """
+    Project Burndown API Endpoint, reads the daily or weekly progress
+    roll-ups (?period=day|week)
+    """
+    permission_classes = [IsAuthenticated, IsUserPartOfProject]
+
+    def get_queryset(self):
+        return self.request.user.project_set.all()
+
+    def get(self, request: Request, *args, **kwargs):
+        period = request.query_params.get('period', ProgressRollup.Period.DAY)
+        if period not in ProgressRollup.Period.values:
+            raise ValidationError({
+                'period':
+                f"Must be one of {', '.join(ProgressRollup.Period.values)}"
+            })
+
+        return Response({
+            'period': period,
+            'series': burndown(self.get_object().pk, period)
+        })
+
 
 class ProjectAccessList(ListCreateAPIView):
     """
@@ -242,18 +701,18 @@ class ProjectAccessList(ListCreateAPIView):
 
     serializer_class = ProjectAccessSerializer
     permission_classes = [IsAuthenticated & IsUserOwnerOfProject]
+    pagination_class = ApproximateCountPagination
 
     def get_queryset(self):
-        # Get All User Projects
-        user_projects = self.request.user.project_set.all()
+        # Members and access levels of projects the user is part of
+        return ProjectAccess.objects.filter(
+            project__in=user_project_ids(self.request.user))
 
-        # For every project the user is part of,
-        # get all the project members and their access level
-        filters = Q()
-        for project in user_projects:
-            filters |= Q(project=project)
-
-        return ProjectAccess.objects.filter(filters)
+    def get_approximate_count(self) -> int:
+        # Cached per-project counts, summed over the user's projects
+        return sum(
+            project_counts(ProjectAccess,
+                           user_project_ids(self.request.user)).values())
 
     def perform_create(self, serializer: ProjectAccessSerializer):
         # Queryset
@@ -289,16 +748,9 @@ class ProjectAccessDetail(RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated & IsUserOwnerOfProject]
 
     def get_queryset(self):
-        # Get All User Projects
-        user_projects = self.request.user.project_set.all()
-
-        # For every project the user is part of,
-        # get all the project members and their access level
-        filters = Q()
-        for project in user_projects:
-            filters |= Q(project=project)
-
-        return ProjectAccess.objects.filter(filters)
+        # Members and access levels of projects the user is part of
+        return ProjectAccess.objects.filter(
+            project__in=user_project_ids(self.request.user))
 
     def get_object(self):
         # Get the queryset
@@ -321,3 +773,105 @@ class ProjectAccessDetail(RetrieveUpdateDestroyAPIView):
             User,
             username=serializer.validated_data.get('user').get('username'))
         serializer.save(user=user)
+
+
+class ProjectAccessBulk(GenericAPIView):
+    """
+    Project Access Bulk Create & Update API Endpoint
+    """
+    serializer_class = BulkProjectAccessSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request: Request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        project_id = serializer.validated_data['project']
+
+        # Owners of the project may add access, checked once for all members
+        if not ProjectAccess.objects.filter(
+                project_id=project_id,
+                user=request.user,
+                membership_level=ProjectAccess.MembershipLevel.OWNER).exists():
+            raise PermissionDenied(
+                "Your either don't have access or project doesn't exist")
+
+        # The last entry wins if a username is given more than once
+        levels = {
+            member['user']: member['membership_level']
+            for member in serializer.validated_data['members']
+        }
+
+        # Resolve all the users in one query
+        user_ids = dict(
+            User.objects.filter(username__in=levels).values_list(
+                'username', 'id'))
+
+        accesses = [
+            ProjectAccess(project_id=project_id,
+                          user_id=user_ids[username],
+                          membership_level=level)
+            for username, level in levels.items() if username in user_ids
+        ]
+
+        # Insert new members and update existing ones in one statement
+        with transaction.atomic():
+            ProjectAccess.objects.bulk_create(
+                accesses,
+                update_conflicts=True,
+                unique_fields=['project', 'user'],
+                update_fields=['membership_level'])
+
+        # bulk_create skips the signals that invalidate cached responses
+        bump_versions(user_ids.values())
+
+        return Response({
+            'project': project_id,
+            'members': [{
+                'user': username,
+                'membership_level': levels[username]
+            } for username in levels if username in user_ids],
+            'missing': [
+                username for username in levels if username not in user_ids
+            ]
+        })
+
+
+class JobList(ListAPIView):
+    """
+    Job List API Endpoint
+    """
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Job.objects.filter(owner=self.request.user).order_by('-pk')
+
+
+class JobDetail(RetrieveAPIView):
+    """
+    Job Status & Progress API Endpoint
+    """
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Job.objects.filter(owner=self.request.user)
+
+
+class Batch(GenericAPIView):
+    """
+    Batch API Endpoint, runs several API requests under one request
+    """
+    serializer_class = BatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request: Request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Sub-requests run in order, each one sees the writes before it
+        return batch_response([
+            run_subrequest(request, item['method'], item['path'],
+                           item.get('body'))
+            for item in serializer.validated_data['requests']
+        ])
@@ -0,0 +1,81 @@
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+from django.utils import translation
+from rest_framework.settings import api_settings
+
+try:
+    from uwsgidecorators import postfork
+except ImportError:  # Only importable inside uWSGI
+    postfork = None
+
+logger = logging.getLogger(__name__)
+
+# REST framework settings imported on first access
+API_SETTINGS = ('DEFAULT_RENDERER_CLASSES', 'DEFAULT_PARSER_CLASSES',
+                'DEFAULT_AUTHENTICATION_CLASSES', 'DEFAULT_PERMISSION_CLASSES',
+                'DEFAULT_THROTTLE_CLASSES',
+                'DEFAULT_CONTENT_NEGOTIATION_CLASS',
+                'DEFAULT_FILTER_BACKENDS', 'EXCEPTION_HANDLER')
+
+
+def compile_patterns(patterns):
+    for pattern in patterns:
+        # Compiled on first access and kept on the pattern
+        pattern.pattern.regex
+        if hasattr(pattern, 'url_patterns'):
+            compile_patterns(pattern.url_patterns)
+
+
+def preload():
+    """
+    Does the work Django and REST framework otherwise do lazily while
+    serving the first requests
+    """
+    # Importing the URLconf imports every view, serializer and their
+    # REST framework and django-filter dependencies
+    resolver = get_resolver()
+    compile_patterns(resolver.url_patterns)
+    resolver.reverse_dict
+
+    for setting in API_SETTINGS:
+        getattr(api_settings, setting)
+
+    # Model metadata, password hashers and translation catalogs
+    for model in apps.get_models():
+        model._meta.get_fields()
+    get_hashers()
+    translation.activate(settings.LANGUAGE_CODE)
+    translation.deactivate()
+
+
+def connect():
+    """
+    Opens the database connections of this process
+    """
+    for alias in connections:
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError:
+            logger.warning("Warm-up could not connect to %s", alias,
+                           exc_info=True)
+
+
+def warm_up(connect_databases: bool = True):
+    """
+    Prepares a fresh process before it accepts traffic.
+
+    Code is preloaded right away, so uWSGI workers forked afterwards share
+    it. Connections are never shared between processes, under uWSGI they
+    are opened in each worker after the fork. Elsewhere the process may
+    still be forked, by gunicorn --preload for instance, so they are left
+    to the first request.
+    """
+    preload()
+
+    if connect_databases and postfork is not None:
+        postfork(connect)